@@ -5,6 +5,7 @@ from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from books.models import Book
+from books.volumes import Volume
 from activity.models import ReadingStatus, Rating, Review
 
 User = get_user_model()
@@ -113,11 +114,11 @@ class DetailHidesArchivedReviewsTests(TestCase):
         self.client.login(username=user.username, password="pw")
         return user
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_archived_reviews_hidden_from_detail(self, mock_fetch):
         """ Archived reviews should not appear on book detail page."""
         self.login("user")
-        mock_fetch.return_value = {"id": "B4", "title": "T4"}
+        mock_fetch.return_value = Volume(id="B4", title="T4")
         book = Book.objects.create(id="B4", title="T4")
 
         # one archived, one active
@@ -1,13 +1,16 @@
 """
 Tests for the ReadingStatus functionality.
 """
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
+import httpx
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
 from books.models import Book
 from activity.models import ReadingStatus
+from jobs.models import Job
 
 User = get_user_model()
 
@@ -15,6 +18,7 @@ User = get_user_model()
 class ReadingStatusUITests(TestCase):
     """Tests for the ReadingStatus functionality."""
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(
             username="alice", email="alice@example.com", password="pass12345"
         )
@@ -26,12 +30,11 @@ class ReadingStatusUITests(TestCase):
             args=[self.book.pk]
             )
 
-    @patch('requests.get')
-    def test_anonymous_user_sees_login_button(self, mock_requests_get):
+    @patch('books.client.get_async_client')
+    def test_anonymous_user_sees_login_button(self, mock_client):
         """Test that anonymous users see log in button."""
         # Mock the HTTP response from Google Books API
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
+        payload = {
             'id': 'VOL123',
             'volumeInfo': {
                 'title': 'Dune',
@@ -40,9 +43,11 @@ class ReadingStatusUITests(TestCase):
                 'imageLinks': {'thumbnail': 'http://example.com/image.jpg'}
             }
         }
-        mock_response.raise_for_status.return_value = None
-        mock_response.status_code = 200
-        mock_requests_get.return_value = mock_response
+        mock_client.return_value = httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, json=payload)
+            )
+        )
 
         url = reverse("book_detail", args=[self.book.pk])
         resp = self.client.get(url)
@@ -182,3 +187,21 @@ class ReadingStatusUITests(TestCase):
                 ).exists()
             )
         self.assertTrue(Book.objects.filter(id=self.book.id).exists())
+
+    @patch("books.client.get_session")
+    def test_unknown_book_is_stubbed_and_hydrated_later(self, mock_session):
+        """Shelving a new volume writes now and queues the fetch."""
+        self.client.force_login(self.user)
+        url = reverse("set_reading_status", args=["NEWVOL"])
+        resp = self.client.post(url, {"status": "TO_READ"})
+
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(Book.objects.get(pk="NEWVOL").title, "")
+        self.assertTrue(
+            ReadingStatus.objects.filter(
+                user=self.user, book_id="NEWVOL"
+            ).exists()
+        )
+        mock_session.return_value.get.assert_not_called()
+        job = Job.objects.get(dedupe_key="hydrate:NEWVOL")
+        self.assertEqual((job.name, job.args), ("books.hydrate", ["NEWVOL"]))
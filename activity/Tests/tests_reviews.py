@@ -8,6 +8,7 @@ from django.urls import reverse
 from django.contrib.auth import get_user_model
 
 from books.models import Book
+from books.volumes import Volume
 from activity.models import Review, ReadingStatus
 
 User = get_user_model()
@@ -25,7 +26,7 @@ class ReviewFlowTests(TestCase):
         self.detail_url = reverse("book_detail", args=[self.book_id])
         self.add_review_url = reverse("add_review", args=[self.book_id])
 
-        self.fetch_stub = {"id": self.book_id, "title": "Stub Title"}
+        self.fetch_stub = Volume(id=self.book_id, title="Stub Title")
 
         # Users
         self.alice = User.objects.create_user(
@@ -43,7 +44,7 @@ class ReviewFlowTests(TestCase):
         """Helper to get delete_review URL for a given review_id. """
         return reverse("delete_review", args=[self.book_id, review_id])
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_user_can_create_review(self, mock_fetch):
         """Test that a logged-in user can create a review."""
         mock_fetch.return_value = self.fetch_stub
@@ -62,7 +63,7 @@ class ReviewFlowTests(TestCase):
         self.assertEqual(review.book_id, self.book_id)
         self.assertEqual(review.content, "Great read!")
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_book_detail_displays_reviews(self, mock_fetch):
         """Test that the book detail view displays reviews."""
         mock_fetch.return_value = self.fetch_stub
@@ -80,7 +81,7 @@ class ReviewFlowTests(TestCase):
         self.assertContains(response, "Loved it!")
         self.assertContains(response, "bob")
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_anonymous_sees_login_message_no_form(self, mock_fetch):
         """Test that an anonymous user sees a login prompt without a form."""
         mock_fetch.return_value = self.fetch_stub
@@ -91,7 +92,7 @@ class ReviewFlowTests(TestCase):
         self.assertNotContains(response, 'data-testid="create-review-form"')
         self.assertNotContains(response, 'data-testid="edit-review-form"')
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_authenticated_user_without_review_sees_correct_form(
         self,
         mock_fetch
@@ -113,7 +114,7 @@ class ReviewFlowTests(TestCase):
         # Action points to the add_review URL
         self.assertContains(response, f'action="{self.add_review_url}"')
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_authenticated_user_with_review_sees_buttons(
         self,
         mock_fetch
@@ -139,7 +140,7 @@ class ReviewFlowTests(TestCase):
         self.assertContains(response, 'data-testid="delete-my-review-button"')
         self.assertNotContains(response, 'data-testid="create-review-form"')
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_user_can_edit_review_without_creating_duplicate(self, mock_fetch):
         """
         Test that a user can edit their review
@@ -171,7 +172,7 @@ class ReviewFlowTests(TestCase):
         r = Review.objects.get(user=self.alice, book_id=self.book_id)
         self.assertEqual(r.content, "Actually, fantastic")
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_review_creates_read_status_when_none_exists(self, mock_fetch):
         """
         Posting a review creates READ status if none exists
@@ -194,7 +195,7 @@ class ReviewFlowTests(TestCase):
         rs = ReadingStatus.objects.get(user=self.alice, book_id=self.book_id)
         self.assertEqual(rs.status, ReadingStatus.Status.READ)
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_review_respects_existing_read_status(self, mock_fetch):
         """
         If a status already exists, posting a review should NOT
@@ -241,7 +242,7 @@ class ReviewFlowTests(TestCase):
         self.assertRedirects(response, self.detail_url)
         self.assertFalse(Review.objects.filter(id=review.id).exists())
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_delete_button_visible_only_for_owner(self, mock_fetch):
         """
         The delete control should be visible
@@ -278,7 +279,7 @@ class ReviewFlowTests(TestCase):
         self.assertContains(resp, self.delete_review_url(bobs_rev.id))
         self.assertNotContains(resp, self.delete_review_url(alice_rev.id))
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_delete_confirmation_modal_markup_present(self, mock_fetch):
         """
         The book detail page should render a modal for delete confirmation,
@@ -304,7 +305,7 @@ class ReviewFlowTests(TestCase):
         self.assertContains(response, 'data-bs-toggle="modal"')
         self.assertContains(response, 'data-bs-target="#confirmDeleteModal"')
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_delete_shows_success_message(self, mock_fetch):
         """
         After a successful delete POST, a success message is flashed.
@@ -326,7 +327,7 @@ class ReviewFlowTests(TestCase):
         messages = [m.message for m in get_messages(resp.wsgi_request)]
         self.assertIn("Your review was deleted.", messages)
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_delete_removes_record_from_db(self, mock_fetch):
         """
         A successful POST to delete removes the Review row.
@@ -9,7 +9,7 @@ from django.http import HttpResponseForbidden
 from django.contrib import messages
 from django.urls import reverse
 
-from books.services import fetch_or_refresh_book, safe_redirect_back
+from books.services import ensure_book, safe_redirect_back
 from .services import (
     archive_user_evaluations,
     upsert_active_rating,
@@ -51,8 +51,8 @@ def set_reading_status(request, book_id: str):
         return safe_redirect_back(
             request, reverse("book_detail", args=[book_id])
         )
-    # Ensure a Book row exists for FK (uses Google Books API under the hood)
-    fetch_or_refresh_book(book_id)  # creates/refreshes books.Book
+    # Ensure a Book row exists for FK; details are fetched in the background
+    ensure_book(book_id)
 
     # Set the ReadingStatus row
     obj, created = ReadingStatus.objects.get_or_create(
@@ -104,7 +104,7 @@ def add_rating(request, book_id: str):
         )
 
     # Ensure a Book row exists for FK
-    fetch_or_refresh_book(book_id)
+    ensure_book(book_id)
 
     # Create or update the rating
     ReadingStatus.objects.get_or_create(
@@ -131,7 +131,7 @@ def add_review(request, book_id):
     Returns:
         HttpResponse: The response object.
     """
-    fetch_or_refresh_book(book_id)
+    ensure_book(book_id)
     existing = Review.objects.filter(
         user=request.user,
         book_id=book_id,
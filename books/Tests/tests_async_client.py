@@ -0,0 +1,176 @@
+"""Tests for the async Google Books client, services and single-flight."""
+import asyncio
+from unittest.mock import patch
+import httpx
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from books import client, keypool
+from books.exceptions import BookFetchError
+from books.models import Book
+from books.services import afetch_book_by_id, asearch_google_books
+from books.singleflight import asingle_flight
+
+
+def mock_client(handler):
+    """An AsyncClient whose requests are answered by ``handler``."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@patch.object(keypool, "KEYS", ["fake-key"])
+class AsyncClientTests(TestCase):
+    """`ahttp_get` shares the sync client's policy and bookkeeping."""
+    def setUp(self):
+        cache.clear()
+
+    @patch("books.client.get_async_client")
+    def test_adds_key_and_timeout(self, mock_get_client):
+        """Quota-spending calls get a pool key like the sync client."""
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(200, json={})
+
+        mock_get_client.return_value = mock_client(handler)
+        resp = async_to_sync(client.ahttp_get)(
+            "https://example.test/v", params={"q": "x"}, priority="interactive"
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(seen[0].url.params["key"], "fake-key")
+        self.assertEqual(seen[0].url.params["q"], "x")
+
+    @patch.object(client, "BACKOFF_FACTOR", 0)
+    @patch("books.client.get_async_client")
+    def test_retries_retryable_statuses(self, mock_get_client):
+        """503s are retried up to MAX_RETRIES before being returned."""
+        statuses = iter([503, 200])
+        mock_get_client.return_value = mock_client(
+            lambda request: httpx.Response(next(statuses))
+        )
+        resp = async_to_sync(client.ahttp_get)("https://example.test/v")
+        self.assertEqual(resp.status_code, 200)
+
+    @patch("books.client.get_async_client")
+    def test_transport_errors_map_to_requests(self, mock_get_client):
+        """httpx connection errors surface as requests' ConnectionError."""
+        def handler(request):
+            raise httpx.ConnectError("down", request=request)
+
+        mock_get_client.return_value = mock_client(handler)
+        with self.assertRaises(RequestsConnectionError) as ctx:
+            async_to_sync(client.ahttp_get)("https://example.test/v")
+        self.assertTrue(client.is_unavailable(ctx.exception))
+
+
+@patch.object(keypool, "KEYS", ["fake-key"])
+class AsyncServicesTests(TestCase):
+    """Async services return the same shapes as the sync ones."""
+    def setUp(self):
+        cache.clear()
+
+    @patch("books.client.get_async_client")
+    def test_afetch_book_by_id_parses_volume(self, mock_get_client):
+        """The volume payload is normalized for the detail template."""
+        mock_get_client.return_value = mock_client(
+            lambda request: httpx.Response(200, json={
+                "id": "VOL1",
+                "volumeInfo": {"title": "Dune", "authors": ["F. Herbert"]},
+            })
+        )
+        volume = async_to_sync(afetch_book_by_id)("VOL1")
+        self.assertEqual(volume.title, "Dune")
+        self.assertEqual(volume.authors, ("F. Herbert",))
+
+    @patch("books.client.get_async_client")
+    def test_afetch_book_by_id_falls_back_to_row(self, mock_get_client):
+        """Upstream 503 serves the stored Book row, marked stale."""
+        Book.objects.create(id="VOL1", title="Dune")
+        mock_get_client.return_value = mock_client(
+            lambda request: httpx.Response(503)
+        )
+        with patch.object(client, "BACKOFF_FACTOR", 0):
+            volume = async_to_sync(afetch_book_by_id)("VOL1")
+        self.assertEqual(volume.title, "Dune")
+        self.assertTrue(volume.stale)
+
+    @patch("books.client.get_async_client")
+    def test_afetch_book_by_id_404_raises(self, mock_get_client):
+        """A missing volume raises BookFetchError."""
+        mock_get_client.return_value = mock_client(
+            lambda request: httpx.Response(404)
+        )
+        with self.assertRaises(BookFetchError):
+            async_to_sync(afetch_book_by_id)("NOPE")
+
+    @patch("books.client.get_async_client")
+    def test_asearch_google_books_slices_and_caches(self, mock_get_client):
+        """One upstream call fills the window; the next page is cached."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={
+                "totalItems": 30,
+                "items": [
+                    {"id": f"ID{i}", "volumeInfo": {"title": f"T{i}"}}
+                    for i in range(30)
+                ],
+            })
+
+        mock_get_client.return_value = mock_client(handler)
+        page1, total = async_to_sync(asearch_google_books)(
+            "dune", start_index=0, max_results=12
+        )
+        page2, _ = async_to_sync(asearch_google_books)(
+            "dune", start_index=12, max_results=12
+        )
+        self.assertEqual(total, 30)
+        self.assertEqual(page1[0].id, "ID0")
+        self.assertEqual(page2[0].id, "ID12")
+        self.assertEqual(len(calls), 1)
+
+
+class AsyncSingleFlightTests(TestCase):
+    """Concurrent coroutines for one key share a single call."""
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_coroutines_share_one_call(self):
+        """Only one of many concurrent coroutines runs the fetch."""
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"id": "VOL1"}
+
+        async def run():
+            return await asyncio.gather(*(
+                asingle_flight("vol:1", fetch) for _ in range(8)
+            ))
+
+        results = async_to_sync(run)()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"id": "VOL1"}] * 8)
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        """A follower whose leader's client left fetches for itself."""
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return {"id": "VOL1"}
+
+        async def run():
+            leader = asyncio.ensure_future(asingle_flight("vol:1", fetch))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(asingle_flight("vol:1", fetch))
+            await asyncio.sleep(0.02)
+            leader.cancel()
+            return await follower
+
+        self.assertEqual(async_to_sync(run)(), {"id": "VOL1"})
+        self.assertEqual(len(calls), 2)
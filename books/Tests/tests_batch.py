@@ -0,0 +1,30 @@
+"""Tests for the shared batch runner of the bulk jobs."""
+from django.test import TestCase
+from django.utils import timezone
+from books.batch import keyset_batches
+from books.models import Book
+
+
+class KeysetBatchesTests(TestCase):
+    """Keyset pages cover every row once, ties included."""
+    def test_ties_across_page_boundaries(self):
+        """Rows sharing the leading key are split by the next one."""
+        now = timezone.now()
+        for pk in ("A", "B", "C", "D", "E"):
+            Book.objects.create(pk=pk, last_fetched_at=now)
+        rows = Book.objects.values_list("last_fetched_at", "pk")
+
+        pages = list(keyset_batches(rows, 2, "last_fetched_at", "pk"))
+
+        self.assertEqual(
+            [[pk for _, pk in page] for page in pages],
+            [["A", "B"], ["C", "D"], ["E"]],
+        )
+
+    def test_flat_values_list(self):
+        for pk in ("A", "B", "C"):
+            Book.objects.create(pk=pk)
+        rows = Book.objects.values_list("pk", flat=True)
+        self.assertEqual(
+            list(keyset_batches(rows, 2, "pk")), [["A", "B"], ["C"]]
+        )
@@ -1,5 +1,6 @@
 """ Tests for the book detail view."""
 from unittest.mock import patch
+from asgiref.sync import async_to_sync
 from django.test import TestCase, RequestFactory
 from django.core.cache import cache
 from django.urls import reverse
@@ -7,6 +8,7 @@ from django.contrib.auth import get_user_model
 from books.views import (
     book_detail
 )
+from books.volumes import Volume
 
 User = get_user_model()
 
@@ -18,40 +20,40 @@ class BookDetailViewTests(TestCase):
         self.rf = RequestFactory()
         cache.clear()
 
-        self.sample_book_data = {
-            "id": "test_book_id_123",
-            "title": "Test Book Title",
-            "subtitle": "A Test Subtitle",
-            "authors": "Test Author, Another Author",
-            "thumbnail": "https://example.com/thumbnail.jpg",
-            "publisher": "Test Publisher",
-            "publishedDate": "2023-01-01",
-            "pageCount": 250,
-            "categories": ["Fiction", "Adventure"],
-            "description": "This is a test book description.",
-            "previewLink": "https://example.com/preview",
-            "infoLink": "https://example.com/info",
-        }
+        self.sample_book_data = Volume(
+            id="test_book_id_123",
+            title="Test Book Title",
+            subtitle="A Test Subtitle",
+            authors=("Test Author", "Another Author"),
+            thumbnail="https://example.com/thumbnail.jpg",
+            publisher="Test Publisher",
+            published_date="2023-01-01",
+            page_count=250,
+            categories=("Fiction", "Adventure"),
+            description="This is a test book description.",
+            preview_link="https://example.com/preview",
+            info_link="https://example.com/info",
+        )
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_book_detail_renders_200_and_context(self, mock_fetch):
         """Test that the book detail view renders correctly."""
-        mock_fetch.return_value = {
-            "id": "AkVWPbrWKGEC",
-            "title": "Wuthering heights",
-            "authors": "Emily Bronte",
-            "thumbnail": "http://thumb",
-            "publisher": "Rowman & Littlefield",
-            "publishedDate": "1992-01-01",
-            "pageCount": 206,
-            "categories": ["Poetry"],
-            "description": "Some description.",
-            "previewLink": "http://example.test/preview",
-            "infoLink": "http://example.test/info",
-            "subtitle": "A Nice Subtitle",
-        }
+        mock_fetch.return_value = Volume(
+            id="AkVWPbrWKGEC",
+            title="Wuthering heights",
+            authors=("Emily Bronte",),
+            thumbnail="http://thumb",
+            publisher="Rowman & Littlefield",
+            published_date="1992-01-01",
+            page_count=206,
+            categories=("Poetry",),
+            description="Some description.",
+            preview_link="http://example.test/preview",
+            info_link="http://example.test/info",
+            subtitle="A Nice Subtitle",
+        )
         req = self.rf.get("/books/AkVWPbrWKGEC")
-        resp = book_detail(req, "AkVWPbrWKGEC")
+        resp = async_to_sync(book_detail)(req, "AkVWPbrWKGEC")
         self.assertEqual(resp.status_code, 200)
         self.assertIn(b"Wuthering heights", resp.content)
         self.assertIn(b"Emily Bronte", resp.content)
@@ -63,23 +65,23 @@ class BookDetailViewTests(TestCase):
         self.assertIn(b"A Nice Subtitle", resp.content)
         self.assertIn(b"Rowman &amp; Littlefield", resp.content)
 
-    @patch("books.views.fetch_book_by_id")
+    @patch("books.views.afetch_book_by_id")
     def test_book_detail_caches_volume(self, mock_fetch):
         """Test that the book detail view caches the fetched volume."""
         # First hit -> calls fetch and caches
-        mock_fetch.return_value = {"id": "ID1", "title": "T"}
+        mock_fetch.return_value = Volume(id="ID1", title="T")
         req1 = self.rf.get("/books/ID1")
-        resp1 = book_detail(req1, "ID1")
+        resp1 = async_to_sync(book_detail)(req1, "ID1")
         self.assertEqual(resp1.status_code, 200)
         self.assertEqual(mock_fetch.call_count, 1)
 
         # Second hit -> should be served from cache (no extra fetch)
         req2 = self.rf.get("/books/ID1")
-        resp2 = book_detail(req2, "ID1")
+        resp2 = async_to_sync(book_detail)(req2, "ID1")
         self.assertEqual(resp2.status_code, 200)
         self.assertEqual(mock_fetch.call_count, 1)  # unchanged => cached
 
-    @patch('books.views.fetch_book_by_id')
+    @patch('books.views.afetch_book_by_id')
     def test_book_detail_search_form_inclusion(self, mock_fetch):
         """Test that the book detail page includes the search form."""
         # Mock the API call
@@ -0,0 +1,151 @@
+"""Tests for the Google Books circuit breaker and stale fallbacks."""
+import asyncio
+import time
+from unittest.mock import patch, Mock
+import httpx
+from asgiref.sync import async_to_sync
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import Timeout
+from django.core.cache import cache
+from django.test import TestCase
+from books import breaker, deadline, metrics
+from books.breaker import CircuitBreaker, CircuitOpenError
+from books.client import ahttp_get, http_get
+from books.models import Book
+from books.ratelimit import INTERACTIVE, RateLimitExceeded
+from books.services import fetch_book_by_id, fetch_or_refresh_book
+
+
+class CircuitBreakerTests(TestCase):
+    """State transitions of the cache-backed breaker."""
+    def setUp(self):
+        cache.clear()
+        self.cb = CircuitBreaker("example.test")
+
+    def test_trips_after_threshold_failures(self):
+        """Breaker opens once the failure threshold is reached."""
+        for _ in range(breaker.FAILURE_THRESHOLD):
+            self.assertTrue(self.cb.allow_request())
+            self.cb.record_failure()
+        self.assertEqual(self.cb.state(), breaker.OPEN)
+        self.assertFalse(self.cb.allow_request())
+        self.assertEqual(metrics.get("breaker.example.test.opened"), 1)
+
+    def test_slow_calls_count_as_failures(self):
+        """Calls slower than the latency threshold count as failures."""
+        for _ in range(breaker.FAILURE_THRESHOLD):
+            self.cb.observe(200, breaker.SLOW_CALL_SECONDS + 1)
+        self.assertEqual(self.cb.state(), breaker.OPEN)
+
+    def test_half_open_allows_single_probe_then_closes(self):
+        """After the open period one probe runs; success closes."""
+        # open period already elapsed
+        cache.set("cb:example.test:open_until", time.time() - 1)
+        self.assertEqual(self.cb.state(), breaker.HALF_OPEN)
+        self.assertTrue(self.cb.allow_request())
+        self.assertFalse(self.cb.allow_request())
+        self.cb.record_success()
+        self.assertEqual(self.cb.state(), breaker.CLOSED)
+
+    @patch("books.client.get_session")
+    def test_open_breaker_fails_fast_without_network(self, mock_session):
+        """http_get raises CircuitOpenError and never calls the session."""
+        CircuitBreaker("example.test")._trip("test")
+        with self.assertRaises(CircuitOpenError):
+            http_get("https://example.test/volumes")
+        mock_session.return_value.get.assert_not_called()
+
+    @patch("books.client.ratelimit.acquire")
+    def test_shed_call_gives_back_the_probe(self, mock_acquire):
+        """A probe the rate limiter sheds leaves the slot for the next."""
+        mock_acquire.side_effect = RateLimitExceeded("shed")
+        cache.set("cb:example.test:open_until", time.time() - 1)
+        with self.assertRaises(RateLimitExceeded):
+            http_get("https://example.test/v", priority=INTERACTIVE)
+        self.assertTrue(self.cb.allow_request())
+
+    @patch("books.client.get_session")
+    def test_deadline_timeouts_do_not_count(self, mock_session):
+        """A timeout the request's deadline caused isn't upstream's."""
+        def slow(*args, **kwargs):
+            time.sleep(0.1)
+            raise Timeout()
+        mock_session.return_value.get.side_effect = slow
+
+        with deadline.budget(0.1):
+            with self.assertRaises(Timeout):
+                http_get("https://example.test/v")
+        self.assertIsNone(cache.get("cb:example.test:failures"))
+
+        with self.assertRaises(Timeout):
+            http_get("https://example.test/v")
+        self.assertEqual(cache.get("cb:example.test:failures"), 1)
+
+
+    @patch("books.client.get_session")
+    def test_probe_out_of_deadline_gives_back_the_slot(self, mock_session):
+        """A probe the request's deadline cut short doesn't hold the slot."""
+        def slow(*args, **kwargs):
+            time.sleep(0.1)
+            raise Timeout()
+        mock_session.return_value.get.side_effect = slow
+        cache.set("cb:example.test:open_until", time.time() - 1)
+
+        with deadline.budget(0.1):
+            with self.assertRaises(Timeout):
+                http_get("https://example.test/v")
+        self.assertEqual(self.cb.state(), breaker.HALF_OPEN)
+        self.assertTrue(self.cb.allow_request())
+
+    @patch("books.client.get_async_client")
+    def test_cancelled_probe_gives_back_the_slot(self, mock_get_client):
+        """A probe cancelled mid-call leaves the slot for the next."""
+        async def hang(request):
+            await asyncio.sleep(10)
+        mock_get_client.return_value = httpx.AsyncClient(
+            transport=httpx.MockTransport(hang)
+        )
+        cache.set("cb:example.test:open_until", time.time() - 1)
+
+        async def probe():
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    ahttp_get("https://example.test/v"), 0.05
+                )
+
+        async_to_sync(probe)()
+        self.assertTrue(self.cb.allow_request())
+
+
+class StaleFallbackTests(TestCase):
+    """Local data is served while upstream is unavailable."""
+    def setUp(self):
+        cache.clear()
+        Book.objects.create(
+            id="VOL1", title="Dune", authors=["Frank Herbert"]
+        )
+
+    @patch("books.client.get_session")
+    def test_fetch_book_by_id_falls_back_to_book_row(self, mock_session):
+        """A connection error returns the persisted Book as a stale dict."""
+        mock_session.return_value.get.side_effect = RequestsConnectionError()
+        data = fetch_book_by_id("VOL1")
+        self.assertEqual(data.title, "Dune")
+        self.assertEqual(data.byline, "Frank Herbert")
+        self.assertTrue(data.stale)
+
+    @patch("books.client.get_session")
+    def test_fallback_includes_written_through_details(self, mock_session):
+        """Detail fields stored on the row survive an outage."""
+        Book.objects.filter(pk="VOL1").update(publisher="Chilton")
+        mock_session.return_value.get.side_effect = RequestsConnectionError()
+        self.assertEqual(fetch_book_by_id("VOL1").publisher, "Chilton")
+
+    @patch("books.client.get_session")
+    def test_fetch_or_refresh_keeps_stored_row(self, mock_session):
+        """A stale but hydrated row is returned instead of raising."""
+        mock_session.return_value.get.return_value = Mock(status_code=503)
+        mock_session.return_value.get.return_value.raise_for_status\
+            .side_effect = RequestsConnectionError()
+        book = fetch_or_refresh_book("VOL1", force=True)
+        self.assertEqual(book.title, "Dune")
@@ -0,0 +1,113 @@
+"""Tests for the write-through local catalog on the Book model."""
+from datetime import timedelta
+from unittest.mock import patch, Mock
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from books import keypool
+from books.models import Book
+from books.services import catalog_volume, fetch_book_by_id
+
+PAYLOAD = {
+    "id": "VOL1",
+    "volumeInfo": {
+        "title": "Dune",
+        "subtitle": "Deluxe Edition",
+        "authors": ["Frank Herbert"],
+        "publisher": "Chilton",
+        "publishedDate": "1965",
+        "pageCount": 412,
+        "categories": ["Fiction"],
+        "description": "Arrakis. " * 400,
+        "previewLink": "https://books.google.com/preview",
+        "infoLink": "https://books.google.com/info",
+        "language": "en",
+        "imageLinks": {"thumbnail": "http://books.google.com/thumb"},
+    },
+}
+
+
+@patch.object(keypool, "KEYS", ["fake-key"])
+class CatalogTests(TestCase):
+    """Detail fetches write through and are served back from the DB."""
+    def setUp(self):
+        cache.clear()
+
+    def _respond(self, mock_session):
+        resp = Mock(status_code=200, headers={})
+        resp.json.return_value = PAYLOAD
+        mock_session.return_value.get.return_value = resp
+
+    @patch("books.client.get_session")
+    def test_fetch_writes_through(self, mock_session):
+        """The full payload lands on the Book row."""
+        self._respond(mock_session)
+        fetch_book_by_id("VOL1")
+        book = Book.objects.get(pk="VOL1")
+        self.assertEqual(book.publisher, "Chilton")
+        self.assertEqual(book.page_count, 412)
+        self.assertEqual(book.thumbnail_url, "https://books.google.com/thumb")
+        self.assertIsNotNone(book.detail_fetched_at)
+
+    @patch("books.client.get_session")
+    def test_write_through_keeps_refresh_columns(self, mock_session):
+        """A refresh's ETag written meanwhile survives the write-through."""
+        self._respond(mock_session)
+        Book.objects.create(pk="VOL1", etag='"old"')
+        get_or_create = Book.objects.get_or_create
+
+        def racing(**kwargs):
+            book, created = get_or_create(**kwargs)
+            Book.objects.filter(pk=book.pk).update(
+                etag='"new"', unchanged_refreshes=3
+            )
+            return book, created
+
+        with patch.object(Book.objects, "get_or_create", racing):
+            fetch_book_by_id("VOL1")
+        book = Book.objects.get(pk="VOL1")
+        self.assertEqual((book.etag, book.unchanged_refreshes), ('"new"', 3))
+        self.assertEqual(book.publisher, "Chilton")
+
+    @patch("books.client.get_session")
+    def test_description_is_compressed(self, mock_session):
+        """The long description is stored compressed and round-trips."""
+        self._respond(mock_session)
+        fetch_book_by_id("VOL1")
+        book = Book.objects.get(pk="VOL1")
+        description = PAYLOAD["volumeInfo"]["description"]
+        self.assertEqual(book.description, description)
+        self.assertLess(len(book.description_z), len(description) // 4)
+
+    @patch("books.client.get_session")
+    def test_catalog_volume_matches_fetch(self, mock_session):
+        """A fresh row renders the same dict the fetch returned."""
+        self._respond(mock_session)
+        fetched = fetch_book_by_id("VOL1")
+        self.assertEqual(catalog_volume("VOL1"), fetched)
+
+    def test_catalog_volume_ignores_stale_rows(self):
+        """Rows past the TTL (or never detailed) go back upstream."""
+        Book.objects.create(id="OLD", title="Old")
+        self.assertIsNone(catalog_volume("OLD"))
+        Book.objects.filter(pk="OLD").update(
+            detail_fetched_at=timezone.now() - timedelta(days=2)
+        )
+        self.assertIsNone(catalog_volume("OLD", ttl_minutes=60))
+
+    @patch("books.views.afetch_book_by_id")
+    def test_detail_renders_from_catalog(self, mock_fetch):
+        """A cache miss with a fresh row makes no upstream call."""
+        book = Book.objects.create(
+            id="VOL2", title="Emma", publisher="Murray",
+            detail_fetched_at=timezone.now(),
+        )
+        book.description = "A novel."
+        book.save()
+
+        resp = self.client.get(reverse("book_detail", args=["VOL2"]))
+
+        self.assertContains(resp, "Murray")
+        self.assertContains(resp, "A novel.")
+        mock_fetch.assert_not_called()
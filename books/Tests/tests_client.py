@@ -0,0 +1,33 @@
+"""Tests for the shared Google Books HTTP client."""
+from unittest.mock import patch, Mock
+from django.test import SimpleTestCase
+from books import client
+
+
+class SharedSessionTests(SimpleTestCase):
+    """Unit tests for the pooled session and `http_get` wrapper."""
+    def setUp(self):
+        """Reset the process-wide session between tests."""
+        client._session = None
+        self.addCleanup(setattr, client, "_session", None)
+
+    def test_get_session_is_reused(self):
+        """The same session object is returned on every call."""
+        self.assertIs(client.get_session(), client.get_session())
+
+    def test_adapter_has_pool_and_retry_policy(self):
+        """HTTPS adapter is pooled and retries 429/5xx responses."""
+        adapter = client.get_session().get_adapter("https://example.test")
+        self.assertEqual(adapter._pool_maxsize, client.POOL_SIZE)
+        self.assertEqual(adapter.max_retries.total, client.MAX_RETRIES)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+
+    @patch("books.client.get_session")
+    def test_http_get_uses_configured_timeout(self, mock_session):
+        """Calls default to GOOGLE_BOOKS_TIMEOUT when none is given."""
+        mock_session.return_value.get.return_value = Mock(status_code=200)
+        client.http_get("https://example.test", params={"q": "x"})
+        kwargs = mock_session.return_value.get.call_args.kwargs
+        self.assertEqual(kwargs["timeout"], client.DEFAULT_TIMEOUT)
+        self.assertEqual(kwargs["params"], {"q": "x"})
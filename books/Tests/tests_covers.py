@@ -0,0 +1,218 @@
+"""Tests for the on-disk cover store and the cover proxy using it."""
+import asyncio
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+import httpx
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from books import covers, missing, views
+from books.covers import CoverStore
+
+
+class CoverStoreTests(TestCase):
+    """Content-addressed files, a shared index and LRU eviction."""
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.store = CoverStore(self.dir.name, max_bytes=1000)
+
+    def test_put_then_load(self):
+        """Bytes come back from a file named by their hash."""
+        cover = self.store.put("VOL1", b"img", "image/jpeg")
+        got, content = self.store.load("VOL1")
+        self.assertEqual((got, content), (cover, b"img"))
+        self.assertEqual(cover.path.name, cover.digest)
+        self.assertIsNone(self.store.load("VOL2"))
+
+    def test_identical_covers_share_one_file(self):
+        """Two volumes with the same image store it once."""
+        a = self.store.put("VOL1", b"placeholder", "image/png")
+        b = self.store.put("VOL2", b"placeholder", "image/png")
+        self.assertEqual(a.path, b.path)
+        self.assertEqual(self.store.total_bytes(), len(b"placeholder"))
+
+    def test_index_is_shared_between_instances(self):
+        """Another worker's store sees what this one wrote."""
+        self.store.put("VOL1", b"img", "image/jpeg")
+        other = CoverStore(self.dir.name, max_bytes=1000)
+        self.assertEqual(other.load("VOL1")[1], b"img")
+
+    def test_least_recently_used_covers_are_evicted(self):
+        """Going over the limit drops the least recently served cover."""
+        clock = iter([1, 2, 1000, 1001])
+        with patch("books.covers.time.time", lambda: next(clock)):
+            self.store.put("READ", b"r" * 400, "image/jpeg")
+            unread = self.store.put("UNREAD", b"u" * 400, "image/jpeg")
+            self.store.get("READ")
+            self.store.put("NEW", b"n" * 400, "image/jpeg")
+        self.assertIsNone(self.store.get("UNREAD"))
+        self.assertFalse(unread.path.exists())
+        self.assertIsNotNone(self.store.get("READ"))
+        self.assertIsNotNone(self.store.get("NEW"))
+        self.assertLessEqual(self.store.total_bytes(), 1000)
+
+    def test_missing_file_reads_as_a_miss(self):
+        """A file deleted out of band is forgotten, not served."""
+        cover = self.store.put("VOL1", b"img", "image/jpeg")
+        cover.path.unlink()
+        self.assertIsNone(self.store.load("VOL1"))
+        self.assertIsNone(self.store.get("VOL1"))
+
+    def test_restoring_same_bytes_keeps_stored_at(self):
+        """Last-Modified only moves when the cover itself changes."""
+        with patch("books.covers.time.time", return_value=100):
+            self.store.put("VOL1", b"img", "image/jpeg")
+        with patch("books.covers.time.time", return_value=200):
+            same = self.store.put("VOL1", b"img", "image/jpeg")
+            changed = self.store.put("VOL1", b"new", "image/jpeg")
+        self.assertEqual(same.stored_at, 100)
+        self.assertEqual(changed.stored_at, 200)
+        self.assertEqual(self.store.get("VOL1").stored_at, 200)
+
+
+async def _body(resp):
+    return b"".join([chunk async for chunk in resp.streaming_content])
+
+
+@patch("books.client.get_async_client")
+class CoverProxyStoreTests(TestCase):
+    """The proxy streams covers and goes upstream once per cover."""
+    def setUp(self):
+        cache.clear()
+        missing.reset()
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.store = CoverStore(self.dir.name, max_bytes=10 ** 6)
+        patcher = patch.object(covers, "_store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse("cover_proxy", args=["VOL1"])
+        self.calls = []
+
+    def _upstream(self, mock_get_client, body, delay=0):
+        async def handler(request):
+            self.calls.append(request)
+            await asyncio.sleep(delay)
+            return httpx.Response(
+                200, content=body, headers={"Content-Type": "image/png"}
+            )
+        mock_get_client.return_value = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        )
+
+    async def test_upstream_is_called_once(self, mock_get_client):
+        """Later requests, even with an empty cache, read the file."""
+        self._upstream(mock_get_client, b"png-bytes")
+
+        first = await self.async_client.get(self.url)
+        self.assertEqual(await _body(first), b"png-bytes")
+        cache.clear()
+        second = await self.async_client.get(self.url)
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(await _body(second), b"png-bytes")
+        self.assertEqual(second["Content-Type"], "image/png")
+        self.assertEqual(second["Content-Length"], "9")
+
+    async def test_streams_in_chunks(self, mock_get_client):
+        """A large cover goes out (and into the store) in pieces."""
+        body = b"x" * (views.COVER_CHUNK * 3 + 5)
+        self._upstream(mock_get_client, body)
+
+        resp = await self.async_client.get(self.url)
+        self.assertTrue(resp.streaming)
+        chunks = [chunk async for chunk in resp.streaming_content]
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks), body)
+        self.assertEqual(self.store.load("VOL1")[1], body)
+
+    async def test_abandoned_stream_is_not_stored(self, mock_get_client):
+        """A client that leaves mid-cover leaves no partial file."""
+        self._upstream(mock_get_client, b"x" * (views.COVER_CHUNK * 2))
+
+        resp = await views.cover_proxy(
+            RequestFactory().get(self.url), "VOL1"
+        )
+        # the view's own generator: on a disconnect the event loop's
+        # async-generator finalizer closes it like this
+        chunks = resp._iterator  # pylint: disable=protected-access
+        await anext(chunks)
+        await chunks.aclose()
+
+        self.assertNotIn("VOL1", views._cover_fetches)
+        self.assertIsNone(self.store.get("VOL1"))
+        leftovers = [p for p in Path(self.dir.name).iterdir()
+                     if p.name.startswith(".tmp-")]
+        self.assertEqual(leftovers, [])
+
+    async def test_concurrent_requests_share_one_fetch(
+        self, mock_get_client
+    ):
+        """A request arriving mid-fetch waits and reads the store."""
+        self._upstream(mock_get_client, b"png-bytes", delay=0.2)
+
+        async def fetch(after):
+            await asyncio.sleep(after)
+            return await _body(await self.async_client.get(self.url))
+
+        bodies = await asyncio.gather(fetch(0), fetch(0.05))
+
+        self.assertEqual(bodies, [b"png-bytes", b"png-bytes"])
+        self.assertEqual(len(self.calls), 1)
+
+
+@patch("books.client.get_async_client")
+class CoverRevalidationTests(TestCase):
+    """Stored covers carry validators and matching requests get 304."""
+    def setUp(self):
+        missing.reset()
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.store = CoverStore(self.dir.name, max_bytes=10 ** 6)
+        patcher = patch.object(covers, "_store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse("cover_proxy", args=["VOL1"])
+        with patch("books.covers.time.time", return_value=1_700_000_000):
+            self.cover = self.store.put("VOL1", b"png-bytes", "image/png")
+
+    async def test_stored_cover_has_etag_and_last_modified(self, _):
+        resp = await self.async_client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["ETag"], f'"{self.cover.digest}"')
+        self.assertEqual(resp["Last-Modified"], http_date(1_700_000_000))
+        self.assertEqual(await _body(resp), b"png-bytes")
+
+    async def test_matching_etag_is_304_without_file_or_upstream(
+        self, mock_get_client
+    ):
+        """Revalidation reads the index only."""
+        with patch.object(CoverStore, "open_file") as mock_open:
+            resp = await self.async_client.get(
+                self.url, headers={"If-None-Match": self.cover.etag}
+            )
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.content, b"")
+        self.assertEqual(resp["ETag"], self.cover.etag)
+        self.assertIn("immutable", resp["Cache-Control"])
+        mock_open.assert_not_called()
+        mock_get_client.assert_not_called()
+
+    async def test_if_modified_since(self, _):
+        """Last-Modified works for clients that only send dates."""
+        resp = await self.async_client.get(
+            self.url,
+            headers={"If-Modified-Since": http_date(1_700_000_000)},
+        )
+        self.assertEqual(resp.status_code, 304)
+
+    async def test_other_etag_gets_the_cover(self, _):
+        resp = await self.async_client.get(
+            self.url, headers={"If-None-Match": '"stale"'}
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(await _body(resp), b"png-bytes")
@@ -0,0 +1,143 @@
+"""Tests for the per-request deadline budget."""
+import threading
+import time
+from unittest.mock import patch, Mock
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from books import client, deadline, keypool
+from books.models import Book
+from books.services import fetch_book_by_id, fetch_or_refresh_book
+from books.singleflight import _lock_key, single_flight
+
+
+class BudgetTests(TestCase):
+    """The budget context, middleware and view decorator."""
+    def test_no_budget_outside_requests(self):
+        """Without a budget nothing is capped."""
+        self.assertIsNone(deadline.remaining())
+        self.assertEqual(deadline.clamp(8), 8)
+
+    def test_clamp_caps_at_remaining(self):
+        """Timeouts are capped at the time left."""
+        with deadline.budget(2):
+            self.assertLessEqual(deadline.clamp(8), 2)
+            self.assertEqual(deadline.clamp(0.5), 0.5)
+        self.assertIsNone(deadline.remaining())
+
+    def test_middleware_sets_default_budget(self):
+        """Every request starts with REQUEST_DEADLINE_SECONDS."""
+        seen = []
+
+        def view(request):
+            seen.append(deadline.remaining())
+            return HttpResponse()
+
+        middleware = deadline.RequestDeadlineMiddleware(view)
+        middleware(RequestFactory().get("/"))
+        self.assertAlmostEqual(seen[0], deadline.DEFAULT_BUDGET, delta=0.5)
+
+    def test_decorator_overrides_budget(self):
+        """A view can set its own budget."""
+        @deadline.request_deadline(1)
+        def view(request):
+            return deadline.remaining()
+
+        with deadline.budget(30):
+            self.assertLessEqual(view(RequestFactory().get("/")), 1)
+
+
+@patch.object(keypool, "KEYS", ["fake-key"])
+class DeadlineClientTests(TestCase):
+    """Outbound calls only get the time the request has left."""
+    def setUp(self):
+        cache.clear()
+
+    @patch("books.client.get_session")
+    def test_http_get_timeout_is_capped(self, mock_session):
+        """The per-call timeout never exceeds the remaining budget."""
+        mock_session.return_value.get.return_value = Mock(status_code=200)
+        with deadline.budget(2):
+            client.http_get("https://example.test")
+        timeout = mock_session.return_value.get.call_args.kwargs["timeout"]
+        self.assertLessEqual(timeout, 2)
+
+    @patch("books.client.BACKOFF_FACTOR", 0.01)
+    @patch("books.client.get_session")
+    def test_retries_are_made_here_within_the_budget(self, mock_session):
+        """Under a deadline the adapter doesn't retry; the client does."""
+        mock_session.return_value.get.side_effect = [
+            Mock(status_code=503, headers={}),
+            Mock(status_code=200, headers={}),
+        ]
+        with deadline.budget(2):
+            resp = client.http_get("https://example.test")
+        self.assertEqual(resp.status_code, 200)
+        mock_session.assert_called_with(retries=False)
+        self.assertEqual(mock_session.return_value.get.call_count, 2)
+
+    @patch("books.client.get_session")
+    def test_no_retry_the_budget_cannot_cover(self, mock_session):
+        """A Retry-After beyond the deadline returns the error at once."""
+        mock_session.return_value.get.return_value = Mock(
+            status_code=503, headers={"Retry-After": "30"}
+        )
+        started = time.monotonic()
+        with deadline.budget(1):
+            resp = client.http_get("https://example.test")
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(mock_session.return_value.get.call_count, 1)
+        self.assertLess(time.monotonic() - started, 1)
+
+    @patch("books.client.get_session")
+    def test_spent_budget_fails_fast(self, mock_session):
+        """With no time left the call is not made at all."""
+        with deadline.budget(0):
+            with self.assertRaises(deadline.DeadlineExceeded):
+                client.http_get("https://example.test")
+        mock_session.return_value.get.assert_not_called()
+
+    @patch("books.client.get_session")
+    def test_detail_falls_back_to_local_row(self, mock_session):
+        """A spent budget serves the stored Book like an outage."""
+        Book.objects.create(id="VOL1", title="Dune")
+        with deadline.budget(0):
+            volume = fetch_book_by_id("VOL1")
+        self.assertTrue(volume.stale)
+        self.assertEqual(volume.title, "Dune")
+        mock_session.return_value.get.assert_not_called()
+
+    @patch("books.client.get_session")
+    def test_refresh_keeps_stub_when_budget_spent(self, mock_session):
+        """A status POST out of time still gets its Book row for the FK."""
+        with deadline.budget(0):
+            book = fetch_or_refresh_book("NEWVOL")
+        self.assertEqual(book.pk, "NEWVOL")
+        self.assertTrue(Book.objects.filter(pk="NEWVOL").exists())
+        mock_session.return_value.get.assert_not_called()
+
+    def test_single_flight_wait_is_capped(self):
+        """Waiting on another worker's fetch stops at the deadline."""
+        cache.add(_lock_key("vol:slow"), 1, timeout=30)
+        started = time.monotonic()
+        with deadline.budget(0.2):
+            result = single_flight("vol:slow", lambda: "own fetch")
+        self.assertEqual(result, "own fetch")
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_in_process_follower_wait_is_capped(self):
+        """A follower of a stalled leader in this process stops waiting."""
+        release = threading.Event()
+        leader = threading.Thread(
+            target=single_flight,
+            args=("vol:stuck", lambda: release.wait(5)),
+        )
+        leader.start()
+        self.addCleanup(leader.join)
+        self.addCleanup(release.set)
+        time.sleep(0.05)
+        started = time.monotonic()
+        with deadline.budget(0.2):
+            result = single_flight("vol:stuck", lambda: "own fetch")
+        self.assertEqual(result, "own fetch")
+        self.assertLess(time.monotonic() - started, 2)
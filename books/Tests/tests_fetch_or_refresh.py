@@ -0,0 +1,141 @@
+"""Tests for conditional revalidation in `fetch_or_refresh_book`."""
+from datetime import timedelta
+from unittest.mock import patch, Mock
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from requests.exceptions import HTTPError
+from books.models import Book
+from books.services import ensure_book, fetch_or_refresh_book
+from jobs import queue
+from jobs.models import Job
+
+VOLUME_JSON = {
+    "id": "VOL1",
+    "volumeInfo": {
+        "title": "Dune",
+        "authors": ["Frank Herbert"],
+        "language": "en",
+        "publishedDate": "1965",
+        "imageLinks": {"thumbnail": "http://thumb/dune.jpg"},
+    },
+}
+
+
+def _resp(status_code=200, payload=None, headers=None):
+    """Build a fake requests.Response."""
+    resp = Mock(status_code=status_code, headers=headers or {})
+    resp.json.return_value = payload
+    return resp
+
+
+class ConditionalRevalidationTests(TestCase):
+    """fetch_or_refresh_book sends validators and avoids needless writes."""
+    def setUp(self):
+        cache.clear()
+        self.stale = timezone.now() - timedelta(days=2)
+        self.book = Book.objects.create(
+            id="VOL1",
+            title="Dune",
+            authors=["Frank Herbert"],
+            thumbnail_url="https://thumb/dune.jpg",
+            language="en",
+            published_date_raw="1965",
+            etag='"abc"',
+            last_fetched_at=self.stale,
+        )
+        Book.objects.filter(pk="VOL1").update(updated_at=self.stale)
+
+    @patch("books.client.get_session")
+    def test_304_only_bumps_last_fetched_at(self, mock_session):
+        """A 304 keeps metadata and only touches last_fetched_at."""
+        mock_session.return_value.get.return_value = _resp(304)
+
+        book = fetch_or_refresh_book("VOL1")
+
+        headers = mock_session.return_value.get.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"abc"')
+        book.refresh_from_db()
+        self.assertGreater(book.last_fetched_at, self.stale)
+        self.assertEqual(book.updated_at, self.stale)
+        self.assertEqual(book.title, "Dune")
+
+    @patch("books.client.get_session")
+    def test_unchanged_200_skips_metadata_write(self, mock_session):
+        """An identical 200 payload does not rewrite the row."""
+        mock_session.return_value.get.return_value = _resp(
+            200, VOLUME_JSON, {"ETag": '"abc"'}
+        )
+
+        fetch_or_refresh_book("VOL1")
+
+        book = Book.objects.get(pk="VOL1")
+        self.assertGreater(book.last_fetched_at, self.stale)
+        self.assertEqual(book.updated_at, self.stale)
+
+    @patch("books.client.get_session")
+    def test_changed_200_updates_fields_and_etag(self, mock_session):
+        """Changed metadata and validators are persisted."""
+        payload = {
+            "id": "VOL1",
+            "volumeInfo": dict(VOLUME_JSON["volumeInfo"], title="Dune (2nd)"),
+        }
+        mock_session.return_value.get.return_value = _resp(
+            200, payload, {"ETag": '"def"'}
+        )
+
+        fetch_or_refresh_book("VOL1")
+
+        book = Book.objects.get(pk="VOL1")
+        self.assertEqual(book.title, "Dune (2nd)")
+        self.assertEqual(book.etag, '"def"')
+        self.assertGreater(book.updated_at, self.stale)
+
+    @patch("books.client.get_session")
+    def test_empty_stub_is_fetched_unconditionally(self, mock_session):
+        """Rows without metadata never send validators."""
+        Book.objects.create(id="VOL2", etag='"zzz"')
+        mock_session.return_value.get.return_value = _resp(
+            200, dict(VOLUME_JSON, id="VOL2")
+        )
+
+        book = fetch_or_refresh_book("VOL2")
+
+        self.assertIsNone(
+            mock_session.return_value.get.call_args.kwargs["headers"]
+        )
+        self.assertEqual(book.title, "Dune")
+
+
+class BackgroundHydrationTests(TestCase):
+    """Stubs created by user actions are filled in by the job worker."""
+    def setUp(self):
+        cache.clear()
+
+    @patch("books.client.get_session")
+    def test_hydrate_job_fills_stub(self, mock_session):
+        """The queued job fills the stub in."""
+        ensure_book("VOL3")
+        mock_session.return_value.get.return_value = _resp(
+            200, dict(VOLUME_JSON, id="VOL3")
+        )
+
+        queue.run(queue.claim("test-worker"))
+
+        self.assertEqual(Book.objects.get(pk="VOL3").title, "Dune")
+        self.assertEqual(Job.objects.get().status, Job.Status.DONE)
+
+    @patch("books.client.get_session")
+    def test_failure_keeps_stub_and_retries(self, mock_session):
+        """An upstream error leaves the stub and requeues the job."""
+        ensure_book("VOL4")
+        resp = _resp(404)
+        resp.raise_for_status.side_effect = HTTPError("404")
+        mock_session.return_value.get.return_value = resp
+
+        queue.run(queue.claim("test-worker"))
+
+        self.assertEqual(Book.objects.get(pk="VOL4").title, "")
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertIn("BookFetchError", job.last_error)
@@ -0,0 +1,110 @@
+"""Checks that the `fields` projections match what the parsers read."""
+from unittest.mock import patch, Mock
+from django.core.cache import cache
+from django.test import TestCase
+from books import keypool, services
+from books.volumes import projection_paths
+
+
+class RecordingDict(dict):
+    """Dict that records every key looked up through it."""
+    def __init__(self, data, seen, prefix=""):
+        super().__init__(data)
+        self.seen, self.prefix = seen, prefix
+
+    def get(self, key, default=None):
+        path = f"{self.prefix}{key}"
+        self.seen.add(path)
+        value = super().get(key, default)
+        if isinstance(value, dict):
+            return RecordingDict(value, self.seen, f"{path}.")
+        if isinstance(value, list) and value and isinstance(value[0], dict):
+            return [RecordingDict(v, self.seen, f"{path}.") for v in value]
+        return value
+
+
+def leaves(paths):
+    """Drop paths that are only prefixes of deeper reads."""
+    return {
+        p for p in paths
+        if not any(o.startswith(p + ".") for o in paths)
+    }
+
+
+VOLUME_INFO = {
+    "title": "T",
+    "authors": ["A"],
+    # no thumbnail so the smallThumbnail fallback is exercised too
+    "imageLinks": {"thumbnail": None},
+}
+
+
+@patch.object(keypool, "KEYS", ["fake-key"])
+class FieldsProjectionTests(TestCase):
+    """Every projected field is parsed and every parsed field projected."""
+    def setUp(self):
+        cache.clear()
+
+    def _respond(self, mock_session, payload, seen):
+        resp = Mock(status_code=200, headers={})
+        resp.json.return_value = RecordingDict(payload, seen)
+        mock_session.return_value.get.return_value = resp
+        return mock_session.return_value.get
+
+    @patch("books.client.get_session")
+    def test_search_projection(self, mock_session):
+        """search_google_books reads exactly SEARCH_FIELDS."""
+        seen = set()
+        get = self._respond(mock_session, {
+            "totalItems": 1,
+            "items": [{"id": "X", "volumeInfo": VOLUME_INFO}],
+        }, seen)
+
+        services.search_google_books("q")
+
+        self.assertEqual(
+            get.call_args.kwargs["params"]["fields"], services.SEARCH_FIELDS
+        )
+        self.assertEqual(
+            leaves(seen), projection_paths(services.SEARCH_FIELDS)
+        )
+
+    @patch("books.client.get_session")
+    def test_volume_projection(self, mock_session):
+        """fetch_book_by_id reads exactly VOLUME_FIELDS."""
+        seen = set()
+        get = self._respond(
+            mock_session, {"id": "X", "volumeInfo": VOLUME_INFO}, seen
+        )
+
+        services.fetch_book_by_id("X")
+
+        self.assertEqual(
+            get.call_args.kwargs["params"]["fields"], services.VOLUME_FIELDS
+        )
+        self.assertEqual(
+            leaves(seen), projection_paths(services.VOLUME_FIELDS)
+        )
+
+    @patch("books.client.get_session")
+    def test_book_refresh_projection(self, mock_session):
+        """fetch_or_refresh_book reads exactly BOOK_FIELDS."""
+        seen = set()
+        get = self._respond(
+            mock_session, {"id": "X", "volumeInfo": VOLUME_INFO}, seen
+        )
+
+        services.fetch_or_refresh_book("X", force=True)
+
+        self.assertEqual(
+            get.call_args.kwargs["params"]["fields"], services.BOOK_FIELDS
+        )
+        self.assertEqual(
+            leaves(seen), projection_paths(services.BOOK_FIELDS)
+        )
+
+    def test_projection_parser(self):
+        """Sanity check of the fields-syntax expander used above."""
+        self.assertEqual(
+            projection_paths("a,b(c,d/e)"), {"a", "b.c", "b.d.e"}
+        )
@@ -0,0 +1,77 @@
+"""Tests for hedged Google Books requests."""
+import threading
+from unittest.mock import patch, Mock
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from books import hedging, metrics
+from books.hedging import HedgeBudget, LatencyTracker, hedged_call
+
+
+def _warm(host, seconds=0.01):
+    """Give a host enough fast samples to enable hedging."""
+    tracker = LatencyTracker()
+    for _ in range(hedging.MIN_SAMPLES):
+        tracker.record(seconds)
+    hedging._trackers[host] = tracker
+
+
+class HedgingTests(SimpleTestCase):
+    """A slow first request is raced by a second identical one."""
+    def setUp(self):
+        cache.clear()
+        hedging._trackers.clear()
+        budget = HedgeBudget(ratio=1)
+        patcher = patch.object(hedging, "_budget", budget)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_percentile_needs_minimum_samples(self):
+        """No hedge delay is known until enough samples are recorded."""
+        tracker = LatencyTracker()
+        tracker.record(0.2)
+        self.assertIsNone(tracker.percentile(95))
+        for i in range(hedging.MIN_SAMPLES):
+            tracker.record(i / 100)
+        self.assertGreaterEqual(tracker.percentile(95), 0.18)
+
+    def test_slow_primary_is_hedged_and_hedge_wins(self):
+        """The second request answers first and its response is used."""
+        _warm("h1")
+        release = threading.Event()
+        slow, fast = Mock(name="slow"), Mock(name="fast")
+        calls = iter([lambda: (release.wait(2), slow)[1], lambda: fast])
+
+        result = hedged_call("h1", lambda: next(calls)())
+        release.set()
+
+        self.assertIs(result, fast)
+        self.assertEqual(metrics.get("hedge.fired"), 1)
+        self.assertEqual(metrics.get("hedge.won"), 1)
+
+    def test_fast_primary_is_not_hedged(self):
+        """A primary answering within the delay never triggers a hedge."""
+        _warm("h2", seconds=1)
+        send = Mock(return_value="ok")
+        self.assertEqual(hedged_call("h2", send), "ok")
+        send.assert_called_once()
+        self.assertEqual(metrics.get("hedge.fired"), 0)
+
+    def test_budget_caps_extra_requests(self):
+        """Without credit the slow primary is simply awaited."""
+        _warm("h3")
+        hedging._budget.ratio = 0
+        release = threading.Timer(0.1, lambda: None)
+        send = Mock(side_effect=lambda: (release.join(), "slow")[1])
+        release.start()
+        self.assertEqual(hedged_call("h3", send), "slow")
+        send.assert_called_once()
+        self.assertEqual(metrics.get("hedge.skipped_budget"), 1)
+
+    def test_veto_skips_hedge(self):
+        """may_hedge=False (e.g. no rate-limit token) prevents the hedge."""
+        _warm("h4")
+        done = threading.Event()
+        send = Mock(side_effect=lambda: (done.wait(0.1), "slow")[1])
+        result = hedged_call("h4", send, may_hedge=lambda: False)
+        self.assertEqual(result, "slow")
+        send.assert_called_once()
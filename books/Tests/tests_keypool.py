@@ -0,0 +1,87 @@
+"""Tests for API key rotation and per-key health."""
+from unittest.mock import patch, Mock
+from django.core.cache import cache
+from django.test import TestCase
+from books import keypool
+from books.client import http_get
+from books.ratelimit import INTERACTIVE, RateLimitExceeded
+
+
+@patch.object(keypool, "KEYS", ["key-a", "key-b"])
+class KeyPoolTests(TestCase):
+    """Calls are spread over healthy keys; bad keys cool down."""
+    def setUp(self):
+        cache.clear()
+
+    def _keys_used(self, mock_session):
+        return [
+            c.kwargs["params"]["key"]
+            for c in mock_session.return_value.get.call_args_list
+        ]
+
+    @patch("books.client.get_session")
+    def test_calls_rotate_across_keys(self, mock_session):
+        """Consecutive API calls use different keys."""
+        mock_session.return_value.get.return_value = Mock(status_code=200)
+        for _ in range(4):
+            http_get("https://example.test/v", priority=INTERACTIVE)
+        self.assertEqual(
+            set(self._keys_used(mock_session)), {"key-a", "key-b"}
+        )
+
+    @patch("books.client.get_session")
+    def test_403_takes_key_out_of_rotation(self, mock_session):
+        """A key answering 403 is skipped until its cooldown ends."""
+        keypool.report("key-a", 403)
+        mock_session.return_value.get.return_value = Mock(status_code=200)
+        for _ in range(3):
+            http_get("https://example.test/v", priority=INTERACTIVE)
+        self.assertEqual(set(self._keys_used(mock_session)), {"key-b"})
+
+    @patch("books.client.get_session")
+    def test_all_keys_cooling_down_sheds(self, mock_session):
+        """With no healthy key the call is shed without hitting upstream."""
+        # workers racing can still bench every key
+        for key in ("key-a", "key-b"):
+            cache.set(keypool._cooldown_key(key), 403, timeout=60)
+        with self.assertRaises(RateLimitExceeded):
+            http_get("https://example.test/v", priority=INTERACTIVE)
+        mock_session.return_value.get.assert_not_called()
+
+    def test_key_back_after_cooldown(self):
+        """Once the cooldown entry expires the key is chosen again."""
+        keypool.report("key-a", 429)
+        cache.delete(keypool._cooldown_key("key-a"))
+        chosen = {keypool.choose(), keypool.choose()}
+        self.assertEqual(chosen, {"key-a", "key-b"})
+
+    def test_last_healthy_key_is_never_benched(self):
+        """An error on the only key left keeps it in rotation."""
+        keypool.report("key-a", 403)
+        keypool.report("key-b", 429)
+        self.assertEqual(keypool.choose(), "key-b")
+
+    @patch.object(keypool, "THROTTLE_COOLDOWN", 30)
+    @patch("books.keypool.cache.set")
+    def test_429_cooldown_is_short_and_grows(self, mock_set):
+        """Throttling benches a key briefly, longer each time; 403 long."""
+        for _ in range(3):
+            keypool.report("key-a", 429)
+        keypool.report("key-a", 403)
+        timeouts = [c.kwargs["timeout"] for c in mock_set.call_args_list]
+        self.assertEqual(timeouts, [30, 60, 120, keypool.COOLDOWN_SECONDS])
+
+
+@patch.object(keypool, "KEYS", ["only-key"])
+class SingleKeyTests(TestCase):
+    """A lone key rides out a transient 429."""
+    def setUp(self):
+        cache.clear()
+
+    @patch("books.client.get_session")
+    def test_429_does_not_shed_every_call(self, mock_session):
+        mock_session.return_value.get.return_value = Mock(status_code=429)
+        http_get("https://example.test/v", priority=INTERACTIVE)
+        mock_session.return_value.get.return_value = Mock(status_code=200)
+        resp = http_get("https://example.test/v", priority=INTERACTIVE)
+        self.assertEqual(resp.status_code, 200)
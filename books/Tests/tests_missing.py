@@ -0,0 +1,145 @@
+"""Tests for the negative cache of malformed and missing volume IDs."""
+import tempfile
+from unittest.mock import patch, Mock
+import httpx
+from django.core.cache import cache
+from django.test import TestCase
+from requests.exceptions import HTTPError
+from books import covers, keypool, metrics, missing
+from books.covers import CoverStore
+from books.exceptions import BookFetchError
+from books.missing import BloomFilter
+from books.services import fetch_book_by_id
+
+
+def _not_found(*args, **kwargs):
+    resp = Mock(status_code=404, headers={})
+    resp.raise_for_status.side_effect = HTTPError(response=resp)
+    return resp
+
+
+class VolumeIdTests(TestCase):
+    """Only URL-safe tokens pass as volume IDs."""
+    def test_valid_and_malformed_ids(self):
+        """Real-looking IDs pass; paths, spaces and long junk do not."""
+        self.assertTrue(missing.is_valid_volume_id("zyTCAlFPjgYC"))
+        self.assertTrue(missing.is_valid_volume_id("a_b-C9"))
+        for bad in ("", "a b", "../etc", "x" * 65, "id%00", None):
+            self.assertFalse(missing.is_valid_volume_id(bad), bad)
+
+    def test_malformed_url_is_404_without_io(self):
+        """The URL converter rejects junk before the view runs."""
+        with patch("books.views.astream_get") as mock_get:
+            resp = self.client.get("/books/bad%20id/")
+            self.assertEqual(resp.status_code, 404)
+            resp = self.client.get("/cover/" + "x" * 65)
+            self.assertEqual(resp.status_code, 404)
+        mock_get.assert_not_called()
+
+
+class BloomFilterTests(TestCase):
+    """Membership is exact for added items and rotates out."""
+    def setUp(self):
+        missing.reset()
+
+    def test_no_false_negatives(self):
+        """Every added item is found; most others are not."""
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"id{i}")
+        self.assertTrue(all(f"id{i}" in bloom for i in range(1000)))
+        false_positives = sum(f"other{i}" in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+    def test_ids_are_forgotten_after_two_rotations(self):
+        """An ID survives one rotation and is dropped by the next."""
+        with patch("books.missing.time.monotonic", return_value=0):
+            missing.reset()
+            missing.mark_missing("GONE")
+        with patch("books.missing.time.monotonic",
+                   return_value=missing.TTL):
+            self.assertTrue(missing.is_known_missing("GONE"))
+        with patch("books.missing.time.monotonic",
+                   return_value=2 * missing.TTL):
+            self.assertFalse(missing.is_known_missing("GONE"))
+
+
+@patch.object(keypool, "KEYS", ["fake-key"])
+class KnownMissingTests(TestCase):
+    """A 404 is remembered and repeat requests never go upstream."""
+    def setUp(self):
+        cache.clear()
+        missing.reset()
+
+    @patch("books.client.get_session")
+    def test_fetch_marks_404_and_fails_fast_after(self, mock_session):
+        """The second fetch of a missing ID makes no call."""
+        mock_session.return_value.get.side_effect = _not_found
+        with self.assertRaises(BookFetchError):
+            fetch_book_by_id("GONE")
+        self.assertTrue(missing.is_known_missing("GONE"))
+
+        with self.assertRaises(BookFetchError):
+            fetch_book_by_id("GONE")
+        self.assertEqual(mock_session.return_value.get.call_count, 1)
+
+    @patch("books.views.catalog_volume")
+    @patch("books.views.afetch_book_by_id")
+    def test_detail_for_known_missing_skips_cache_and_db(
+        self, mock_fetch, mock_catalog
+    ):
+        """A known-missing detail page is a 404 without any lookup."""
+        missing.mark_missing("GONE")
+        resp = self.client.get("/books/GONE/")
+        self.assertEqual(resp.status_code, 404)
+        mock_catalog.assert_not_called()
+        mock_fetch.assert_not_called()
+        self.assertEqual(metrics.get("negative_cache.hit"), 1)
+
+    @patch("books.client.get_async_client")
+    def test_cover_404_is_remembered(self, mock_get_client):
+        """An upstream 404 for a cover short-circuits the next request."""
+        store_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(store_dir.cleanup)
+        store = CoverStore(store_dir.name, 10 ** 6)
+        calls = []
+
+        def not_found(request):
+            calls.append(request)
+            return httpx.Response(404)
+
+        mock_get_client.return_value = httpx.AsyncClient(
+            transport=httpx.MockTransport(not_found)
+        )
+        with patch.object(covers, "_store", store):
+            for _ in range(2):
+                resp = self.client.get("/cover/GONE")
+                self.assertEqual(resp.status_code, 404)
+        self.assertEqual(len(calls), 1)
+
+    @patch("books.client.get_session")
+    @patch("books.client.get_async_client")
+    def test_cover_404_does_not_hide_the_volume(
+        self, mock_get_client, mock_session
+    ):
+        """A volume without a cover image is still looked up."""
+        store_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(store_dir.cleanup)
+        mock_get_client.return_value = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(404))
+        )
+        with patch.object(
+            covers, "_store", CoverStore(store_dir.name, 10 ** 6)
+        ):
+            self.assertEqual(self.client.get("/cover/BARE").status_code, 404)
+        mock_session.return_value.get.return_value = Mock(
+            status_code=200,
+            headers={},
+            json=lambda: {"id": "BARE", "volumeInfo": {"title": "Bare"}},
+        )
+
+        book = fetch_book_by_id("BARE")
+
+        self.assertEqual(book.id, "BARE")
+        self.assertFalse(missing.is_known_missing("BARE"))
+        self.assertTrue(missing.is_cover_known_missing("BARE"))
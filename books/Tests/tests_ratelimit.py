@@ -0,0 +1,62 @@
+"""Tests for the shared Google Books rate limiter."""
+from unittest.mock import patch, Mock
+from django.core.cache import cache
+from django.test import TestCase
+from books import keypool, ratelimit
+from books.client import http_get
+from books.ratelimit import (
+    BACKGROUND,
+    INTERACTIVE,
+    RateLimitExceeded,
+    acquire,
+)
+
+
+@patch.object(keypool, "KEYS", ["fake-key"])
+@patch.dict(ratelimit.MAX_WAIT, {INTERACTIVE: 0, BACKGROUND: 0})
+class RateLimiterTests(TestCase):
+    """Token bucket, priorities and daily quota."""
+    def setUp(self):
+        cache.clear()
+
+    def test_interactive_can_drain_bucket_then_is_shed(self):
+        """Interactive calls use the full burst, then get shed."""
+        for _ in range(ratelimit.BURST):
+            acquire(INTERACTIVE)
+        with self.assertRaises(RateLimitExceeded):
+            acquire(INTERACTIVE)
+
+    def test_background_leaves_reserve_for_interactive(self):
+        """Background calls stop at the reserve; interactive still pass."""
+        allowed = ratelimit.BURST - ratelimit.BACKGROUND_RESERVE
+        for _ in range(allowed):
+            acquire(BACKGROUND)
+        with self.assertRaises(RateLimitExceeded):
+            acquire(BACKGROUND)
+        acquire(INTERACTIVE)
+
+    @patch.object(ratelimit, "DAILY_QUOTA", 10)
+    def test_daily_quota_sheds_background_first(self):
+        """Background hits its share of the daily quota before interactive."""
+        cache.set(ratelimit._day_key(), 8)
+        with self.assertRaises(RateLimitExceeded):
+            acquire(BACKGROUND)
+        acquire(INTERACTIVE)
+        acquire(INTERACTIVE)
+        with self.assertRaises(RateLimitExceeded):
+            acquire(INTERACTIVE)
+
+    @patch("books.client.get_session")
+    def test_upstream_429_empties_bucket(self, mock_session):
+        """A 429 from upstream drains the shared bucket."""
+        mock_session.return_value.get.return_value = Mock(status_code=429)
+        http_get("https://example.test/volumes", priority=INTERACTIVE)
+        with self.assertRaises(RateLimitExceeded):
+            acquire(INTERACTIVE)
+
+    @patch("books.client.get_session")
+    def test_calls_without_priority_skip_limiter(self, mock_session):
+        """Non-API calls (covers) are not counted against the key."""
+        mock_session.return_value.get.return_value = Mock(status_code=200)
+        http_get("https://example.test/cover")
+        self.assertIsNone(cache.get(ratelimit.BUCKET_KEY))
@@ -0,0 +1,98 @@
+"""Tests for the adaptive-TTL bulk refresh and `refresh_books`."""
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch, Mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from requests.exceptions import HTTPError
+from activity.models import ReadingStatus
+from books import keypool, refresh
+from books.models import Book
+from books.refresh import refresh_stale, refresh_ttl
+
+User = get_user_model()
+
+
+def _not_modified(*args, **kwargs):
+    return Mock(status_code=304, headers={})
+
+
+class RefreshTTLTests(TestCase):
+    """Hot books refresh often, cold ones back off."""
+    def test_hot_books_use_hot_ttl(self):
+        """Enough activity shortens the TTL."""
+        self.assertEqual(refresh_ttl(refresh.HOT_ACTIVITY, 5), refresh.HOT_TTL)
+
+    def test_active_books_use_base_ttl(self):
+        """Some activity keeps the base TTL, whatever the history."""
+        self.assertEqual(refresh_ttl(1, 5), refresh.BASE_TTL)
+
+    def test_cold_books_back_off_exponentially(self):
+        """Each unchanged refresh doubles a cold book's TTL, up to MAX."""
+        self.assertEqual(refresh_ttl(0, 0), refresh.BASE_TTL)
+        self.assertEqual(refresh_ttl(0, 2), refresh.BASE_TTL * 4)
+        self.assertEqual(refresh_ttl(0, 50), refresh.MAX_TTL)
+
+
+@patch.object(keypool, "KEYS", ["fake-key"])
+class RefreshStaleTests(TestCase):
+    """`refresh_stale` revalidates exactly the due rows."""
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.user = User.objects.create_user(username="u", password="pw")
+        # hot (tests use HOT_ACTIVITY=1): fetched 7h ago, past HOT_TTL
+        hot = Book.objects.create(
+            id="HOT", title="Hot", etag='"h"',
+            last_fetched_at=now - timedelta(hours=7),
+        )
+        ReadingStatus.objects.create(user=self.user, book=hot)
+        # cold with 3 unchanged refreshes: 2 days old, TTL is 8 days
+        Book.objects.create(
+            id="COLD", title="Cold", unchanged_refreshes=3,
+            last_fetched_at=now - timedelta(days=2),
+        )
+        # stubs are always due
+        Book.objects.create(id="STUB")
+
+    @patch.object(refresh, "HOT_ACTIVITY", 1)
+    @patch("books.client.get_session")
+    def test_refreshes_due_rows_only(self, mock_session):
+        """Hot and stub rows go upstream; the backed-off cold row does not."""
+        mock_session.return_value.get.side_effect = _not_modified
+
+        report = refresh_stale(workers=1)
+
+        calls = mock_session.return_value.get.call_args_list
+        urls = [c.args[0] for c in calls]
+        self.assertEqual(len(urls), 2)
+        self.assertTrue(any(u.endswith("/HOT") for u in urls))
+        self.assertTrue(any(u.endswith("/STUB") for u in urls))
+        self.assertEqual((report.scanned, report.due), (3, 2))
+        self.assertEqual(report.unchanged, 2)
+        self.assertEqual(Book.objects.get(pk="HOT").unchanged_refreshes, 1)
+
+    @patch.object(refresh, "HOT_ACTIVITY", 1)
+    @patch("books.client.get_session")
+    def test_limit_and_dry_run(self, mock_session):
+        """--limit caps the work; a dry run fetches nothing."""
+        mock_session.return_value.get.side_effect = _not_modified
+        self.assertEqual(refresh_stale(workers=1, dry_run=True).due, 2)
+        mock_session.return_value.get.assert_not_called()
+
+        report = refresh_stale(workers=1, limit=1)
+        self.assertEqual(report.refreshed, 1)
+
+    @patch("books.client.get_session")
+    def test_command_reports_throughput_and_errors(self, mock_session):
+        """The command prints counts, rate and errors."""
+        resp = Mock(status_code=503, headers={})
+        resp.raise_for_status.side_effect = HTTPError(response=resp)
+        mock_session.return_value.get.return_value = resp
+        out = StringIO()
+        call_command("refresh_books", "--workers", "1", stdout=out)
+        self.assertIn("errors", out.getvalue())
+        self.assertIn("/s)", out.getvalue())
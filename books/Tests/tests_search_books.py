@@ -12,6 +12,7 @@ Notes:
 """
 import os
 from unittest.mock import patch, Mock
+from asgiref.sync import async_to_sync
 from requests import HTTPError
 from django.core.cache import cache
 from django.http import Http404
@@ -78,7 +79,7 @@ class BookSearchViewTests(TestCase):
         """Initialize a RequestFactory for view calls."""
         self.rf = RequestFactory()
 
-    @patch("books.views.search_google_books")
+    @patch("books.views.asearch_google_books")
     def test_book_search_uses_built_query(self, mock_search):
         """Test that the search view uses the built query."""
         mock_search.return_value = ([], 0)
@@ -86,7 +87,7 @@ class BookSearchViewTests(TestCase):
             "/books/search",
             {"field": "author", "q": "emily bronte"}
             )
-        resp = book_search(req)
+        resp = async_to_sync(book_search)(req)
         self.assertEqual(resp.status_code, 200)
         # ensure build_q result was used
         called_args = mock_search.call_args.args[0]
@@ -98,16 +99,20 @@ class BookSearchViewTests(TestCase):
             "/books/search",
             {"field": "subject", "q": "jellyfish age backwards"}
             )
-        resp = book_search(req)
+        resp = async_to_sync(book_search)(req)
         self.assertEqual(resp.status_code, 200)
         self.assertContains(resp, 'id="no-results"')
 
 
 class SearchGoogleBooksTests(TestCase):
     """Integration tests for the Google Books API search functionality."""
+    def setUp(self):
+        """Clear cache (and breaker state) before each test."""
+        cache.clear()
+
     @patch.dict(os.environ, {"GOOGLE_BOOKS_API_KEY": "fake-key"}, clear=False)
-    @patch("books.services.requests.get")
-    def test_returns_parsed_list_on_200(self, mock_get):
+    @patch("books.client.get_session")
+    def test_returns_parsed_list_on_200(self, mock_session):
         """Test that a successful API call returns a parsed list."""
         mock_resp = Mock(status_code=200)
         mock_resp.json.return_value = {
@@ -131,26 +136,26 @@ class SearchGoogleBooksTests(TestCase):
                 }
                       ]
         }
-        mock_get.return_value = mock_resp
+        mock_session.return_value.get.return_value = mock_resp
 
         books, _total = search_google_books("inauthor:emily bronte")
         self.assertEqual(len(books), 2)
-        self.assertEqual(books[0]["id"], "X")
-        self.assertEqual(books[0]["authors"], "A")
-        self.assertEqual(books[0]["title"], "T")
-        self.assertEqual(books[0]["thumbnail"], "https://t")
-        self.assertEqual(books[1]["id"], "Y")
-        self.assertEqual(books[1]["authors"], "B")
-        self.assertEqual(books[1]["title"], "U")
-        self.assertEqual(books[1]["thumbnail"], "https://u")
+        self.assertEqual(books[0].id, "X")
+        self.assertEqual(books[0].authors, ("A",))
+        self.assertEqual(books[0].title, "T")
+        self.assertEqual(books[0].thumbnail, "https://t")
+        self.assertEqual(books[1].id, "Y")
+        self.assertEqual(books[1].authors, ("B",))
+        self.assertEqual(books[1].title, "U")
+        self.assertEqual(books[1].thumbnail, "https://u")
 
     @patch.dict(os.environ, {"GOOGLE_BOOKS_API_KEY": "fake-key"}, clear=False)
-    @patch("books.services.requests.get")
-    def test_non_200_or_exception_returns_empty(self, mock_get):
+    @patch("books.client.get_session")
+    def test_non_200_or_exception_returns_empty(self, mock_session):
         """Test that non-200 responses or exceptions return an empty list."""
-        mock_resp = Mock()
+        mock_resp = Mock(status_code=500)
         mock_resp.raise_for_status.side_effect = HTTPError("500")
-        mock_get.return_value = mock_resp
+        mock_session.return_value.get.return_value = mock_resp
         books, _total = search_google_books("X")
         self.assertEqual(books, [])
 
@@ -161,31 +166,31 @@ class FetchBookByIdTests(TestCase):
         """Clear cache before each test."""
         cache.clear()
 
-    @patch("books.services.requests.get")
-    def test_fetch_book_by_id_success_maps_fields(self, mock_get):
+    @patch("books.client.get_session")
+    def test_fetch_book_by_id_success_maps_fields(self, mock_session):
         """Test that fetch_book_by_id maps fields correctly."""
         mock_resp = Mock(status_code=200)
         mock_resp.json.return_value = REALISTIC_DETAIL_JSON
-        mock_get.return_value = mock_resp
+        mock_session.return_value.get.return_value = mock_resp
 
         data = fetch_book_by_id("AkVWPbrWKGEC")
-        self.assertEqual(data["id"], "AkVWPbrWKGEC")
-        self.assertEqual(data["title"], "Wuthering heights")
-        self.assertEqual(data["subtitle"], "A Nice Subtitle")
-        self.assertEqual(data["authors"], "Emily Bronte")
-        self.assertEqual(data["publisher"], "Rowman & Littlefield")
-        self.assertEqual(data["publishedDate"], "1992-01-01")
-        self.assertEqual(data["pageCount"], 206)
-        self.assertIn("Poetry", data["categories"])
-        self.assertEqual(data["description"], "Some description.")
-        self.assertTrue(data["thumbnail"].startswith("http"))
-        self.assertEqual(data["previewLink"], "http://example.test/preview")
-
-    @patch("books.services.requests.get")
-    def test_fetch_book_by_id_404_on_non_200(self, mock_get):
+        self.assertEqual(data.id, "AkVWPbrWKGEC")
+        self.assertEqual(data.title, "Wuthering heights")
+        self.assertEqual(data.subtitle, "A Nice Subtitle")
+        self.assertEqual(data.byline, "Emily Bronte")
+        self.assertEqual(data.publisher, "Rowman & Littlefield")
+        self.assertEqual(data.published_date, "1992-01-01")
+        self.assertEqual(data.page_count, 206)
+        self.assertIn("Poetry", data.categories)
+        self.assertEqual(data.description, "Some description.")
+        self.assertTrue(data.thumbnail.startswith("http"))
+        self.assertEqual(data.preview_link, "http://example.test/preview")
+
+    @patch("books.client.get_session")
+    def test_fetch_book_by_id_404_on_non_200(self, mock_session):
         """Test that fetch_book_by_id raises Http404 on non-200."""
-        mock_resp = Mock()
+        mock_resp = Mock(status_code=404)
         mock_resp.raise_for_status.side_effect = HTTPError("404")
-        mock_get.return_value = mock_resp
+        mock_session.return_value.get.return_value = mock_resp
         with self.assertRaises(Http404):
             fetch_book_by_id("nonexistent")
@@ -0,0 +1,67 @@
+"""Tests for the stale-while-revalidate search cache."""
+import time
+from unittest.mock import patch, Mock
+from django.core.cache import cache
+from django.test import TestCase
+from books import keypool, services
+from books.services import search_google_books, search_cache_key
+from books.volumes import SearchHit
+
+SEARCH_JSON = {
+    "totalItems": 1,
+    "items": [
+        {"id": "X", "volumeInfo": {"title": "T", "authors": ["A"]}},
+    ],
+}
+
+
+def _ok():
+    """Fake 200 response with one search hit."""
+    resp = Mock(status_code=200)
+    resp.json.return_value = SEARCH_JSON
+    return resp
+
+
+@patch.object(keypool, "KEYS", ["fake-key"])
+class SearchCacheTests(TestCase):
+    """Repeated searches skip the upstream round trip."""
+    def setUp(self):
+        cache.clear()
+
+    @patch("books.client.get_session")
+    def test_repeat_search_is_served_from_cache(self, mock_session):
+        """Same normalized query/page hits upstream once."""
+        mock_session.return_value.get.return_value = _ok()
+
+        first = search_google_books("subject:Poetry", start_index=0)
+        second = search_google_books("  subject:poetry ", start_index=0)
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_session.return_value.get.call_count, 1)
+
+    @patch("books.services._refresh_executor")
+    def test_stale_entry_is_served_and_refreshed_once(self, mock_executor):
+        """Past the soft TTL: stale data returned, one refresh scheduled."""
+        cache.set(search_cache_key("poetry", 0), {
+            "books": (SearchHit("OLD").to_cache(),),
+            "total": 1,
+            "exhausted": True,
+            "fetched_at": time.time() - services.SEARCH_SOFT_TTL - 1,
+        })
+
+        books, _total = search_google_books("poetry")
+        search_google_books("poetry")
+
+        self.assertEqual(books, [SearchHit("OLD")])
+        self.assertEqual(mock_executor.submit.call_count, 1)
+
+    @patch("books.client.get_session")
+    def test_errors_are_not_cached(self, mock_session):
+        """A failed search is retried on the next request."""
+        failing = Mock(status_code=500)
+        failing.raise_for_status.side_effect = services.HTTPError("500")
+        mock_session.return_value.get.side_effect = [failing, _ok()]
+
+        self.assertEqual(search_google_books("poetry"), ([], 0))
+        books, _total = search_google_books("poetry")
+        self.assertEqual(books[0].id, "X")
@@ -2,6 +2,7 @@
 from unittest.mock import patch
 from django.test import TestCase
 from django.urls import reverse
+from books.volumes import SearchHit
 
 PER_PAGE = 12
 
@@ -9,10 +10,12 @@ PER_PAGE = 12
 def _fake_books(n=PER_PAGE, prefix="B"):
     """Minimal template data: id, title, authors, thumbnail"""
     return [
-        {"id": f"{prefix}{i}",
-         "title": f"Title {i}",
-         "authors": "A",
-         "thumbnail": ""}
+        SearchHit(
+            id=f"{prefix}{i}",
+            title=f"Title {i}",
+            authors=("A",),
+            thumbnail="",
+        )
         for i in range(n)
     ]
 
@@ -38,7 +41,7 @@ class BookSearchPaginationTests(TestCase):
         self.addCleanup(self.p_avg.stop)
         self.addCleanup(self.p_num.stop)
 
-    @patch("books.views.search_google_books")
+    @patch("books.views.asearch_google_books")
     def test_book_search_pagination_first_page(self, mock_search):
         """Verifies that page 1 uses start_index=0."""
         mock_search.return_value = (_fake_books(), 30)
@@ -62,7 +65,7 @@ class BookSearchPaginationTests(TestCase):
         self.assertEqual(page_obj.start_index(), 1)
         self.assertEqual(page_obj.end_index(), PER_PAGE)
 
-    @patch("books.views.search_google_books")
+    @patch("books.views.asearch_google_books")
     def test_book_search_pagination_second_page(self, mock_search):
         """Verifies that page 2 uses start_index=12."""
         mock_search.return_value = (_fake_books(), 30)
@@ -88,7 +91,7 @@ class BookSearchPaginationTests(TestCase):
         self.assertEqual(page_obj.start_index(), PER_PAGE + 1)
         self.assertEqual(page_obj.end_index(), PER_PAGE * 2)
 
-    @patch("books.views.search_google_books")
+    @patch("books.views.asearch_google_books")
     def test_book_search_pagination_context_variables(self, mock_search):
         """Tests that all pagination template variables are set correctly."""
         total = 30
@@ -172,7 +175,7 @@ class GenreBrowsingTests(TestCase):
             resp.content.decode("utf-8"),
             )
 
-    @patch("books.views.search_google_books")
+    @patch("books.views.asearch_google_books")
     def test_genre_tile_redirects_to_search_with_pagination(self, mock_search):
         """
         Tests that clicking a genre tile
@@ -192,7 +195,7 @@ class GenreBrowsingTests(TestCase):
             max_results=PER_PAGE
             )
 
-    @patch("books.views.search_google_books")
+    @patch("books.views.asearch_google_books")
     def test_genre_tile_second_page_maintains_genre_filter(self, mock_search):
         """
         Verifies that pagination preserves
@@ -0,0 +1,102 @@
+"""Tests for over-fetched search windows sliced into local pages."""
+from unittest.mock import patch, Mock
+from django.core.cache import cache
+from django.test import TestCase
+from books import keypool, services
+from books.services import search_google_books
+
+WINDOW = services.SEARCH_WINDOW
+
+
+def _items(start, n, prefix="B"):
+    """Search items with ids ``{prefix}{start}..{prefix}{start+n-1}``."""
+    return [
+        {"id": f"{prefix}{i}", "volumeInfo": {"title": f"T{i}"}}
+        for i in range(start, start + n)
+    ]
+
+
+def _resp(items, total=120):
+    resp = Mock(status_code=200)
+    resp.json.return_value = {"totalItems": total, "items": items}
+    return resp
+
+
+@patch.object(keypool, "KEYS", ["fake-key"])
+class SearchWindowTests(TestCase):
+    """Pages are sliced out of larger cached upstream windows."""
+    def setUp(self):
+        cache.clear()
+
+    @patch("books.client.get_session")
+    def test_pages_in_one_window_cost_one_call(self, mock_session):
+        """Paging through a window makes a single upstream request."""
+        get = mock_session.return_value.get
+        get.return_value = _resp(_items(0, WINDOW))
+
+        pages = [
+            search_google_books("q", start_index=i, max_results=12)[0]
+            for i in range(0, WINDOW, 12)
+        ]
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(get.call_args.kwargs["params"]["maxResults"], WINDOW)
+        self.assertEqual(pages[0][0].id, "B0")
+        self.assertEqual(pages[1][0].id, "B12")
+        self.assertTrue(all(len(p) == 12 for p in pages))
+
+    @patch("books.client.get_session")
+    def test_duplicates_are_topped_up_from_next_window(self, mock_session):
+        """A window shortened by dedupe still yields full pages."""
+        first = _items(0, WINDOW - 1) + _items(0, 1)  # one duplicate
+        get = mock_session.return_value.get
+        get.side_effect = [_resp(first), _resp(_items(WINDOW, WINDOW))]
+
+        last_page_start = WINDOW - 12
+        books, _total = search_google_books(
+            "q", start_index=last_page_start, max_results=12
+        )
+
+        ids = [b.id for b in books]
+        self.assertEqual(len(ids), 12)
+        self.assertEqual(len(set(ids)), 12)
+        self.assertEqual(ids[-1], f"B{WINDOW}")
+        self.assertEqual(
+            get.call_args.kwargs["params"]["startIndex"], WINDOW
+        )
+
+    @patch("books.client.get_session")
+    def test_pages_stay_consistent_across_windows(self, mock_session):
+        """A duplicate in an early window shifts no page boundary."""
+        windows = {
+            start: _items(start, WINDOW) for start in range(0, 120, WINDOW)
+        }
+        windows[0] = _items(0, WINDOW - 1) + _items(0, 1)  # one duplicate
+        mock_session.return_value.get.side_effect = (
+            lambda url, params, **kwargs: _resp(windows[params["startIndex"]])
+        )
+
+        ids = []
+        for start in range(0, 2 * WINDOW + 12, 12):
+            books, _total = search_google_books(
+                "q", start_index=start, max_results=12
+            )
+            self.assertEqual(len(books), 12)
+            ids += [b.id for b in books]
+
+        unique = [f"B{i}" for i in range(120) if i != WINDOW - 1]
+        self.assertEqual(ids, unique[:len(ids)])
+
+    @patch("books.client.get_session")
+    def test_short_window_sets_exact_total(self, mock_session):
+        """When upstream runs out, total reflects what was returned."""
+        mock_session.return_value.get.return_value = _resp(
+            _items(0, 15), total=400
+        )
+
+        page2, total = search_google_books(
+            "q", start_index=12, max_results=12
+        )
+
+        self.assertEqual(len(page2), 3)
+        self.assertEqual(total, 15)
@@ -0,0 +1,84 @@
+"""Tests for single-flight coalescing of upstream fetches."""
+import threading
+import time
+from unittest.mock import Mock
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from books.singleflight import single_flight
+
+
+class SingleFlightTests(SimpleTestCase):
+    """Concurrent callers for one key share a single call."""
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_threads_share_one_call(self):
+        """Only one of many concurrent threads runs the fetch."""
+        calls = []
+        gate = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            gate.wait(1)
+            return {"id": "VOL1"}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(single_flight("vol:1", fetch))
+            )
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        gate.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(r is results[0] for r in results))
+
+    def test_followers_receive_leader_exception(self):
+        """An exception in the leader propagates to waiting followers."""
+        gate = threading.Event()
+
+        def fetch():
+            gate.wait(1)
+            raise ValueError("boom")
+
+        errors = []
+
+        def call():
+            try:
+                single_flight("vol:2", fetch)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        gate.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(errors), 3)
+
+    def test_uses_result_published_by_other_worker(self):
+        """A lock held elsewhere means we wait for its published result."""
+        cache.set("sf:lock:vol:3", 1)
+        cache.set("sf:result:vol:3", ({"id": "VOL3"},))
+        fetch = Mock()
+
+        self.assertEqual(single_flight("vol:3", fetch), {"id": "VOL3"})
+        fetch.assert_not_called()
+
+    def test_fetches_itself_when_other_worker_gives_up(self):
+        """If the other leader releases without a result, we fetch."""
+        cache.set("sf:lock:vol:4", 1)
+        threading.Timer(0.1, cache.delete, args=["sf:lock:vol:4"]).start()
+        fetch = Mock(return_value={"id": "VOL4"})
+
+        self.assertEqual(single_flight("vol:4", fetch), {"id": "VOL4"})
+        fetch.assert_called_once()
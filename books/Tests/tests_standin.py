@@ -0,0 +1,159 @@
+"""Tests for the local Google Books stand-in server."""
+import random
+import tempfile
+import threading
+from unittest.mock import patch, Mock
+import requests
+from django.core.cache import cache
+from django.test import TestCase
+from books import keypool, services, standin
+from books.standin import StandInServer, fixture_key, parse_latency
+
+
+class StandInTestCase(TestCase):
+    """Runs a stand-in on a free port for each test."""
+    server_options = {}
+
+    def setUp(self):
+        cache.clear()
+        self.server = StandInServer(("127.0.0.1", 0), **self.server_options)
+        threading.Thread(target=self.server.serve_forever).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base = self.server.base_url
+
+    def get(self, path, **kwargs):
+        return requests.get(self.base + path, timeout=5, **kwargs)
+
+
+class ParseLatencyTests(TestCase):
+    """Latency specs are milliseconds in, seconds out."""
+    def test_shapes(self):
+        rng = random.Random(1)
+        self.assertEqual(parse_latency("0")(rng), 0)
+        self.assertEqual(parse_latency("120")(rng), 0.12)
+        self.assertTrue(0.02 <= parse_latency("uniform:20,200")(rng) <= 0.2)
+        self.assertGreater(parse_latency("lognormal:80,0.6")(rng), 0)
+
+    def test_bad_specs_raise(self):
+        for spec in ("fast", "uniform:1", "gamma:1,2", "-5", "exp:0"):
+            with self.assertRaises(ValueError, msg=spec):
+                parse_latency(spec)
+
+
+class SyntheticTests(StandInTestCase):
+    """Without fixtures every endpoint answers deterministically."""
+    def test_search_detail_and_cover(self):
+        search = self.get(
+            standin.SEARCH_PATH, params={"q": "dune", "maxResults": 5}
+        )
+        self.assertEqual(search.status_code, 200)
+        items = search.json()["items"]
+        self.assertEqual(len(items), 5)
+        volume_id = items[0]["id"]
+        again = self.get(standin.SEARCH_PATH, params={"q": "dune"})
+        self.assertEqual(again.json()["items"][0]["id"], volume_id)
+
+        detail = self.get(f"{standin.SEARCH_PATH}/{volume_id}")
+        self.assertEqual(detail.json()["id"], volume_id)
+
+        cover = self.get(standin.COVER_PATH, params={"id": volume_id})
+        self.assertEqual(cover.headers["Content-Type"], "image/png")
+        self.assertTrue(cover.content.startswith(b"\x89PNG"))
+
+    def test_etag_revalidation(self):
+        """A matching If-None-Match is answered 304."""
+        path = f"{standin.SEARCH_PATH}/VOL1"
+        etag = self.get(path).headers["ETag"]
+        resp = self.get(path, headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(self.server.stats["not_modified"], 1)
+
+    @patch.object(keypool, "KEYS", ["fake-key"])
+    def test_app_client_searches_through_stand_in(self):
+        """The real search path parses the stand-in's payloads."""
+        url = self.base + standin.SEARCH_PATH
+        with patch.object(services, "SEARCH_URL", url):
+            books, total = services.search_google_books("poetry")
+        self.assertEqual(total, services.API_HARD_CAP)
+        self.assertTrue(books[0].title.startswith("Poetry"))
+
+
+class InjectedErrorTests(StandInTestCase):
+    """error_rate=1 turns every answer into the configured error."""
+    server_options = {"error_rate": 1.0, "error_status": 429}
+
+    def test_every_reply_is_the_error(self):
+        resp = self.get(standin.SEARCH_PATH, params={"q": "x"})
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(self.server.stats["injected"], 1)
+
+
+class RecordReplayTests(TestCase):
+    """Recorded replies are saved once and replayed without upstream."""
+    def setUp(self):
+        self.fixtures = tempfile.TemporaryDirectory()
+        self.addCleanup(self.fixtures.cleanup)
+
+    def _serve(self, **options):
+        server = StandInServer(
+            ("127.0.0.1", 0), fixtures=self.fixtures.name, **options
+        )
+        threading.Thread(target=server.serve_forever).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_fixture_key_ignores_api_key_and_order(self):
+        self.assertEqual(
+            fixture_key("/v", "q=a&key=SECRET&startIndex=0"),
+            fixture_key("/v", "startIndex=0&q=a"),
+        )
+
+    @patch("books.standin.requests.get")
+    def test_record_then_replay(self, mock_get):
+        mock_get.return_value = Mock(
+            status_code=200,
+            content=b'{"id": "REAL1"}',
+            headers={"Content-Type": "application/json", "ETag": '"e"'},
+        )
+        path = f"{standin.SEARCH_PATH}/REAL1"
+        # requests.get is patched: the test's own calls use a session
+        http = requests.Session()
+        self.addCleanup(http.close)
+        recorder = self._serve(record=True)
+        resp = http.get(f"{recorder.base_url}{path}?key=SECRET", timeout=5)
+        self.assertEqual(resp.json(), {"id": "REAL1"})
+        self.assertEqual(recorder.stats["recorded"], 1)
+        saved = recorder.store.path_for(fixture_key(path, "")).read_text()
+        self.assertNotIn("SECRET", saved)
+
+        replayer = self._serve(strict=True)
+        resp = http.get(replayer.base_url + path, timeout=5)
+        self.assertEqual(resp.json(), {"id": "REAL1"})
+        self.assertEqual(resp.headers["ETag"], '"e"')
+        self.assertEqual(mock_get.call_count, 1)
+
+        missing = http.get(f"{replayer.base_url}{path}X", timeout=5)
+        self.assertEqual(missing.status_code, 404)
+
+    @patch("books.standin.requests.get")
+    def test_quota_errors_are_not_recorded(self, mock_get):
+        """A throttled recording session leaves nothing to replay."""
+        mock_get.return_value = Mock(
+            status_code=429,
+            content=b'{"error": {"code": 429}}',
+            headers={"Content-Type": "application/json"},
+        )
+        path = f"{standin.SEARCH_PATH}/REAL1"
+        http = requests.Session()
+        self.addCleanup(http.close)
+        recorder = self._serve(record=True)
+        resp = http.get(recorder.base_url + path, timeout=5)
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(recorder.stats["failed"], 1)
+        self.assertIsNone(recorder.store.load(fixture_key(path, "")))
+
+    def test_record_needs_fixtures(self):
+        with self.assertRaises(ValueError):
+            StandInServer(("127.0.0.1", 0), record=True)
@@ -0,0 +1,130 @@
+"""Tests for TTL jitter and XFetch early refresh."""
+import tempfile
+import time
+from datetime import timedelta
+from unittest.mock import patch
+import httpx
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from books import covers, keypool, metrics, services, ttl
+from books.covers import CoverStore
+from books.models import Book
+from books.services import search_cache_key, search_google_books
+from books.volumes import SearchHit
+
+
+class JitterTests(TestCase):
+    """TTLs are shortened by at most JITTER."""
+    def test_jitter_stays_within_bounds(self):
+        """Random jitter only ever shortens, by at most JITTER."""
+        values = {ttl.jitter(3600) for _ in range(200)}
+        low = 3600 * (1 - ttl.JITTER)
+        self.assertTrue(all(low <= v <= 3600 for v in values))
+        self.assertGreater(len(values), 1)
+
+    def test_jitter_for_is_stable_per_key(self):
+        """A row's TTL is the same on every check, but differs by row."""
+        self.assertEqual(ttl.jitter_for("A", 3600), ttl.jitter_for("A", 3600))
+        self.assertNotEqual(
+            ttl.jitter_for("A", 3600), ttl.jitter_for("B", 3600)
+        )
+
+
+class XFetchTests(TestCase):
+    """Early refresh becomes likely only close to expiry."""
+    def setUp(self):
+        cache.clear()
+
+    @patch("books.ttl.random.random", return_value=0.5)
+    def test_probability_rises_near_expiry(self, _random):
+        """-ln(0.5) * delta ~ 0.7s: early within that, not before."""
+        now = time.time()
+        self.assertFalse(ttl.should_refresh_early(now + 60, 1, now=now))
+        self.assertTrue(ttl.should_refresh_early(now + 0.5, 1, now=now))
+
+    async def test_cache_get_reports_early_refresh_as_miss(self):
+        """An entry picked for early refresh reads as None and is counted."""
+        await ttl.acache_set("k", "v", 3600, delta=0.1)
+        self.assertEqual(await ttl.acache_get("k", "volume"), "v")
+        with patch("books.ttl.should_refresh_early", return_value=True):
+            self.assertIsNone(await ttl.acache_get("k", "volume"))
+        self.assertEqual(metrics.get("early_refresh.volume"), 1)
+
+    def test_needs_refresh_can_fire_early(self):
+        """A row inside its TTL may still come due, and is counted."""
+        book = Book.objects.create(
+            id="VOL1", title="Dune",
+            last_fetched_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertFalse(book.needs_refresh(1440))
+        with patch("books.ttl.should_refresh_early", return_value=True):
+            self.assertTrue(book.needs_refresh(1440))
+        self.assertEqual(metrics.get("early_refresh.book"), 1)
+
+    @patch.object(keypool, "KEYS", ["fake-key"])
+    @patch("books.services._refresh_executor")
+    def test_search_refreshes_early_in_background(self, mock_executor):
+        """A fresh window picked by XFetch is served and refreshed."""
+        cache.set(search_cache_key("poetry", 0), {
+            "books": (SearchHit("OLD").to_cache(),),
+            "total": 1,
+            "exhausted": True,
+            "fetched_at": time.time(),
+            "delta": 0.2,
+        })
+        with patch("books.ttl.should_refresh_early", return_value=True):
+            books, _total = search_google_books("poetry")
+
+        self.assertEqual(books, [SearchHit("OLD")])
+        self.assertEqual(mock_executor.submit.call_count, 1)
+        self.assertEqual(metrics.get("early_refresh.search"), 1)
+
+    def test_search_hard_ttl_is_jittered(self):
+        """Windows are written with a jittered timeout."""
+        with patch("books.services.cache") as mock_cache, \
+                patch("books.services.http_get") as mock_get:
+            mock_get.return_value.json.return_value = {}
+            services._fetch_and_cache_search(
+                "key", "poetry", 0, priority="background"
+            )
+        timeout = mock_cache.set.call_args.kwargs["timeout"]
+        self.assertLessEqual(timeout, services.SEARCH_HARD_TTL)
+        self.assertGreaterEqual(
+            timeout, services.SEARCH_HARD_TTL * (1 - ttl.JITTER)
+        )
+
+
+class CoverMaxAgeTests(TestCase):
+    """Cover responses carry a fixed 30-day max-age."""
+    def setUp(self):
+        cache.clear()
+        store_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(store_dir.cleanup)
+        patcher = patch.object(
+            covers, "_store", CoverStore(store_dir.name, 10 ** 6)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("books.client.get_async_client")
+    async def test_cover_max_age_is_not_jittered(self, mock_get_client):
+        """Immutable covers need no spread-out expiry."""
+        mock_get_client.return_value = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(
+                200, content=b"img", headers={"Content-Type": "image/jpeg"}
+            ))
+        )
+
+        resp = await self.async_client.get(
+            reverse("cover_proxy", args=["VOL1"])
+        )
+        self.assertEqual(
+            b"".join([chunk async for chunk in resp.streaming_content]),
+            b"img"
+        )
+
+        self.assertEqual(
+            resp["Cache-Control"], "public, max-age=2592000, immutable"
+        )
@@ -0,0 +1,122 @@
+"""Tests for scaled, re-encoded cover variants."""
+import io
+import tempfile
+from unittest import skipUnless
+from unittest.mock import patch
+import httpx
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from books import covers, metrics, missing, variants
+from books.covers import CoverStore
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def _png(width, height):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(out, "PNG")
+    return out.getvalue()
+
+
+async def _body(resp):
+    return b"".join([chunk async for chunk in resp.streaming_content])
+
+
+class NegotiationTests(TestCase):
+    """Widths are whitelisted and JPEG is the fallback format."""
+    def test_parse_width(self):
+        self.assertEqual(variants.parse_width("96"), 96)
+        for bad in (None, "", "97", "abc", "-48"):
+            self.assertIsNone(variants.parse_width(bad), bad)
+
+    def test_srcset_needs_pillow(self):
+        """Without Pillow pages offer no variants."""
+        with patch.object(variants, "Image", None):
+            self.assertEqual(variants.srcset("VOL1"), "")
+
+    @skipUnless(Image, "Pillow is not installed")
+    def test_best_accepted_format(self):
+        self.assertEqual(
+            variants.negotiate("image/webp,*/*")[0], "image/webp"
+        )
+        self.assertEqual(variants.negotiate("*/*")[0], "image/jpeg")
+        self.assertEqual(variants.negotiate(None)[0], "image/jpeg")
+        if "AVIF" in Image.SAVE:
+            self.assertEqual(
+                variants.negotiate("image/avif,image/webp")[0],
+                "image/avif",
+            )
+
+    @skipUnless(Image, "Pillow is not installed")
+    def test_render_scales_down_never_up(self):
+        fmt = variants.negotiate("image/webp")
+        small = variants.render(_png(300, 450), 96, fmt)
+        with Image.open(io.BytesIO(small)) as img:
+            self.assertEqual((img.format, img.size), ("WEBP", (96, 144)))
+        same = variants.render(_png(60, 90), 96, fmt)
+        with Image.open(io.BytesIO(same)) as img:
+            self.assertEqual(img.size, (60, 90))
+
+
+@skipUnless(Image, "Pillow is not installed")
+@patch("books.client.get_async_client")
+class CoverVariantProxyTests(TestCase):
+    """``?w=`` serves a stored, negotiated variant of the cover."""
+    def setUp(self):
+        cache.clear()
+        missing.reset()
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.store = CoverStore(self.dir.name, max_bytes=10 ** 6)
+        patcher = patch.object(covers, "_store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse("cover_proxy", args=["VOL1"]) + "?w=96"
+
+    async def test_variant_is_rendered_once(self, mock_get_client):
+        """The first request renders and stores it; later ones read it."""
+        self.store.put("VOL1", _png(300, 450), "image/png")
+
+        for _ in range(2):
+            resp = await self.async_client.get(
+                self.url, headers={"Accept": "image/webp,*/*"}
+            )
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp["Content-Type"], "image/webp")
+            self.assertEqual(resp["Vary"], "Accept")
+            with Image.open(io.BytesIO(await _body(resp))) as img:
+                self.assertEqual(img.width, 96)
+
+        self.assertEqual(metrics.get("cover.variant.rendered"), 1)
+        self.assertIsNotNone(self.store.get("VOL1@96.webp"))
+        mock_get_client.assert_not_called()
+
+    async def test_variant_revalidates(self, _):
+        self.store.put("VOL1", _png(300, 450), "image/png")
+        first = await self.async_client.get(self.url)
+        again = await self.async_client.get(
+            self.url, headers={"If-None-Match": first["ETag"]}
+        )
+        self.assertEqual(first["Content-Type"], "image/jpeg")
+        self.assertEqual(again.status_code, 304)
+
+    async def test_unstored_original_stands_in_uncached(
+        self, mock_get_client
+    ):
+        """Before the original is stored it is served, marked no-cache."""
+        body = _png(128, 192)
+        mock_get_client.return_value = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(
+                200, content=body, headers={"Content-Type": "image/png"}
+            ))
+        )
+        resp = await self.async_client.get(self.url)
+        self.assertEqual(await _body(resp), body)
+        self.assertEqual(resp["Cache-Control"], "no-cache")
+
+        resp = await self.async_client.get(self.url)
+        self.assertEqual(resp["Content-Type"], "image/jpeg")
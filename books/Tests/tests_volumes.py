@@ -0,0 +1,75 @@
+"""Tests for the typed volume records and the projection-driven parser."""
+from dataclasses import FrozenInstanceError
+from django.test import SimpleTestCase
+from books.volumes import Overlay, SearchHit, Volume, parse
+
+PAYLOAD = {
+    "id": "VOL1",
+    "volumeInfo": {
+        "title": "Dune",
+        "authors": ["Frank Herbert"],
+        "pageCount": 412,
+        "imageLinks": {"thumbnail": "http://books.google.com/thumb"},
+    },
+}
+
+
+class ParseTests(SimpleTestCase):
+    """`parse` reads only the projected paths into a record."""
+    def test_reads_projected_paths(self):
+        """Lists become tuples and cover links are upgraded to https."""
+        volume = parse(
+            PAYLOAD,
+            "id,volumeInfo(title,authors,pageCount,imageLinks/thumbnail)",
+        )
+        self.assertEqual(volume.title, "Dune")
+        self.assertEqual(volume.authors, ("Frank Herbert",))
+        self.assertEqual(volume.page_count, 412)
+        self.assertEqual(volume.cover, "https://books.google.com/thumb")
+
+    def test_unprojected_fields_stay_default(self):
+        """Fields outside the projection are never read."""
+        volume = parse(PAYLOAD, "id,volumeInfo(title)")
+        self.assertIsNone(volume.page_count)
+        self.assertEqual(volume.authors, ())
+
+    def test_volume_id_fills_missing_id(self):
+        """Projections without ``id`` use the caller's volume id."""
+        volume = parse(PAYLOAD, "volumeInfo(title)", volume_id="VOL9")
+        self.assertEqual(volume.id, "VOL9")
+        self.assertIsNone(parse({}, "volumeInfo(title)"))
+
+    def test_unknown_path_raises(self):
+        """A projection the records cannot hold fails loudly."""
+        with self.assertRaises(ValueError):
+            parse(PAYLOAD, "id,volumeInfo(maturityRating)")
+        with self.assertRaises(ValueError):
+            parse(PAYLOAD, "id,volumeInfo(publisher)", SearchHit)
+
+
+class RecordTests(SimpleTestCase):
+    """Records are immutable, cache as tuples and accept overlays."""
+    def test_cache_round_trip(self):
+        """`from_cache(to_cache())` rebuilds an equal record."""
+        volume = Volume(id="VOL1", title="Dune", authors=("F. Herbert",))
+        self.assertIsInstance(volume.to_cache(), tuple)
+        self.assertEqual(Volume.from_cache(volume.to_cache()), volume)
+
+    def test_records_are_frozen(self):
+        """Shared records cannot be mutated by a view."""
+        hit = SearchHit(id="VOL1")
+        with self.assertRaises(FrozenInstanceError):
+            hit.title = "Changed"
+
+    def test_overlay_delegates_to_record(self):
+        """Per-request fields live on the overlay, the rest on the record."""
+        volume = Volume(id="VOL1", title="Dune", authors=("A", "B"))
+        book = Overlay(volume, user_rating=4)
+        book.user_status = "read"
+        self.assertEqual(book.title, "Dune")
+        self.assertEqual(book.byline, "A, B")
+        self.assertEqual(book.user_rating, 4)
+        self.assertIsNone(book.avg_rating)
+        self.assertEqual(volume.to_cache(), Volume(
+            id="VOL1", title="Dune", authors=("A", "B")
+        ).to_cache())
@@ -0,0 +1,96 @@
+"""Tests for cover warming and `warm_covers`."""
+import tempfile
+from io import StringIO
+from unittest.mock import patch, Mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from requests.exceptions import HTTPError
+from books import covers, missing, warming
+from books.covers import CoverStore
+from books.models import Book
+from books.volumes import SearchHit
+from books.warming import warm_covers
+from jobs import queue
+from jobs.models import Job
+
+
+def _cover(url, **kwargs):
+    """Upstream: 404 for GONE, a 503 for DOWN, else a small image."""
+    status = 404 if "id=GONE" in url else 503 if "id=DOWN" in url else 200
+    resp = Mock(
+        status_code=status,
+        content=b"img-" + url.encode(),
+        headers={"Content-Type": "image/jpeg"},
+    )
+    if status != 200:
+        resp.raise_for_status.side_effect = HTTPError(response=resp)
+    return resp
+
+
+@patch("books.client.get_session")
+class WarmCoversTests(TestCase):
+    """Covers not yet stored are fetched once, into the store."""
+    def setUp(self):
+        cache.clear()
+        missing.reset()
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.store = CoverStore(self.dir.name, max_bytes=10 ** 6)
+        patcher = patch.object(covers, "_store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_outcomes_are_counted(self, mock_session):
+        """Stored covers are skipped; 404s are remembered as missing."""
+        mock_session.return_value.get.side_effect = _cover
+        self.store.put("HAVE", b"img", "image/jpeg")
+
+        report = warm_covers(["HAVE", "NEW", "GONE", "DOWN"], workers=2)
+
+        self.assertEqual(
+            (report.fetched, report.cached, report.missing, report.errors),
+            (1, 1, 1, 1),
+        )
+        self.assertIsNotNone(self.store.get("NEW"))
+        self.assertTrue(missing.is_cover_known_missing("GONE"))
+        self.assertFalse(missing.is_known_missing("GONE"))
+        self.assertEqual(mock_session.return_value.get.call_count, 3)
+
+    def test_default_is_catalogued_books_with_thumbnails(self, mock_session):
+        mock_session.return_value.get.side_effect = _cover
+        Book.objects.create(id="THUMB", thumbnail_url="https://x/t.jpg")
+        Book.objects.create(id="BARE")
+
+        report = warm_covers(workers=1, batch_size=1)
+
+        self.assertEqual((report.scanned, report.fetched), (1, 1))
+        self.assertIsNotNone(self.store.get("THUMB"))
+
+    def test_command_reports_counts(self, mock_session):
+        mock_session.return_value.get.side_effect = _cover
+        out = StringIO()
+        call_command("warm_covers", "--ids", "NEW", "DOWN", stdout=out)
+        self.assertIn("1 fetched", out.getvalue())
+        self.assertIn("1 errors", out.getvalue())
+
+    @patch.object(warming, "ON_SEARCH", True)
+    @patch("books.views.asearch_google_books")
+    def test_search_queues_its_cold_covers(self, mock_search, mock_session):
+        """The rendered page's uncached covers are warmed by a job."""
+        mock_session.return_value.get.side_effect = _cover
+        self.store.put("HAVE", b"img", "image/jpeg")
+        mock_search.return_value = ([
+            SearchHit("HAVE", thumbnail="https://x/1.jpg"),
+            SearchHit("NEW", thumbnail="https://x/2.jpg"),
+            SearchHit("BARE"),
+        ], 3)
+
+        for _ in range(2):
+            self.client.get(reverse("book_search"), {"q": "dune"})
+
+        job = Job.objects.get()
+        self.assertEqual(job.args, [["NEW"]])
+        queue.run(queue.claim("test-worker"))
+        self.assertIsNotNone(self.store.get("NEW"))
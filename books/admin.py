@@ -1,6 +1,7 @@
 """Admin interface for managing Book objects in Django."""
 from django.contrib import admin
 from django.utils.html import format_html
+from jobs.queue import enqueue
 from .models import Book
 
 
@@ -36,10 +37,17 @@ class BookAdmin(admin.ModelAdmin):
         "author_list",
         "language",
         "published_date_raw",
+        "subtitle",
+        "publisher",
+        "page_count",
+        "categories",
+        "description_preview",
+        "detail_fetched_at",
         "thumbnail_preview",
         "etag",
         "last_modified",
         "last_fetched_at",
+        "unchanged_refreshes",
     )
     fieldsets = (
         (
@@ -61,6 +69,19 @@ class BookAdmin(admin.ModelAdmin):
                 )
              }
         ),
+        (
+            "Details",
+            {
+                "fields": (
+                    "subtitle",
+                    "publisher",
+                    "page_count",
+                    "categories",
+                    "description_preview",
+                    "detail_fetched_at",
+                )
+            }
+        ),
         (
             "Thumbnail",
             {
@@ -75,13 +96,23 @@ class BookAdmin(admin.ModelAdmin):
                 "fields": (
                     "etag",
                     "last_modified",
-                    "last_fetched_at"
+                    "last_fetched_at",
+                    "unchanged_refreshes",
                     )
             }
         ),
     )
     actions = ("refresh_from_google",)
 
+    # ----- actions -----
+    @admin.action(description="Refresh selected books from Google Books")
+    def refresh_from_google(self, request, queryset):
+        """Queue a forced re-fetch of each selected book."""
+        ids = list(queryset.values_list("pk", flat=True))
+        for pk in ids:
+            enqueue("books.hydrate", pk, True, dedupe_key=f"hydrate:{pk}")
+        self.message_user(request, f"Queued {len(ids)} book(s) for refresh.")
+
     # ----- presenters -----
     def author_list(self, obj: Book):
         """Return a comma-separated list of authors."""
@@ -93,6 +124,12 @@ class BookAdmin(admin.ModelAdmin):
         return "✓" if obj.thumbnail_url else "—"
     has_thumbnail.short_description = "Thumb"
 
+    def description_preview(self, obj: Book):
+        """Return the start of the (decompressed) description."""
+        text = obj.description
+        return (text[:300] + "…") if len(text) > 300 else (text or "—")
+    description_preview.short_description = "Description"
+
     def thumbnail_preview(self, obj: Book):
         """Return a thumbnail image preview."""
         if not obj.thumbnail_url:
@@ -1,8 +1,14 @@
 """ Django app configuration for the books app."""
 from django.apps import AppConfig
+from django.urls import register_converter
 
 
 class BooksConfig(AppConfig):
     """Configuration for the books app."""
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'books'
+
+    def ready(self):
+        # <volume_id:...> is shared by the books and activity URLconfs
+        from books.missing import VolumeIdConverter
+        register_converter(VolumeIdConverter, "volume_id")
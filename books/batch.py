@@ -0,0 +1,90 @@
+"""
+Bulk work over catalogued books, in batches on a bounded thread pool.
+
+:func:`run_batches` is the loop behind both bulk jobs
+(:mod:`books.refresh` and :mod:`books.warming`): it calls a function on
+every item of every batch with up to ``workers`` threads, counts the
+outcomes in a :class:`BatchReport` and reports progress after each
+batch. :func:`keyset_batches` pages a queryset into such batches.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from django.db import close_old_connections
+from django.db.models import Q
+
+
+@dataclass
+class BatchReport:
+    """Running totals of a bulk run; subclasses count their outcomes."""
+    scanned: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def add(self, outcome) -> None:
+        """Count one item's ``outcome``."""
+        raise NotImplementedError
+
+
+def keyset_batches(rows, batch_size, *fields):
+    """
+    Yield ``rows`` in lists of up to ``batch_size``, ordered by
+    ``fields`` (unique together). Keyset pagination keeps each query
+    short, so no cursor stays open while the pool writes.
+
+    ``rows`` is a ``values_list`` whose leading columns are ``fields``
+    (a flat one has just the one field).
+    """
+    rows = rows.order_by(*fields)
+    after = None
+    while True:
+        page = rows if after is None else rows.filter(_past(fields, after))
+        page = list(page[:batch_size])
+        if not page:
+            return
+        last = page[-1]
+        after = last[:len(fields)] if isinstance(last, tuple) else (last,)
+        yield page
+
+
+def _past(fields, values):
+    """Rows after ``values`` in ``fields`` order."""
+    # (a, b) > (x, y) is a > x, or a = x and b > y
+    past = Q()
+    for i, field in enumerate(fields):
+        past |= Q(
+            **dict(zip(fields[:i], values[:i])),
+            **{f"{field}__gt": values[i]},
+        )
+    return past
+
+
+def run_batches(batches, fn, report, *, workers, name, progress=None):
+    """
+    Call ``fn`` on every item of each of ``batches`` with ``workers``
+    threads named ``name`` (inline for one), and ``report.add`` each
+    outcome. ``progress`` is called with the running report after each
+    batch. Returns ``report``.
+    """
+    def in_pool(item):
+        # pool threads are long-lived: drop broken/expired connections
+        close_old_connections()
+        return fn(item)
+
+    started = time.monotonic()
+    pool = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix=name
+    ) if workers > 1 else None
+    try:
+        for batch in batches:
+            outcomes = pool.map(in_pool, batch) if pool else map(fn, batch)
+            for outcome in outcomes:
+                report.add(outcome)
+            report.elapsed = time.monotonic() - started
+            if progress:
+                progress(report)
+    finally:
+        if pool:
+            pool.shutdown()
+    report.elapsed = time.monotonic() - started
+    return report
@@ -0,0 +1,118 @@
+"""
+Circuit breaker for outbound Google Books calls.
+
+State is kept in the default cache, keyed by upstream host, so all
+workers share it:
+- closed: calls go through; errors and slow calls are counted.
+- open: after FAILURE_THRESHOLD failures within WINDOW seconds, calls
+  fail fast with CircuitOpenError for OPEN_SECONDS.
+- half-open: once OPEN_SECONDS pass, a single probe call is let through;
+  success closes the breaker, failure opens it again.
+"""
+import logging
+import time
+from django.conf import settings
+from django.core.cache import cache
+from requests.exceptions import RequestException
+from books import metrics
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = getattr(settings, "GOOGLE_BOOKS_BREAKER_THRESHOLD", 5)
+WINDOW = getattr(settings, "GOOGLE_BOOKS_BREAKER_WINDOW", 60)
+OPEN_SECONDS = getattr(settings, "GOOGLE_BOOKS_BREAKER_OPEN_SECONDS", 30)
+SLOW_CALL_SECONDS = getattr(settings, "GOOGLE_BOOKS_BREAKER_SLOW_SECONDS", 5)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(RequestException):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class CircuitBreaker:
+    """Cache-backed breaker for one upstream host."""
+    def __init__(self, name: str):
+        self.name = name
+        self._failures_key = f"cb:{name}:failures"
+        self._open_until_key = f"cb:{name}:open_until"
+        self._probe_key = f"cb:{name}:probe"
+
+    def state(self) -> str:
+        """Return the current breaker state."""
+        open_until = cache.get(self._open_until_key)
+        if open_until is None:
+            return CLOSED
+        return OPEN if time.time() < open_until else HALF_OPEN
+
+    def allow_request(self) -> bool:
+        """True if a call may go upstream now."""
+        state = self.state()
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and cache.add(
+            self._probe_key, 1, timeout=OPEN_SECONDS
+        ):
+            logger.info("circuit %s half-open: probing upstream", self.name)
+            return True
+        metrics.incr(f"breaker.{self.name}.short_circuit")
+        return False
+
+    def release_probe(self) -> None:
+        """Give back a probe slot taken by a call that never went out."""
+        if self.state() == HALF_OPEN:
+            cache.delete(self._probe_key)
+
+    def record_success(self) -> None:
+        """Note a healthy call; closes the breaker after a good probe."""
+        if self.state() != CLOSED:
+            cache.delete_many([
+                self._open_until_key,
+                self._probe_key,
+                self._failures_key,
+            ])
+            logger.warning("circuit %s closed", self.name)
+            metrics.incr(f"breaker.{self.name}.closed")
+
+    def record_failure(self) -> None:
+        """Note a failed or slow call; may trip the breaker."""
+        if self.state() == HALF_OPEN:
+            self._trip("probe failed")
+            return
+        if not cache.add(self._failures_key, 1, timeout=WINDOW):
+            try:
+                failures = cache.incr(self._failures_key)
+            except ValueError:
+                failures = 1
+                cache.set(self._failures_key, 1, timeout=WINDOW)
+        else:
+            failures = 1
+        if failures >= FAILURE_THRESHOLD and self.state() == CLOSED:
+            self._trip(f"{failures} failures in {WINDOW}s")
+
+    def _trip(self, reason: str) -> None:
+        cache.set(
+            self._open_until_key,
+            time.time() + OPEN_SECONDS,
+            timeout=OPEN_SECONDS + WINDOW
+        )
+        cache.delete_many([self._probe_key, self._failures_key])
+        logger.warning(
+            "circuit %s open for %ss (%s)", self.name, OPEN_SECONDS, reason
+        )
+        metrics.incr(f"breaker.{self.name}.opened")
+
+    def observe(self, status_code: int, elapsed: float) -> None:
+        """Classify a completed call by status and latency."""
+        if status_code >= 500 or status_code == 429:
+            self.record_failure()
+        elif elapsed > SLOW_CALL_SECONDS:
+            logger.info(
+                "slow call to %s (%.2fs) counted as failure",
+                self.name, elapsed
+            )
+            self.record_failure()
+        else:
+            self.record_success()
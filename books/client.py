@@ -0,0 +1,444 @@
+"""
+Shared HTTP client for outbound Google Books calls.
+
+Every worker process keeps a single pooled ``requests.Session`` so that
+search, detail and refresh calls reuse warm keep-alive connections instead
+of paying a new TCP+TLS handshake per request. Async views use
+:func:`ahttp_get`, backed by one pooled ``httpx.AsyncClient`` per event
+loop, so a single ASGI process can keep many upstream calls in flight.
+Both share the same breaker, rate limiter and key pool.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+import weakref
+from urllib.parse import urlparse
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from requests.exceptions import (
+    ConnectionError as RequestsConnectionError,
+    HTTPError,
+    RequestException,
+    Timeout,
+)
+from urllib3.util.retry import Retry
+from books import deadline, hedging, keypool, ratelimit
+from books.breaker import CircuitBreaker, CircuitOpenError
+from books.ratelimit import INTERACTIVE, RateLimitExceeded
+
+# --- Config --------------------------------------------------------
+DEFAULT_TIMEOUT = getattr(settings, "GOOGLE_BOOKS_TIMEOUT", 8)
+POOL_SIZE = getattr(settings, "GOOGLE_BOOKS_POOL_SIZE", 10)
+MAX_RETRIES = getattr(settings, "GOOGLE_BOOKS_MAX_RETRIES", 2)
+BACKOFF_FACTOR = getattr(settings, "GOOGLE_BOOKS_BACKOFF_FACTOR", 0.3)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# connections one async process may hold open to upstream at once
+ASYNC_POOL_SIZE = getattr(settings, "GOOGLE_BOOKS_ASYNC_POOL_SIZE", 100)
+
+# the retrying session, and one without retries for calls that retry
+# by hand under a request deadline
+_sessions = {}
+_session_lock = threading.Lock()
+# an httpx client is bound to the loop it was first used on
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _build_session(retries=True) -> requests.Session:
+    """
+    Create a session with a pooled adapter and, with ``retries``, the
+    retry/backoff policy.
+    """
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        # hand the final response back so callers see raise_for_status()
+        raise_on_status=False,
+    ) if retries else Retry(total=0, read=False, raise_on_status=False)
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(*, retries=True) -> requests.Session:
+    """
+    Return the process-wide session, creating it on first use.
+    Built lazily so each forked gunicorn worker owns its own pool.
+    ``retries=False`` gives the one whose adapter never retries.
+    """
+    session = _sessions.get(retries)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(retries)
+            if session is None:
+                session = _sessions[retries] = _build_session(retries)
+    return session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Return the pooled async client for the running event loop,
+    creating it on first use.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        transport = httpx.AsyncHTTPTransport(
+            # retries connection failures only; statuses are retried below
+            retries=MAX_RETRIES,
+            limits=httpx.Limits(
+                max_connections=ASYNC_POOL_SIZE,
+                max_keepalive_connections=POOL_SIZE,
+            ),
+        )
+        client = httpx.AsyncClient(
+            transport=transport, timeout=DEFAULT_TIMEOUT
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def _admit(url, params, priority):
+    """
+    Checks shared by both clients before a call goes out: request
+    deadline, breaker, rate limiter and key pool.
+    Returns (host, breaker, api_key, params).
+    """
+    deadline.check()
+    host = urlparse(url).hostname or "upstream"
+    breaker = CircuitBreaker(host)
+    if not breaker.allow_request():
+        raise CircuitOpenError(f"circuit open for {breaker.name}")
+
+    api_key = None
+    try:
+        if priority is not None:
+            # never queue for a token longer than the request has left
+            ratelimit.acquire(
+                priority,
+                max_wait=deadline.clamp(ratelimit.MAX_WAIT.get(priority, 0))
+            )
+            if keypool.has_keys():
+                api_key = keypool.choose()
+                if api_key is None:
+                    raise RateLimitExceeded("all API keys are cooling down")
+                params = {**(params or {}), "key": api_key}
+    except BaseException:
+        # the call never went out: don't hold a half-open probe slot
+        breaker.release_probe()
+        raise
+    return host, breaker, api_key, params
+
+
+def _record_failure(breaker, exc):
+    """
+    Count a failed call against the host, unless it timed out because
+    the request's own deadline ran out: a clamped timeout says nothing
+    about upstream, so a probe's slot is just given back.
+    """
+    if isinstance(exc, Timeout):
+        left = deadline.remaining()
+        if left is not None and left < deadline.MIN_CALL_SECONDS:
+            breaker.release_probe()
+            return
+    breaker.record_failure()
+
+
+def _settle(host, breaker, api_key, priority, status_code, elapsed):
+    """Feed a finished call's outcome back to the shared components."""
+    hedging.tracker_for(host).record(elapsed)
+    breaker.observe(status_code, elapsed)
+    if api_key is not None:
+        keypool.report(api_key, status_code)
+    if priority is not None and status_code == 429:
+        ratelimit.penalize()
+
+
+def http_get(url, *, params=None, headers=None, timeout=None,
+             priority=None):
+    """
+    GET ``url`` through the shared session with the configured timeout.
+
+    Calls are guarded by the upstream host's circuit breaker: while it is
+    open this raises :class:`CircuitOpenError` without touching the network.
+    Calls that spend API-key quota pass a ``priority``: they go through the
+    shared rate limiter (which may raise :class:`RateLimitExceeded`) and
+    get a ``key`` param from the rotating key pool. INTERACTIVE calls may
+    be hedged (see :mod:`books.hedging`) when GOOGLE_BOOKS_HEDGE is on.
+
+    The timeout is capped at what is left of the request's deadline
+    (see :mod:`books.deadline`); with none left this raises
+    :class:`~books.deadline.DeadlineExceeded` without calling out.
+    Retries then fit the deadline too (see :func:`_send`).
+    """
+    host, breaker, api_key, params = _admit(url, params, priority)
+    # hedging runs send() on pool threads, which don't inherit the
+    # request's deadline: carry it over
+    context = contextvars.copy_context()
+
+    def send():
+        return context.copy().run(_send, url, params, headers, timeout)
+
+    started = time.monotonic()
+    try:
+        if hedging.HEDGE_ENABLED and priority == INTERACTIVE:
+            resp = hedging.hedged_call(
+                host, send, may_hedge=_hedge_token_available
+            )
+        else:
+            resp = send()
+    except RequestException as e:
+        _record_failure(breaker, e)
+        raise
+    except BaseException:
+        # interrupted before an answer: no verdict, but free the probe
+        breaker.release_probe()
+        raise
+    _settle(
+        host, breaker, api_key, priority,
+        resp.status_code, time.monotonic() - started
+    )
+    return resp
+
+
+def _send(url, params, headers, timeout):
+    """
+    One GET through the shared session. Outside a request the adapter
+    retries; under a deadline urllib3's retries would each get the full
+    timeout and backoff, so the retry/backoff policy runs here instead,
+    re-clamping every attempt and stopping when the deadline could not
+    cover the next one.
+    """
+    if deadline.remaining() is None:
+        return get_session().get(
+            url,
+            params=params,
+            headers=headers,
+            timeout=timeout or DEFAULT_TIMEOUT,
+        )
+    session = get_session(retries=False)
+    attempt = 0
+    while True:
+        deadline.check()
+        try:
+            resp = session.get(
+                url,
+                params=params,
+                headers=headers,
+                timeout=deadline.clamp(timeout or DEFAULT_TIMEOUT),
+            )
+        except RequestsConnectionError:
+            if attempt >= MAX_RETRIES or not _can_wait(_backoff(attempt)):
+                raise
+            time.sleep(_backoff(attempt))
+            attempt += 1
+            continue
+        if resp.status_code not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+            return resp
+        delay = _retry_after(resp)
+        if delay is None:
+            delay = _backoff(attempt)
+        if not _can_wait(delay):
+            return resp
+        resp.close()
+        attempt += 1
+        time.sleep(delay)
+
+
+def _backoff(attempt):
+    """Seconds to wait before retry number ``attempt + 1``."""
+    return BACKOFF_FACTOR * (2 ** attempt)
+
+
+def _can_wait(delay):
+    """Whether the deadline leaves room for ``delay`` and another call."""
+    left = deadline.remaining()
+    return left is None or left > delay + deadline.MIN_CALL_SECONDS
+
+
+async def _asend(url, params, headers, timeout):
+    """
+    One async GET with the sync session's status retry/backoff policy.
+    httpx errors are re-raised as their ``requests`` equivalents so
+    callers handle both clients alike. Retries stop when the request
+    deadline could not cover the backoff.
+    """
+    client = get_async_client()
+    attempt = 0
+    while True:
+        try:
+            resp = await client.get(
+                url,
+                params=params,
+                headers=headers,
+                timeout=deadline.clamp(timeout or DEFAULT_TIMEOUT),
+            )
+        except httpx.HTTPError as e:
+            raise _as_requests_error(e) from e
+        if resp.status_code not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+            return resp
+        delay = _retry_after(resp)
+        if delay is None:
+            delay = _backoff(attempt)
+        if not _can_wait(delay):
+            return resp
+        await resp.aclose()
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+def _as_requests_error(exc):
+    """The ``requests`` exception matching an httpx one."""
+    if isinstance(exc, httpx.TimeoutException):
+        return Timeout(str(exc))
+    if isinstance(exc, httpx.TransportError):
+        return RequestsConnectionError(str(exc))
+    return RequestException(str(exc))
+
+
+def _retry_after(resp):
+    """Seconds from a numeric Retry-After header, or None."""
+    try:
+        return max(0.0, float(resp.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
+
+
+async def ahttp_get(url, *, params=None, headers=None, timeout=None,
+                    priority=None):
+    """
+    Async counterpart of :func:`http_get` returning an ``httpx.Response``.
+
+    Bookkeeping touches the cache (and may queue for a rate-limit token),
+    so it runs in a worker thread; only the network wait stays on the
+    event loop. Use :func:`raise_for_status` on the response.
+    """
+    host, breaker, api_key, params = await sync_to_async(
+        _admit, thread_sensitive=False
+    )(url, params, priority)
+
+    def send():
+        return _asend(url, params, headers, timeout)
+
+    started = time.monotonic()
+    try:
+        if hedging.HEDGE_ENABLED and priority == INTERACTIVE:
+            resp = await hedging.ahedged_call(
+                host,
+                send,
+                may_hedge=sync_to_async(
+                    _hedge_token_available, thread_sensitive=False
+                ),
+            )
+        else:
+            resp = await send()
+    except RequestException as e:
+        await sync_to_async(_record_failure, thread_sensitive=False)(
+            breaker, e
+        )
+        raise
+    except BaseException:
+        # cancelled (e.g. by the request's timeout): free the probe
+        await sync_to_async(breaker.release_probe, thread_sensitive=False)()
+        raise
+    await sync_to_async(_settle, thread_sensitive=False)(
+        host, breaker, api_key, priority,
+        resp.status_code, time.monotonic() - started
+    )
+    return resp
+
+
+async def astream_get(url, *, headers=None, timeout=None):
+    """
+    Async GET that returns as soon as the headers are in, leaving the
+    body unread: iterate ``resp.aiter_bytes()`` and always
+    ``await resp.aclose()``. Guarded by the breaker like
+    :func:`ahttp_get`, but never retried and never spends quota, so it
+    is only for keyless calls (covers).
+    """
+    host, breaker, api_key, _ = await sync_to_async(
+        _admit, thread_sensitive=False
+    )(url, None, None)
+    client = get_async_client()
+    request = client.build_request(
+        "GET",
+        url,
+        headers=headers,
+        timeout=deadline.clamp(timeout or DEFAULT_TIMEOUT),
+    )
+    started = time.monotonic()
+    try:
+        resp = await client.send(request, stream=True)
+    except httpx.HTTPError as e:
+        error = _as_requests_error(e)
+        await sync_to_async(_record_failure, thread_sensitive=False)(
+            breaker, error
+        )
+        raise error from e
+    except BaseException:
+        await sync_to_async(breaker.release_probe, thread_sensitive=False)()
+        raise
+    await sync_to_async(_settle, thread_sensitive=False)(
+        host, breaker, api_key, None,
+        resp.status_code, time.monotonic() - started
+    )
+    return resp
+
+
+def raise_for_status(resp) -> None:
+    """
+    ``requests``-style status check for async responses: raise
+    :class:`HTTPError` carrying the response for 4xx/5xx only.
+    """
+    if resp.status_code >= 400:
+        raise HTTPError(
+            # never put the API key in messages that end up in logs
+            f"{resp.status_code} error for url: "
+            f"{resp.url.copy_remove_param('key')}",
+            response=resp,
+            request=resp.request,
+        )
+
+
+def _hedge_token_available() -> bool:
+    """A hedge spends quota too; only send it if a token is free now."""
+    try:
+        ratelimit.acquire(INTERACTIVE, max_wait=0)
+    except RateLimitExceeded:
+        return False
+    return True
+
+
+def is_unavailable(exc: Exception) -> bool:
+    """
+    True if ``exc`` means upstream could not answer (breaker open,
+    budget spent, timeout, connection error, 429/5xx) rather than "no
+    such volume". Callers use this to decide whether falling back to
+    local data is OK.
+    """
+    if isinstance(exc, (
+        CircuitOpenError,
+        RateLimitExceeded,
+        Timeout,
+        RequestsConnectionError,
+    )):
+        return True
+    if isinstance(exc, HTTPError):
+        status = getattr(exc.response, "status_code", None)
+        return status is None or status == 429 or status >= 500
+    return False
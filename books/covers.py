@@ -0,0 +1,332 @@
+"""
+Persistent, content-addressed store for cover images.
+
+Covers never change, so each one is fetched from upstream once and kept
+on local disk (COVER_STORE_DIR, ideally a mounted volume) for every
+worker process on the machine:
+
+- image bytes live in ``objects/<xx>/<sha256>``, named by their content
+  hash, so identical covers (Google's "image not available" placeholder,
+  say) are stored once;
+- ``index.sqlite3`` maps volume IDs to hashes and records when each was
+  last served. SQLite in WAL mode lets all workers read it concurrently;
+  writes are serialized by its write lock.
+
+Covers can be written chunk by chunk as they stream in
+(:meth:`CoverStore.writer`), so a cover is never held in memory whole.
+
+The store is bounded by COVER_STORE_MAX_BYTES: when a new file pushes
+it over, the least recently served covers are dropped until it is back
+under LOW_WATER of the limit, and their files deleted once no volume
+points at them.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(getattr(
+    settings, "COVER_STORE_DIR", Path(settings.BASE_DIR) / "var" / "covers"
+))
+MAX_BYTES = getattr(settings, "COVER_STORE_MAX_BYTES", 512 * 1024 ** 2)
+# eviction frees down to this share of MAX_BYTES, not just below it
+LOW_WATER = 0.9
+# a hit only rewrites last_used if it is older than this (seconds), so
+# serving a popular cover stays a read
+TOUCH_INTERVAL = 60 * 10
+# where covers come from; the local stand-in (books/standin.py)
+# replaces it for load tests
+UPSTREAM_URL = getattr(
+    settings, "GOOGLE_BOOKS_COVER_URL",
+    "https://books.google.com/books/content"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    content_type TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS covers (
+    volume_id TEXT PRIMARY KEY,
+    digest TEXT NOT NULL REFERENCES blobs (digest),
+    last_used REAL NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS covers_last_used ON covers (last_used);
+CREATE INDEX IF NOT EXISTS covers_digest ON covers (digest);
+"""
+
+
+@dataclass(frozen=True)
+class StoredCover:
+    """Where a stored cover's bytes are, and how to serve them."""
+    digest: str
+    size: int
+    content_type: str
+    path: Path
+    stored_at: float
+
+    @property
+    def etag(self):
+        """Strong validator: the content hash never changes."""
+        return f'"{self.digest}"'
+
+
+class CoverStore:
+    """Cover files under ``root``, at most about ``max_bytes`` of them."""
+    def __init__(self, root, max_bytes):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        # sqlite3 connections must stay on the thread that opened them
+        self._local = threading.local()
+
+    def _db(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.root / "index.sqlite3",
+                timeout=30,
+                isolation_level=None,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _writing(self):
+        """A write transaction; other writers wait for it to finish."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def path_for(self, digest):
+        """The file holding the blob ``digest``."""
+        return self.root / "objects" / digest[:2] / digest
+
+    def get(self, volume_id):
+        """The :class:`StoredCover` for ``volume_id``, or None."""
+        db = self._db()
+        row = db.execute(
+            "SELECT digest, size, content_type, stored_at, last_used"
+            " FROM covers JOIN blobs USING (digest) WHERE volume_id = ?",
+            (volume_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        digest, size, content_type, stored_at, last_used = row
+        now = time.time()
+        if now - last_used > TOUCH_INTERVAL:
+            db.execute(
+                "UPDATE covers SET last_used = ? WHERE volume_id = ?",
+                (now, volume_id),
+            )
+        return StoredCover(
+            digest, size, content_type, self.path_for(digest), stored_at
+        )
+
+    def has(self, volume_id):
+        """Whether ``volume_id`` is stored (without counting as a use)."""
+        return self._db().execute(
+            "SELECT 1 FROM covers WHERE volume_id = ?", (volume_id,)
+        ).fetchone() is not None
+
+    def load(self, volume_id):
+        """``(StoredCover, bytes)`` for ``volume_id``, or None."""
+        opened = self.open(volume_id)
+        if opened is None:
+            return None
+        cover, f = opened
+        with f:
+            return cover, f.read()
+
+    def open(self, volume_id):
+        """``(StoredCover, open binary file)`` for ``volume_id``, or None."""
+        cover = self.get(volume_id)
+        f = self.open_file(volume_id, cover) if cover else None
+        return (cover, f) if f else None
+
+    def open_file(self, volume_id, cover):
+        """Open ``cover``'s file, or None if it has gone."""
+        try:
+            return cover.path.open("rb")
+        except FileNotFoundError:
+            # deleted behind the index's back: treat as never stored
+            logger.warning("Cover file for %s is gone", volume_id)
+            self.forget(volume_id)
+            return None
+
+    def writer(self):
+        """A :class:`CoverWriter` for a cover arriving in chunks."""
+        return CoverWriter(self)
+
+    def put(self, volume_id, content, content_type):
+        """Store ``content`` as the cover of ``volume_id``."""
+        writer = self.writer()
+        writer.write(content)
+        return writer.commit(volume_id, content_type)
+
+    def _commit(self, volume_id, tmp, digest, size, content_type):
+        """Move a finished temp file into place and index it."""
+        path = self.path_for(digest)
+        with self._writing() as db:
+            # checked and moved under the write lock, so eviction
+            # can't delete the file between the two
+            if path.exists():
+                os.unlink(tmp)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp, path)
+            added = db.execute(
+                "INSERT OR IGNORE INTO blobs (digest, size, content_type)"
+                " VALUES (?, ?, ?)",
+                (digest, size, content_type),
+            ).rowcount
+            now = time.time()
+            # re-storing the same bytes keeps the original stored_at,
+            # so Last-Modified only moves when the cover does
+            stored_at = db.execute(
+                "INSERT INTO covers (volume_id, digest, last_used, stored_at)"
+                " VALUES (?, ?, ?, ?) ON CONFLICT (volume_id) DO UPDATE"
+                " SET last_used = excluded.last_used,"
+                " stored_at = CASE WHEN digest = excluded.digest"
+                " THEN stored_at ELSE excluded.stored_at END,"
+                " digest = excluded.digest"
+                " RETURNING stored_at",
+                (volume_id, digest, now, now),
+            ).fetchone()[0]
+            if added:
+                self._evict(db, keep=volume_id)
+        return StoredCover(digest, size, content_type, path, stored_at)
+
+    def forget(self, volume_id):
+        """Drop ``volume_id`` (and its file, if nothing else uses it)."""
+        with self._writing() as db:
+            digest = db.execute(
+                "DELETE FROM covers WHERE volume_id = ? RETURNING digest",
+                (volume_id,),
+            ).fetchone()
+            if digest:
+                self._drop_unused(db, digest[0])
+
+    def total_bytes(self):
+        """Bytes of cover files currently stored."""
+        return self._db().execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()[0]
+
+    def _evict(self, db, *, keep):
+        total = db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * LOW_WATER
+        while total > target:
+            oldest = db.execute(
+                "SELECT volume_id, digest FROM covers WHERE volume_id != ?"
+                " ORDER BY last_used LIMIT 100",
+                (keep,),
+            ).fetchall()
+            if not oldest:
+                return
+            for volume_id, digest in oldest:
+                db.execute(
+                    "DELETE FROM covers WHERE volume_id = ?", (volume_id,)
+                )
+                total -= self._drop_unused(db, digest)
+                if total <= target:
+                    return
+
+    def _drop_unused(self, db, digest):
+        """Delete blob ``digest`` if unreferenced; returns bytes freed."""
+        if db.execute(
+            "SELECT 1 FROM covers WHERE digest = ? LIMIT 1", (digest,)
+        ).fetchone():
+            return 0
+        size = db.execute(
+            "DELETE FROM blobs WHERE digest = ? RETURNING size", (digest,)
+        ).fetchone()
+        self.path_for(digest).unlink(missing_ok=True)
+        return size[0] if size else 0
+
+
+class CoverWriter:
+    """
+    Collects a cover chunk by chunk into a temp file next to the store,
+    hashing as it goes; :meth:`commit` files it under its hash, and
+    :meth:`discard` drops a partial one. Readers never see either.
+    """
+    def __init__(self, store):
+        self.store = store
+        store.root.mkdir(parents=True, exist_ok=True)
+        fd, self.tmp = tempfile.mkstemp(dir=store.root, prefix=".tmp-")
+        self.file = os.fdopen(fd, "wb")
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk):
+        """Append ``chunk``."""
+        self.file.write(chunk)
+        self.hash.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self, volume_id, content_type):
+        """Store what was written as the cover of ``volume_id``."""
+        self.file.close()
+        try:
+            return self.store._commit(  # pylint: disable=protected-access
+                volume_id, self.tmp, self.hash.hexdigest(), self.size,
+                content_type,
+            )
+        except BaseException:
+            self.discard()
+            raise
+
+    def discard(self):
+        """Throw away what was written."""
+        self.file.close()
+        try:
+            os.unlink(self.tmp)
+        except FileNotFoundError:
+            pass
+
+
+def upstream_url(volume_id):
+    """The Google Books URL of ``volume_id``'s zoom=1 cover."""
+    return (
+        f"{UPSTREAM_URL}"
+        f"?id={volume_id}&printsec=frontcover&img=1&"
+        f"zoom=1&edge=curl&source=gbs_api"
+    )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> CoverStore:
+    """The process-wide store at COVER_STORE_DIR (created on first use)."""
+    global _store  # pylint: disable=global-statement
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CoverStore(ROOT, MAX_BYTES)
+    return _store
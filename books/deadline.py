@@ -0,0 +1,110 @@
+"""
+Per-request deadline budget for outbound Google Books calls.
+
+:class:`RequestDeadlineMiddleware` gives every request a budget of
+``REQUEST_DEADLINE_SECONDS``; views can set their own with
+:func:`request_deadline`. The budget lives in a context variable, so it
+follows the request through ``sync_to_async``/``async_to_sync`` and the
+client reads it without threading it through every call:
+- each call's timeout is capped at the time remaining;
+- rate-limit queueing and single-flight waits are capped the same way;
+- once the budget is spent, calls fail fast with
+  :class:`DeadlineExceeded`, a ``Timeout``, so callers fall back to
+  cached or local data exactly as they do when upstream is slow.
+
+Work outside a request (commands, background refreshes) has no budget.
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from requests.exceptions import Timeout
+
+DEFAULT_BUDGET = getattr(settings, "REQUEST_DEADLINE_SECONDS", 10)
+# below this, a call cannot realistically complete; don't start it
+MIN_CALL_SECONDS = 0.05
+
+_deadline = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Timeout):
+    """Raised instead of starting a call the request has no time left for."""
+
+
+@contextmanager
+def budget(seconds):
+    """Run the enclosed code with ``seconds`` to spend (None = unbounded)."""
+    token = _deadline.set(
+        None if seconds is None else time.monotonic() + seconds
+    )
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left in the current budget, or None if there is none."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def clamp(seconds):
+    """``seconds``, capped at the time remaining."""
+    left = remaining()
+    if left is None or seconds is None:
+        return seconds if left is None else left
+    return min(seconds, left)
+
+
+def check():
+    """Raise :class:`DeadlineExceeded` if the budget is (nearly) spent."""
+    left = remaining()
+    if left is not None and left < MIN_CALL_SECONDS:
+        raise DeadlineExceeded("request deadline exceeded")
+
+
+def request_deadline(seconds):
+    """
+    View decorator replacing the default budget with ``seconds``.
+    Works on sync and async views.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def _async_view(*args, **kwargs):
+                with budget(seconds):
+                    return await view(*args, **kwargs)
+            return _async_view
+
+        @functools.wraps(view)
+        def _view(*args, **kwargs):
+            with budget(seconds):
+                return view(*args, **kwargs)
+        return _view
+    return decorator
+
+
+class RequestDeadlineMiddleware:
+    """Start each request's budget at ``REQUEST_DEADLINE_SECONDS``."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with budget(DEFAULT_BUDGET):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with budget(DEFAULT_BUDGET):
+            return await self.get_response(request)
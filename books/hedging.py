@@ -0,0 +1,181 @@
+"""
+Hedged requests for interactive Google Books calls.
+
+If the first request has not answered within the host's recent
+``HEDGE_PERCENTILE`` latency, an identical second request is sent and
+whichever succeeds first is used. Hedges are capped by a per-process
+budget: every hedgeable call earns ``HEDGE_MAX_RATIO`` of a credit and a
+hedge spends one, so at most ~10% (by default) extra load is added.
+
+Latency samples and the budget are per process on purpose: they only
+steer local timing decisions and need no coordination.
+"""
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    wait,
+)
+from django.conf import settings
+from books import metrics
+
+logger = logging.getLogger(__name__)
+
+HEDGE_ENABLED = getattr(settings, "GOOGLE_BOOKS_HEDGE", False)
+HEDGE_PERCENTILE = getattr(settings, "GOOGLE_BOOKS_HEDGE_PERCENTILE", 95)
+HEDGE_MAX_RATIO = getattr(settings, "GOOGLE_BOOKS_HEDGE_MAX_RATIO", 0.1)
+HEDGE_MIN_DELAY = getattr(settings, "GOOGLE_BOOKS_HEDGE_MIN_DELAY", 0.05)
+MIN_SAMPLES = 20
+SAMPLE_SIZE = 200
+MAX_CREDIT = 10
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "GOOGLE_BOOKS_POOL_SIZE", 10) * 2,
+    thread_name_prefix="gbooks-hedge",
+)
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies for one host."""
+    def __init__(self, size: int = SAMPLE_SIZE):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Add one observed latency."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float):
+        """Return the ``pct`` latency, or None until enough samples exist."""
+        with self._lock:
+            if len(self._samples) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+
+class HedgeBudget:
+    """Token budget capping hedges to a fraction of hedgeable calls."""
+    def __init__(self, ratio: float = HEDGE_MAX_RATIO):
+        self.ratio = ratio
+        self._credit = 0.0
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        """Credit one hedgeable call."""
+        with self._lock:
+            self._credit = min(MAX_CREDIT, self._credit + self.ratio)
+
+    def spend(self) -> bool:
+        """Take one hedge's worth of credit if available."""
+        with self._lock:
+            if self._credit >= 1:
+                self._credit -= 1
+                return True
+            return False
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+_budget = HedgeBudget()
+
+
+def tracker_for(host: str) -> LatencyTracker:
+    """Return the latency tracker for ``host``."""
+    with _trackers_lock:
+        return _trackers.setdefault(host, LatencyTracker())
+
+
+def _close(future):
+    """Release the losing response's connection back to the pool."""
+    if future.exception() is None:
+        future.result().close()
+
+
+def hedged_call(host, send, *, may_hedge=lambda: True):
+    """
+    Run ``send()`` and, if it is slower than usual, race a second one.
+
+    ``may_hedge`` is consulted right before hedging (e.g. to take a rate
+    limiter token) and can veto the extra request.
+    """
+    _budget.earn()
+    delay = tracker_for(host).percentile(HEDGE_PERCENTILE)
+    primary = _executor.submit(send)
+    if delay is None:
+        return primary.result()
+
+    done, _ = wait([primary], timeout=max(delay, HEDGE_MIN_DELAY))
+    if done:
+        return primary.result()
+    if not _budget.spend():
+        metrics.incr("hedge.skipped_budget")
+        return primary.result()
+    if not may_hedge():
+        return primary.result()
+
+    metrics.incr("hedge.fired")
+    hedge = _executor.submit(send)
+    pending = {primary, hedge}
+    winner = None
+    while pending and winner is None:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        winner = next((f for f in done if f.exception() is None), None)
+    if winner is None:
+        # both failed: surface the original request's error
+        return primary.result()
+
+    loser = hedge if winner is primary else primary
+    loser.add_done_callback(_close)
+    if winner is hedge:
+        metrics.incr("hedge.won")
+        logger.debug("hedged request to %s won", host)
+    return winner.result()
+
+
+async def ahedged_call(host, send, *, may_hedge=None):
+    """
+    Async :func:`hedged_call`: ``send`` returns a coroutine and
+    ``may_hedge``, if given, is awaited.
+    """
+    _budget.earn()
+    delay = tracker_for(host).percentile(HEDGE_PERCENTILE)
+    primary = asyncio.ensure_future(send())
+    if delay is None:
+        return await primary
+
+    done, _ = await asyncio.wait(
+        [primary], timeout=max(delay, HEDGE_MIN_DELAY)
+    )
+    if done:
+        return primary.result()
+    if not _budget.spend():
+        await metrics.aincr("hedge.skipped_budget")
+        return await primary
+    if may_hedge is not None and not await may_hedge():
+        return await primary
+
+    await metrics.aincr("hedge.fired")
+    hedge = asyncio.ensure_future(send())
+    pending = {primary, hedge}
+    winner = None
+    while pending and winner is None:
+        done, pending = await asyncio.wait(
+            pending, return_when=asyncio.FIRST_COMPLETED
+        )
+        winner = next((f for f in done if f.exception() is None), None)
+    if winner is None:
+        return primary.result()
+
+    loser = hedge if winner is primary else primary
+    # the loser's response is dropped; cancelling frees its connection
+    loser.cancel()
+    if winner is hedge:
+        await metrics.aincr("hedge.won")
+        logger.debug("hedged request to %s won", host)
+    return winner.result()
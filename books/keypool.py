@@ -0,0 +1,101 @@
+"""
+Pool of Google Books API keys with rotation and per-key health.
+
+Keys come from ``GOOGLE_BOOKS_API_KEYS`` (falling back to the single
+``GOOGLE_BOOKS_API_KEY``). Calls are spread round-robin across healthy
+keys. A key answering 403 (refused or out of quota) is pulled out of
+rotation for ``COOLDOWN_SECONDS``; one answering 429 (throttled) only
+for ``THROTTLE_COOLDOWN``, doubling on repeats up to the same cap. The
+last healthy key is never benched: shedding every call would turn one
+error into an outage, so the rate limiter slows it down instead.
+Cooldowns live in the cache so every worker skips the same exhausted
+key. Keys are only ever logged by fingerprint.
+"""
+import hashlib
+import itertools
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from books import metrics
+
+logger = logging.getLogger(__name__)
+
+KEYS = list(getattr(settings, "GOOGLE_BOOKS_API_KEYS", None) or (
+    [settings.GOOGLE_BOOKS_API_KEY]
+    if getattr(settings, "GOOGLE_BOOKS_API_KEY", None) else []
+))
+COOLDOWN_SECONDS = getattr(settings, "GOOGLE_BOOKS_KEY_COOLDOWN", 60 * 15)
+# first 429 cooldown (seconds); repeats within COOLDOWN_SECONDS double it
+THROTTLE_COOLDOWN = getattr(
+    settings, "GOOGLE_BOOKS_KEY_THROTTLE_COOLDOWN", 30
+)
+UNHEALTHY_STATUSES = (403, 429)
+
+_counter = itertools.count()
+
+
+def fingerprint(key: str) -> str:
+    """Short, non-reversible id for logs, metrics and cache keys."""
+    return hashlib.sha1(key.encode()).hexdigest()[:10]
+
+
+def _cooldown_key(key: str) -> str:
+    return f"gbooks:key:{fingerprint(key)}:cooldown"
+
+
+def _strikes_key(key: str) -> str:
+    return f"gbooks:key:{fingerprint(key)}:strikes"
+
+
+def has_keys() -> bool:
+    """True if at least one API key is configured."""
+    return bool(KEYS)
+
+
+def choose():
+    """
+    Return the next healthy key, or None if every key is cooling down.
+    Only call when :func:`has_keys` is true.
+    """
+    healthy = _healthy()
+    if not healthy:
+        return None
+    return healthy[next(_counter) % len(healthy)]
+
+
+def _healthy():
+    cooling = cache.get_many([_cooldown_key(k) for k in KEYS])
+    return [k for k in KEYS if _cooldown_key(k) not in cooling]
+
+
+def _cooldown(key: str, status_code: int) -> int:
+    """Seconds ``key`` stays out of rotation after ``status_code``."""
+    if status_code != 429:
+        return COOLDOWN_SECONDS
+    strikes = _strikes_key(key)
+    cache.add(strikes, 0, timeout=COOLDOWN_SECONDS)
+    try:
+        count = cache.incr(strikes)
+    except ValueError:  # expired in between
+        count = 1
+    return min(THROTTLE_COOLDOWN * 2 ** (count - 1), COOLDOWN_SECONDS)
+
+
+def report(key: str, status_code: int) -> None:
+    """Record the outcome of a call made with ``key``."""
+    fp = fingerprint(key)
+    metrics.incr(f"keys.{fp}.calls")
+    if status_code in UNHEALTHY_STATUSES:
+        metrics.incr(f"keys.{fp}.errors")
+        if not any(k != key for k in _healthy()):
+            logger.warning(
+                "API key %s answered %s; kept in rotation as the last "
+                "healthy key", fp, status_code
+            )
+            return
+        cooldown = _cooldown(key, status_code)
+        cache.set(_cooldown_key(key), status_code, timeout=cooldown)
+        logger.warning(
+            "API key %s answered %s; out of rotation for %ss",
+            fp, status_code, cooldown
+        )
@@ -0,0 +1,91 @@
+"""
+Run the local Google Books stand-in (see :mod:`books.standin`).
+
+    python manage.py gbooks_standin
+    python manage.py gbooks_standin --fixtures var/gbooks --record
+    python manage.py gbooks_standin --fixtures var/gbooks --strict \\
+        --latency lognormal:80,0.6 --error-rate 0.02
+
+Then start the app with the printed GOOGLE_BOOKS_*_URL variables and
+point a load generator at its search, detail and cover pages.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from books.standin import COVER_PATH, SEARCH_PATH, StandInServer
+
+
+class Command(BaseCommand):
+    """Serve recorded or synthetic Google Books responses locally."""
+    help = (
+        "Local Google Books stand-in with record/replay, injected latency "
+        "and errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--fixtures", default=None,
+            help="Directory of recorded responses to replay.",
+        )
+        parser.add_argument(
+            "--record", action="store_true",
+            help="Fetch requests without a fixture upstream and save them.",
+        )
+        parser.add_argument(
+            "--strict", action="store_true",
+            help="404 requests without a fixture instead of synthesizing.",
+        )
+        parser.add_argument(
+            "--latency", default="0",
+            help="Delay per response in ms: 120, uniform:20,200, "
+                 "normal:100,30, lognormal:80,0.6 or exp:100.",
+        )
+        parser.add_argument(
+            "--error-rate", type=float, default=0.0,
+            help="Share of responses replaced by an error (0-1).",
+        )
+        parser.add_argument(
+            "--error-status", type=int, default=503,
+            help="Status of injected errors (default 503).",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=None,
+            help="Seed latency and error draws for repeatable runs.",
+        )
+
+    def handle(self, *args, **opts):
+        if not 0 <= opts["error_rate"] <= 1:
+            raise CommandError("--error-rate must be between 0 and 1.")
+        try:
+            server = StandInServer(
+                (opts["host"], opts["port"]),
+                fixtures=opts["fixtures"],
+                record=opts["record"],
+                strict=opts["strict"],
+                latency=opts["latency"],
+                error_rate=opts["error_rate"],
+                error_status=opts["error_status"],
+                seed=opts["seed"],
+                verbose=opts["verbosity"] > 1,
+            )
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        base = server.base_url
+        self.stdout.write(f"Google Books stand-in on {base}; set:")
+        self.stdout.write(f"  GOOGLE_BOOKS_SEARCH_URL={base}{SEARCH_PATH}")
+        self.stdout.write(
+            f"  GOOGLE_BOOKS_VOLUME_URL={base}{SEARCH_PATH}/{{}}"
+        )
+        self.stdout.write(f"  GOOGLE_BOOKS_COVER_URL={base}{COVER_PATH}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        served = ", ".join(
+            f"{count} {source}"
+            for source, count in sorted(server.stats.items())
+        )
+        self.stdout.write(f"Served: {served or 'nothing'}.")
@@ -0,0 +1,64 @@
+"""
+Refresh stale Book rows from Google Books.
+
+    python manage.py refresh_books
+    python manage.py refresh_books --workers 8 --limit 500
+    python manage.py refresh_books --dry-run
+
+Which rows are stale follows the adaptive TTLs in :mod:`books.refresh`.
+"""
+from django.core.management.base import BaseCommand
+from books.refresh import refresh_stale
+
+
+class Command(BaseCommand):
+    """Revalidate due books through a bounded thread pool."""
+    help = "Refresh stale books from Google Books (adaptive TTLs)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=4,
+            help="Concurrent upstream calls (default 4).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=200,
+            help="Rows scanned per query (default 200).",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=None,
+            help="Refresh at most this many books.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only count the books that are due.",
+        )
+
+    def handle(self, *args, **opts):
+        def progress(report):
+            self.stdout.write(
+                f"scanned {report.scanned}, due {report.due}, "
+                f"refreshed {report.refreshed}, errors {report.errors} "
+                f"({report.rate:.1f}/s)"
+            )
+
+        report = refresh_stale(
+            workers=max(1, opts["workers"]),
+            batch_size=max(1, opts["batch_size"]),
+            limit=opts["limit"],
+            dry_run=opts["dry_run"],
+            progress=progress if opts["verbosity"] > 1 else None,
+        )
+
+        if opts["dry_run"]:
+            self.stdout.write(
+                f"{report.due} of {report.scanned} scanned books are due."
+            )
+            return
+        summary = (
+            f"Refreshed {report.refreshed} of {report.due} due books in "
+            f"{report.elapsed:.1f}s ({report.rate:.1f}/s): "
+            f"{report.changed} changed, {report.unchanged} unchanged, "
+            f"{report.errors} errors."
+        )
+        style = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(style(summary))
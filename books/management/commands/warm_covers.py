@@ -0,0 +1,54 @@
+"""
+Fetch the covers of catalogued books into the cover store.
+
+    python manage.py warm_covers
+    python manage.py warm_covers --workers 8
+    python manage.py warm_covers --ids zyTCAlFPjgYC dVQ8AAAAYAAJ
+
+Covers already stored are skipped, so re-running only fetches new ones.
+See :mod:`books.warming`.
+"""
+from django.core.management.base import BaseCommand
+from books.warming import warm_covers
+
+
+class Command(BaseCommand):
+    """Warm the cover store through a bounded thread pool."""
+    help = "Fetch covers of catalogued books into the local cover store."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=4,
+            help="Concurrent upstream calls (default 4).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=200,
+            help="Books scanned per query (default 200).",
+        )
+        parser.add_argument(
+            "--ids", nargs="+", default=None,
+            help="Only these volume IDs instead of every catalogued book.",
+        )
+
+    def handle(self, *args, **opts):
+        def progress(report):
+            self.stdout.write(
+                f"scanned {report.scanned}, fetched {report.fetched}, "
+                f"cached {report.cached}, errors {report.errors} "
+                f"({report.rate:.1f}/s)"
+            )
+
+        report = warm_covers(
+            opts["ids"],
+            workers=max(1, opts["workers"]),
+            batch_size=max(1, opts["batch_size"]),
+            progress=progress if opts["verbosity"] > 1 else None,
+        )
+        summary = (
+            f"Warmed {report.scanned} covers in {report.elapsed:.1f}s "
+            f"({report.rate:.1f}/s): {report.fetched} fetched, "
+            f"{report.cached} already stored, {report.missing} missing, "
+            f"{report.errors} errors."
+        )
+        style = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(style(summary))
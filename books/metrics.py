@@ -0,0 +1,41 @@
+"""
+Lightweight counters for the Google Books integration.
+
+Counters live in the default cache so every worker adds to the same
+totals (when a shared cache backend is configured), and each increment
+is also logged at DEBUG for log-based dashboards.
+"""
+import logging
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "metrics:"
+
+
+def incr(name: str, value: int = 1) -> None:
+    """Add ``value`` to the counter ``name``."""
+    key = f"{PREFIX}{name}"
+    try:
+        if not cache.add(key, value, timeout=None):
+            cache.incr(key, value)
+    except ValueError:
+        # evicted between add() and incr()
+        cache.set(key, value, timeout=None)
+    logger.debug("metric %s +%s", name, value)
+
+
+async def aincr(name: str, value: int = 1) -> None:
+    """Async :func:`incr` for use inside async views."""
+    key = f"{PREFIX}{name}"
+    try:
+        if not await cache.aadd(key, value, timeout=None):
+            await cache.aincr(key, value)
+    except ValueError:
+        await cache.aset(key, value, timeout=None)
+    logger.debug("metric %s +%s", name, value)
+
+
+def get(name: str) -> int:
+    """Return the current value of counter ``name`` (0 if unset)."""
+    return cache.get(f"{PREFIX}{name}", 0)
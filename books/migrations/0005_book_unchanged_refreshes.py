@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_book_detail_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='unchanged_refreshes',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,149 @@
+"""
+Fast rejection of malformed and known-missing volume IDs.
+
+Google volume IDs are short URL-safe tokens; anything else is rejected
+before any I/O (:func:`is_valid_volume_id`, also used by the
+``volume_id`` URL converter).
+
+IDs upstream answered 404 for are remembered in a per-process Bloom
+filter (:func:`mark_missing` / :func:`is_known_missing`), so repeat hits
+from bots are answered without a network call or cache lookup. Memory
+is fixed: two generations of CAPACITY entries each, and the older one
+is dropped every TTL seconds (or when the current one fills up), so an
+ID is forgotten after TTL to 2 * TTL seconds. The filter is sized for a
+false-positive rate of FP_RATE, so a real volume is almost never taken
+for a missing one, and never for longer than that.
+
+Cover 404s go in a filter of their own (:func:`mark_cover_missing` /
+:func:`is_cover_known_missing`): a volume without a cover image is
+still a volume.
+"""
+import hashlib
+import math
+import re
+import threading
+import time
+from django.conf import settings
+
+VOLUME_ID_PATTERN = r"[A-Za-z0-9_-]{1,64}"
+_VOLUME_ID_RE = re.compile(VOLUME_ID_PATTERN)
+
+TTL = getattr(settings, "GOOGLE_BOOKS_MISSING_TTL", 60 * 10)
+CAPACITY = getattr(settings, "GOOGLE_BOOKS_MISSING_CAPACITY", 50_000)
+FP_RATE = getattr(settings, "GOOGLE_BOOKS_MISSING_FP_RATE", 1e-6)
+
+
+def is_valid_volume_id(volume_id) -> bool:
+    """True if ``volume_id`` could be a Google Books volume ID."""
+    return bool(
+        isinstance(volume_id, str) and _VOLUME_ID_RE.fullmatch(volume_id)
+    )
+
+
+class BloomFilter:
+    """Fixed-size set membership with false positives but no negatives."""
+    def __init__(self, capacity, fp_rate):
+        # optimal sizes: m = -n ln p / (ln 2)^2 bits, k = m/n ln 2 hashes
+        self.bits = max(
+            8, int(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, item):
+        """Add ``item`` (not thread-safe; callers hold a lock)."""
+        for pos in self._positions(item):
+            self.array[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(
+            self.array[pos >> 3] & (1 << (pos & 7))
+            for pos in self._positions(item)
+        )
+
+
+class _RotatingFilter:
+    """Two Bloom generations; the older one is dropped every TTL."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget every ID."""
+        with self._lock:
+            self._current = BloomFilter(CAPACITY, FP_RATE)
+            self._previous = BloomFilter(CAPACITY, FP_RATE)
+            self._rotated_at = time.monotonic()
+
+    def _rotate_if_due(self):
+        age = time.monotonic() - self._rotated_at
+        if age < TTL and self._current.count < CAPACITY:
+            return
+        # after two idle TTLs both generations have expired
+        self._previous = (
+            self._current if age < 2 * TTL
+            else BloomFilter(CAPACITY, FP_RATE)
+        )
+        self._current = BloomFilter(CAPACITY, FP_RATE)
+        self._rotated_at = time.monotonic()
+
+    def add(self, item):
+        with self._lock:
+            self._rotate_if_due()
+            self._current.add(item)
+
+    def __contains__(self, item):
+        if time.monotonic() - self._rotated_at >= TTL:
+            with self._lock:
+                self._rotate_if_due()
+        return item in self._current or item in self._previous
+
+
+_missing = _RotatingFilter()
+_missing_covers = _RotatingFilter()
+
+
+def mark_missing(volume_id: str) -> None:
+    """Remember that upstream has no volume ``volume_id``."""
+    _missing.add(volume_id)
+
+
+def is_known_missing(volume_id: str) -> bool:
+    """True if upstream recently answered 404 for ``volume_id``."""
+    return volume_id in _missing
+
+
+def mark_cover_missing(volume_id: str) -> None:
+    """Remember that upstream has no cover image for ``volume_id``."""
+    _missing_covers.add(volume_id)
+
+
+def is_cover_known_missing(volume_id: str) -> bool:
+    """True if ``volume_id``, or just its cover, recently 404'd."""
+    return volume_id in _missing or volume_id in _missing_covers
+
+
+def reset() -> None:
+    """Forget every remembered ID (tests, admin tooling)."""
+    _missing.reset()
+    _missing_covers.reset()
+
+
+class VolumeIdConverter:
+    """URL converter: only well-formed volume IDs reach the views."""
+    regex = VOLUME_ID_PATTERN
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return value
@@ -3,14 +3,19 @@
     Returns:
         Model: A Django model representing a book.
 """
+import time
+import zlib
 from django.db import models
 from django.utils import timezone
+from books import metrics, ttl
+from books.volumes import Volume
 
 
 # Create your models here.
 class Book(models.Model):
     """
-    A saved book (only created if a user adds it to a shelf / sets status).
+    A locally catalogued book: created when a user adds it to a shelf /
+    sets status, and written through on every detail fetch.
     Primary key is the Google volumeId.
     """
     id = models.CharField(primary_key=True, max_length=64)
@@ -22,10 +27,24 @@ class Book(models.Model):
     language = models.CharField(max_length=16, blank=True)
     published_date_raw = models.CharField(max_length=32, blank=True)
 
+    # Full detail payload, written through by fetch_book_by_id
+    subtitle = models.CharField(max_length=512, blank=True)
+    publisher = models.CharField(max_length=255, blank=True)
+    page_count = models.PositiveIntegerField(blank=True, null=True)
+    categories = models.JSONField(blank=True, null=True)  # list[str]
+    preview_link = models.URLField(max_length=500, blank=True)
+    info_link = models.URLField(max_length=500, blank=True)
+    # zlib-compressed UTF-8; use the ``description`` property
+    description_z = models.BinaryField(blank=True, default=b"")
+    # set once the detail fields above have been filled
+    detail_fetched_at = models.DateTimeField(blank=True, null=True)
+
     # HTTP cache-ish fields used by fetch_or_refresh_book
     etag = models.CharField(max_length=128, blank=True)
     last_modified = models.DateTimeField(blank=True, null=True)
     last_fetched_at = models.DateTimeField(default=timezone.now)
+    # refreshes in a row that found nothing new (drives refresh backoff)
+    unchanged_refreshes = models.PositiveSmallIntegerField(default=0)
 
     # (Optional) timestamps for local record keeping only
     created_at = models.DateTimeField(default=timezone.now)
@@ -38,10 +57,60 @@ class Book(models.Model):
     def __str__(self):
         return str(self.title) or str(self.id)
 
+    @property
+    def description(self) -> str:
+        """The long description, decompressed."""
+        if not self.description_z:
+            return ""
+        return zlib.decompress(bytes(self.description_z)).decode("utf-8")
+
+    @description.setter
+    def description(self, value: str) -> None:
+        self.description_z = (
+            zlib.compress(value.encode("utf-8"), 6) if value else b""
+        )
+
+    def has_details(self, ttl_minutes: int = 1440) -> bool:
+        """True if the detail fields were fetched within ``ttl_minutes``."""
+        if self.detail_fetched_at is None:
+            return False
+        age = timezone.now() - self.detail_fetched_at
+        return age.total_seconds() <= ttl_minutes * 60
+
+    def as_volume(self) -> Volume:
+        """The row as a :class:`Volume`, like ``fetch_book_by_id``'s."""
+        return Volume(
+            id=self.id,
+            title=self.title,
+            subtitle=self.subtitle or None,
+            authors=tuple(self.authors or ()),
+            publisher=self.publisher or None,
+            published_date=self.published_date_raw or None,
+            page_count=self.page_count,
+            categories=tuple(self.categories or ()),
+            description=self.description or None,
+            preview_link=self.preview_link or None,
+            info_link=self.info_link or None,
+            language=self.language or None,
+            thumbnail=self.thumbnail_url or None,
+        )
+
     def needs_refresh(self, ttl_minutes: int = 1440) -> bool:
         """
         Determine if the book needs to be refreshed
         based on the last fetched time.
+
+        The TTL is shortened by a per-book jitter, and a row may come due
+        a little early (XFetch), so books fetched together don't all
+        come due together.
         """
-        age = timezone.now() - (self.last_fetched_at or timezone.now())
-        return age.total_seconds() > ttl_minutes * 60
+        fetched = (self.last_fetched_at or timezone.now()).timestamp()
+        expires_at = fetched + ttl.jitter_for(self.pk, ttl_minutes * 60)
+        if time.time() > expires_at:
+            return True
+        # treat a small share of the TTL as the row's "recompute time"
+        delta = ttl_minutes * 60 * ttl.ROW_DELTA_SHARE
+        if ttl.should_refresh_early(expires_at, delta):
+            metrics.incr("early_refresh.book")
+            return True
+        return False
@@ -0,0 +1,149 @@
+"""
+Cross-worker rate limiter for the Google Books API keys.
+
+A token bucket (RATE tokens/second, up to BURST) and a daily quota
+counter live in the default cache, so every worker and dyno draws from
+the same budget. Callers declare a priority:
+- INTERACTIVE (search/detail pages) may drain the bucket completely;
+- BACKGROUND (refresh jobs) must leave BACKGROUND_RESERVE tokens and
+  BACKGROUND_DAILY_SHARE of the daily quota for interactive traffic.
+
+When no token is available a caller queues for up to its priority's
+max wait, then the call is shed with :class:`RateLimitExceeded`.
+
+RATE, BURST and DAILY_QUOTA are per API key and scale with the number
+of keys in the pool.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from datetime import date
+from django.conf import settings
+from django.core.cache import cache
+from requests.exceptions import RequestException
+from books import keypool, metrics
+
+logger = logging.getLogger(__name__)
+
+RATE = getattr(settings, "GOOGLE_BOOKS_RATE_PER_SECOND", 10)
+BURST = getattr(settings, "GOOGLE_BOOKS_RATE_BURST", 20)
+DAILY_QUOTA = getattr(settings, "GOOGLE_BOOKS_DAILY_QUOTA", 1000)
+BACKGROUND_RESERVE = getattr(
+    settings, "GOOGLE_BOOKS_BACKGROUND_RESERVE", BURST // 2
+    )
+BACKGROUND_DAILY_SHARE = getattr(
+    settings, "GOOGLE_BOOKS_BACKGROUND_DAILY_SHARE", 0.8
+    )
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# seconds a caller may queue for a token before being shed
+MAX_WAIT = {
+    INTERACTIVE: getattr(settings, "GOOGLE_BOOKS_INTERACTIVE_MAX_WAIT", 1),
+    BACKGROUND: getattr(settings, "GOOGLE_BOOKS_BACKGROUND_MAX_WAIT", 30),
+}
+
+BUCKET_KEY = "rl:gbooks:bucket"
+LOCK_KEY = "rl:gbooks:lock"
+LOCK_TTL = 2
+
+
+class RateLimitExceeded(RequestException):
+    """Raised when a call is shed because the shared budget is spent."""
+
+
+def _day_key():
+    return f"rl:gbooks:day:{date.today().isoformat()}"
+
+
+@contextmanager
+def _bucket_lock():
+    """Best-effort cross-worker mutex around the bucket read/modify/write."""
+    deadline = time.monotonic() + LOCK_TTL
+    acquired = False
+    while time.monotonic() < deadline:
+        acquired = cache.add(LOCK_KEY, 1, timeout=LOCK_TTL)
+        if acquired:
+            break
+        time.sleep(0.005)
+    try:
+        yield
+    finally:
+        if acquired:
+            cache.delete(LOCK_KEY)
+
+
+def _key_count():
+    return max(1, len(keypool.KEYS))
+
+
+def _try_take(priority):
+    """
+    Take one token if the priority's floor allows it.
+    Returns 0 on success, else the seconds until a token should be free.
+    """
+    n = _key_count()
+    rate, burst = RATE * n, BURST * n
+    floor = BACKGROUND_RESERVE * n if priority == BACKGROUND else 0
+    with _bucket_lock():
+        now = time.time()
+        tokens, updated = cache.get(BUCKET_KEY) or (burst, now)
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens - 1 < floor:
+            cache.set(BUCKET_KEY, (tokens, now), timeout=None)
+            return (floor + 1 - tokens) / rate
+        cache.set(BUCKET_KEY, (tokens - 1, now), timeout=None)
+    return 0
+
+
+def _daily_budget(priority):
+    budget = DAILY_QUOTA * _key_count()
+    if priority == BACKGROUND:
+        return int(budget * BACKGROUND_DAILY_SHARE)
+    return budget
+
+
+def acquire(priority=INTERACTIVE, *, max_wait=None):
+    """
+    Reserve one upstream call for ``priority`` or raise RateLimitExceeded.
+    Blocks (queues) for at most ``max_wait`` seconds, by default
+    ``MAX_WAIT[priority]``.
+    """
+    if DAILY_QUOTA:
+        used = cache.get(_day_key(), 0)
+        if used >= _daily_budget(priority):
+            metrics.incr(f"ratelimit.shed.{priority}")
+            raise RateLimitExceeded(
+                f"daily Google Books budget spent ({used}) for {priority}"
+            )
+
+    if max_wait is None:
+        max_wait = MAX_WAIT.get(priority, 0)
+    deadline = time.monotonic() + max_wait
+    queued = False
+    while True:
+        wait = _try_take(priority)
+        if not wait:
+            break
+        if time.monotonic() + wait > deadline:
+            metrics.incr(f"ratelimit.shed.{priority}")
+            logger.warning("Google Books call shed (%s priority)", priority)
+            raise RateLimitExceeded(f"rate limit reached for {priority}")
+        if not queued:
+            queued = True
+            metrics.incr(f"ratelimit.queued.{priority}")
+        time.sleep(wait)
+
+    if DAILY_QUOTA and not cache.add(_day_key(), 1, timeout=60 * 60 * 25):
+        try:
+            cache.incr(_day_key())
+        except ValueError:
+            cache.set(_day_key(), 1, timeout=60 * 60 * 25)
+
+
+def penalize():
+    """Empty the bucket after upstream answered 429 despite our limits."""
+    with _bucket_lock():
+        cache.set(BUCKET_KEY, (0, time.time()), timeout=None)
+    metrics.incr("ratelimit.upstream_429")
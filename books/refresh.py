@@ -0,0 +1,154 @@
+"""
+Bulk refresh of catalogued books with popularity-aware TTLs.
+
+How long a Book row stays fresh depends on how much it is used and how
+often it changes:
+- hot books (at least HOT_ACTIVITY reading statuses + active ratings)
+  are refreshed every HOT_TTL minutes;
+- books with some activity use BASE_TTL;
+- cold books (no activity) back off exponentially: BASE_TTL doubles for
+  every refresh in a row that found nothing new, up to MAX_TTL.
+Each TTL is shortened by a stable per-book jitter (:mod:`books.ttl`) so
+books fetched together spread out. Stubs that were never hydrated are
+always due.
+
+:func:`refresh_stale` scans due rows in batches and refreshes them on a
+bounded thread pool (:mod:`books.batch`) at BACKGROUND priority, so the
+shared rate limiter paces (or sheds) the calls and interactive traffic
+keeps its reserve.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+from books import ttl
+from books.batch import BatchReport, keyset_batches, run_batches
+from books.exceptions import BookFetchError
+from books.models import Book
+from books.ratelimit import BACKGROUND
+from books.services import fetch_or_refresh_book
+
+logger = logging.getLogger(__name__)
+
+HOT_ACTIVITY = getattr(settings, "GOOGLE_BOOKS_REFRESH_HOT_ACTIVITY", 10)
+# minutes
+HOT_TTL = getattr(settings, "GOOGLE_BOOKS_REFRESH_HOT_TTL", 60 * 6)
+BASE_TTL = getattr(settings, "GOOGLE_BOOKS_REFRESH_BASE_TTL", 60 * 24)
+MAX_TTL = getattr(settings, "GOOGLE_BOOKS_REFRESH_MAX_TTL", 60 * 24 * 30)
+
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+ERROR = "error"
+
+
+def refresh_ttl(activity: int, unchanged_refreshes: int) -> int:
+    """Minutes a row with this activity and change history stays fresh."""
+    if activity >= HOT_ACTIVITY:
+        return HOT_TTL
+    if activity:
+        return BASE_TTL
+    return min(BASE_TTL * 2 ** unchanged_refreshes, MAX_TTL)
+
+
+@dataclass
+class RefreshReport(BatchReport):
+    """Running totals of a bulk refresh."""
+    due: int = 0
+    changed: int = 0
+    unchanged: int = 0
+
+    def add(self, outcome) -> None:
+        if outcome == CHANGED:
+            self.changed += 1
+        elif outcome == UNCHANGED:
+            self.unchanged += 1
+        else:
+            self.errors += 1
+
+    @property
+    def refreshed(self) -> int:
+        """Rows that were actually revalidated upstream."""
+        return self.changed + self.unchanged
+
+    @property
+    def rate(self) -> float:
+        """Upstream refreshes per second."""
+        attempted = self.refreshed + self.errors
+        return attempted / self.elapsed if self.elapsed else 0.0
+
+
+def _batches(batch_size, now):
+    """
+    Yield ``(rows scanned, [(id, last_fetched_at) of the due ones])``
+    per batch, stalest first.
+    """
+    # nothing fresher than the shortest TTL can be due, except stubs;
+    # rows touched during this run (last_fetched_at > now) are never
+    # seen twice, even if upstream left them without a title
+    oldest_fresh = now - timedelta(minutes=min(HOT_TTL, BASE_TTL))
+    rows = (
+        Book.objects
+        .filter(last_fetched_at__lte=now)
+        .filter(Q(last_fetched_at__lte=oldest_fresh) | Q(title=""))
+        .annotate(activity=(
+            Count("reading_statuses", distinct=True)
+            + Count(
+                "ratings",
+                filter=Q(ratings__is_archived=False),
+                distinct=True
+            )
+        ))
+        .values_list(
+            "last_fetched_at", "pk", "title", "unchanged_refreshes", "activity"
+        )
+    )
+    for page in keyset_batches(rows, batch_size, "last_fetched_at", "pk"):
+        yield len(page), [
+            (pk, fetched_at)
+            for fetched_at, pk, title, unchanged, activity in page
+            if not title
+            or (now - fetched_at).total_seconds()
+            >= ttl.jitter_for(pk, refresh_ttl(activity, unchanged) * 60)
+        ]
+
+
+def _refresh_one(row):
+    """Revalidate one row; returns CHANGED, UNCHANGED or ERROR."""
+    pk, fetched_at = row
+    try:
+        book = fetch_or_refresh_book(pk, ttl_minutes=0, priority=BACKGROUND)
+    except BookFetchError as e:
+        logger.info("Refresh of book %s failed: %s", pk, e)
+        return ERROR
+    if book.last_fetched_at == fetched_at:
+        # upstream unavailable or budget spent: the stored row was kept
+        return ERROR
+    return UNCHANGED if book.unchanged_refreshes else CHANGED
+
+
+def refresh_stale(
+    *, workers=4, batch_size=200, limit=None, dry_run=False, progress=None
+) -> RefreshReport:
+    """
+    Refresh every due Book (at most ``limit``) with ``workers`` threads.
+    ``progress`` is called with the running report after each batch.
+    With ``dry_run`` due rows are only counted, not fetched.
+    """
+    report = RefreshReport()
+
+    def due_batches():
+        for scanned, due in _batches(batch_size, timezone.now()):
+            report.scanned += scanned
+            if limit is not None:
+                due = due[:limit - report.due]
+            report.due += len(due)
+            yield [] if dry_run else due
+            if report.due == limit:
+                return
+
+    return run_batches(
+        due_batches(), _refresh_one, report,
+        workers=workers, name="gbooks-refresh", progress=progress,
+    )
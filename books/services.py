@@ -1,25 +1,77 @@
 """
 Helper functions for interacting with the Google Books API.
 """
+import hashlib
 import logging
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from asgiref.sync import sync_to_async
 from django.utils import timezone
-from django.utils.http import url_has_allowed_host_and_scheme
+from django.utils.http import (
+    http_date,
+    parse_http_date_safe,
+    url_has_allowed_host_and_scheme,
+)
 from django.shortcuts import redirect
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
 from requests.exceptions import RequestException, HTTPError, Timeout
+from books import keypool, metrics, missing, ttl
+from books.client import (
+    ahttp_get,
+    http_get,
+    is_unavailable,
+    raise_for_status,
+)
+from books.deadline import DeadlineExceeded
 from books.exceptions import BookFetchError
-from books.utils import ensure_https
+from books.ratelimit import BACKGROUND, INTERACTIVE
+from books.singleflight import asingle_flight, single_flight
+from books.volumes import SearchHit, parse
+from jobs.models import Job
+from jobs.queue import enqueue
 from .models import Book
 
 # --- Config API ----------------------------------------------------
-GOOGLE_BOOKS_API_KEY = getattr(settings, "GOOGLE_BOOKS_API_KEY", None)
 SEARCH_URL = getattr(settings, "GOOGLE_BOOKS_SEARCH_URL", None)
 VOLUME_URL = getattr(settings, "GOOGLE_BOOKS_VOLUME_URL", None)
-
-DEFAULT_TIMEOUT = getattr(settings, "GOOGLE_BOOKS_TIMEOUT", 8)
 API_HARD_CAP = 120  # Avoid millions of pages
+# minutes a written-through detail row is served without going upstream
+CATALOG_TTL = getattr(settings, "GOOGLE_BOOKS_CATALOG_TTL_MINUTES", 1440)
+SEARCH_SOFT_TTL = getattr(settings, "GOOGLE_BOOKS_SEARCH_SOFT_TTL", 60 * 10)
+SEARCH_HARD_TTL = getattr(
+    settings, "GOOGLE_BOOKS_SEARCH_HARD_TTL", 60 * 60 * 24
+    )
+SEARCH_REFRESH_LOCK = 30
+# a stub whose hydration job failed for good isn't requeued by page
+# views until this long after
+HYDRATION_RETRY_AFTER = timedelta(hours=getattr(
+    settings, "GOOGLE_BOOKS_HYDRATION_RETRY_HOURS", 24
+))
+# Results fetched per upstream search call; pages are sliced locally.
+# 36 = three 12-item pages, within the API's 40-item maximum.
+SEARCH_WINDOW = min(getattr(settings, "GOOGLE_BOOKS_SEARCH_WINDOW", 36), 40)
+
+# Partial responses: ask only for what each parser reads
+# (kept in sync by books/Tests/tests_fields_projection.py)
+HIT_FIELDS = "id,volumeInfo(title,authors,imageLinks/thumbnail)"
+SEARCH_FIELDS = f"totalItems,items({HIT_FIELDS})"
+VOLUME_FIELDS = (
+    "id,volumeInfo(title,subtitle,authors,publisher,publishedDate,"
+    "pageCount,categories,description,previewLink,infoLink,language,"
+    "imageLinks/thumbnail)"
+)
+BOOK_FIELDS = (
+    "etag,volumeInfo(title,authors,language,publishedDate,"
+    "imageLinks(thumbnail,smallThumbnail))"
+)
 logger = logging.getLogger(__name__)
+# background stale-while-revalidate refreshes for search pages
+_refresh_executor = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="gbooks-swr"
+    )
 
 if not SEARCH_URL or not VOLUME_URL:
     raise RuntimeError(
@@ -47,11 +99,16 @@ def safe_redirect_back(request, fallback_url):
 def fetch_or_refresh_book(
     volume_id: str, *,
     force: bool = False,
-    ttl_minutes: int = 1440
+    ttl_minutes: int = 1440,
+    priority: str = INTERACTIVE
 ) -> Book:
     """
     Ensure a Book row exists and is hydrated from Google Books.
     force=True skips TTL checks and fetches now.
+    priority is the rate-limiter class (BACKGROUND for batch refreshes).
+
+    Hydrated rows are revalidated with If-None-Match/If-Modified-Since;
+    a 304 (or an unchanged 200) only bumps ``last_fetched_at``.
     """
     book, _ = Book.objects.get_or_create(pk=volume_id)
 
@@ -63,55 +120,153 @@ def fetch_or_refresh_book(
     if not must_fetch:
         return book
 
-    params = {}
+    # Coalesce concurrent refreshes of the same volume into one fetch
+    return single_flight(
+        f"book:{volume_id}",
+        lambda: _hydrate_book(book, force=force, priority=priority)
+    )
+
+
+def ensure_book(volume_id: str, *, ttl_minutes: int = 1440) -> Book:
+    """
+    Return the Book row for ``volume_id`` without waiting on Google Books.
+
+    Missing rows are created as empty stubs (enough for the FKs of a
+    status, rating or review); stubs and rows past ``ttl_minutes`` are
+    queued for hydration by the job worker (``manage.py runworker``).
+    """
+    book, _ = Book.objects.get_or_create(pk=volume_id)
+    if not book.title or book.needs_refresh(ttl_minutes):
+        schedule_book_hydration(volume_id)
+    return book
+
+
+def schedule_book_hydration(volume_id: str) -> None:
+    """Queue a background refresh of ``volume_id`` (one job per volume)."""
+    enqueue("books.hydrate", volume_id, dedupe_key=f"hydrate:{volume_id}")
 
-    if GOOGLE_BOOKS_API_KEY:
-        params["key"] = GOOGLE_BOOKS_API_KEY
+
+def retry_stub_hydration(volume_ids) -> set:
+    """
+    Queue hydration for the stubs in ``volume_ids`` that have no job in
+    flight and none that failed for good in the last
+    HYDRATION_RETRY_AFTER, so a page listing a volume that can never be
+    fetched doesn't requeue it on every view. Returns the IDs whose
+    hydration recently failed.
+    """
+    keys = {f"hydrate:{volume_id}": volume_id for volume_id in volume_ids}
+    jobs = Job.objects.filter(dedupe_key__in=keys).filter(
+        Q(status__in=[Job.Status.QUEUED, Job.Status.RUNNING])
+        | Q(
+            status=Job.Status.FAILED,
+            finished_at__gte=timezone.now() - HYDRATION_RETRY_AFTER,
+        )
+    ).values_list("dedupe_key", "status")
+    failed, busy = set(), set()
+    for key, status in jobs:
+        (failed if status == Job.Status.FAILED else busy).add(keys[key])
+    for volume_id in keys.values():
+        if volume_id not in failed and volume_id not in busy:
+            schedule_book_hydration(volume_id)
+    return failed - busy
+
+
+def _hydrate_book(
+    book: Book, *,
+    force: bool = False,
+    priority: str = INTERACTIVE
+) -> Book:
+    """Fetch ``book`` from Google Books and persist what changed."""
+    volume_id = book.pk
+    # the client adds a key from the rotating pool
+    params = {"fields": BOOK_FIELDS}
+
+    # Revalidate with stored validators, but only if the row is hydrated:
+    # a 304 for an empty stub would leave it empty.
+    headers = {}
+    if book.title and not force:
+        if book.etag:
+            headers["If-None-Match"] = book.etag
+        if book.last_modified:
+            headers["If-Modified-Since"] = http_date(
+                book.last_modified.timestamp()
+                )
 
     try:
-        resp = requests.get(
+        resp = http_get(
             VOLUME_URL.format(volume_id),
             params=params,
-            timeout=8
+            headers=headers or None,
+            priority=priority
             )
         resp.raise_for_status()
-    except (HTTPError, Timeout) as e:
-        raise BookFetchError(
-            "Failed to fetch book data",
-            volume_id=volume_id,
-            original_exception=e
-        ) from e
+    except DeadlineExceeded as e:
+        # The request's budget ran out: keep whatever row we have (even
+        # an empty stub still satisfies FKs); it is refetched next time.
+        logger.warning(
+            "No time left to fetch book %s, keeping stored row: %s",
+            volume_id,
+            e
+            )
+        metrics.incr("fallback.deadline")
+        return book
     except RequestException as e:
+        _remember_if_missing(volume_id, e)
+        if book.title and is_unavailable(e):
+            # Upstream down or breaker open: the stored row is good enough
+            logger.warning(
+                "Google Books unavailable, keeping stored book %s: %s",
+                volume_id,
+                e
+                )
+            metrics.incr("fallback.book_row")
+            return book
         raise BookFetchError(
-            "Request error while fetching book",
+            "Failed to fetch book data"
+            if isinstance(e, (HTTPError, Timeout))
+            else "Request error while fetching book",
             volume_id=volume_id,
             original_exception=e
         ) from e
 
-    data = resp.json() or {}
-
-    vi = data.get("volumeInfo", {}) or {}
-    image_links = vi.get("imageLinks", {}) or {}
-    thumbnail_url = (
-        image_links.get("thumbnail") or image_links.get("smallThumbnail")
-        )
-    thumbnail_url = ensure_https(thumbnail_url)
-
-    # Populate model fields
-    book.title = vi.get("title") or ""
-    book.authors = vi.get("authors") or None
-    book.thumbnail_url = thumbnail_url
-    book.language = vi.get("language") or ""
-    book.published_date_raw = vi.get("publishedDate") or ""
+    book.last_fetched_at = timezone.now()
 
-    book.etag = data.get("etag") or resp.headers.get("ETag") or ""
+    # 304 Not Modified: stored copy is still current
+    if resp.status_code == 304:
+        book.unchanged_refreshes = min(book.unchanged_refreshes + 1, 100)
+        book.save(update_fields=["last_fetched_at", "unchanged_refreshes"])
+        return book
 
-    lm = resp.headers.get("Last-Modified")
-    if lm:
-        book.last_modified = timezone.now()
+    volume = parse(resp.json() or {}, BOOK_FIELDS, volume_id=volume_id)
 
-    book.last_fetched_at = timezone.now()
-    book.save()
+    fresh = {
+        "title": volume.title or "",
+        "authors": list(volume.authors) or None,
+        "thumbnail_url": volume.cover or "",
+        "language": volume.language or "",
+        "published_date_raw": volume.published_date or "",
+        "etag": resp.headers.get("ETag") or volume.etag or "",
+    }
+    lm = parse_http_date_safe(resp.headers.get("Last-Modified") or "")
+    if lm is not None:
+        fresh["last_modified"] = datetime.fromtimestamp(lm, tz=dt_timezone.utc)
+
+    # Only write the columns that actually changed
+    changed = [
+        field for field, value in fresh.items()
+        if getattr(book, field) != value
+    ]
+    for field in changed:
+        setattr(book, field, fresh[field])
+
+    if changed:
+        book.unchanged_refreshes = 0
+        book.save(update_fields=changed + [
+            "last_fetched_at", "unchanged_refreshes", "updated_at"
+        ])
+    else:
+        book.unchanged_refreshes = min(book.unchanged_refreshes + 1, 100)
+        book.save(update_fields=["last_fetched_at", "unchanged_refreshes"])
 
     return book
 
@@ -124,137 +279,478 @@ def search_google_books(query, *, start_index=0, max_results=12):
     Network errors and JSON parsing issues are logged and result in an empty
     list (the UI then renders a "no results" state).
 
+    Upstream is queried in windows of ``SEARCH_WINDOW`` results (up to the
+    API's 40-item maximum), each cached. Pages are positions in the
+    results deduplicated across windows in order (see :class:`_Page`),
+    so a duplicate never shifts one page's items onto the next; the
+    windows before the page are read (from cache) to find where it
+    starts. Windows use stale-while-revalidate:
+    fresh for ``SEARCH_SOFT_TTL`` seconds, then served stale (while one
+    background refresh runs) until a jittered ``SEARCH_HARD_TTL``. Near
+    the soft TTL, XFetch may start that refresh early (see
+    :mod:`books.ttl`). Stale windows are also served when upstream is
+    unavailable.
+
     Args:
         query (str): A valid Google Books query string (``"intitle:django"``).
 
     Returns:
-        list[dict]: A list of lightweight book dicts with keys:
-            ``id``, ``title``, ``authors``, ``thumbnail``.
-            Returns ``[]`` if the API key is missing or an error occurs.
+        tuple[list[SearchHit], int]: The page's results and the total.
+            Returns ``([], 0)`` if the API key is missing or an error
+            occurs.
     """
 
-    if not GOOGLE_BOOKS_API_KEY:
+    if not keypool.has_keys():
+        return [], 0
+
+    page = _Page(start_index, max_results)
+    while page.next_start is not None:
+        try:
+            window = _search_window(query, page.next_start)
+        except (RequestException, ValueError) as e:
+            page.fail(e)
+        else:
+            page.add(window)
+    return page.result()
+
+
+async def asearch_google_books(query, *, start_index=0, max_results=12):
+    """Async :func:`search_google_books` for async views.
+
+    Same windows, cache entries and fallbacks (all of the paging and
+    parsing is shared); upstream calls go through the async client so
+    the event loop is free while they are in flight.
+    """
+    if not keypool.has_keys():
         return [], 0
 
-    params = {
+    page = _Page(start_index, max_results)
+    while page.next_start is not None:
+        try:
+            window = await _asearch_window(query, page.next_start)
+        except (RequestException, ValueError) as e:
+            page.fail(e)
+        else:
+            page.add(window)
+    return page.result()
+
+
+class _Page:
+    """
+    One page of a search, built from its windows in order.
+
+    Results are deduplicated across windows by position: a volume
+    counts where it first appears, and every later copy is dropped, so
+    the page at ``start_index`` is the same slice of the same list
+    however the pages around it were fetched. Windows are read from the
+    first: ``next_start`` is the window to :meth:`add` next, or None
+    once the page is full, upstream has nothing more or a window
+    could not be read (:meth:`fail`).
+    """
+    def __init__(self, start_index, max_results):
+        self.start_index = start_index
+        self.max_results = max_results
+        self.books = []
+        self.total = 0
+        self.next_start = 0
+        self.failed = False
+        self._seen = set()
+        # deduplicated results still to pass before the page starts
+        self._skip = start_index
+
+    def add(self, window):
+        """Take the page's share of the window at ``next_start``."""
+        self.total = window["total"]
+        for values in window["books"]:
+            # values is SearchHit.to_cache(); id first
+            if values[0] in self._seen:
+                continue
+            self._seen.add(values[0])
+            if self._skip:
+                self._skip -= 1
+                continue
+            self.books.append(SearchHit.from_cache(values))
+            if len(self.books) == self.max_results:
+                self.next_start = None
+                return
+        next_start = self.next_start + SEARCH_WINDOW
+        if window["exhausted"] or next_start >= window["total"]:
+            next_start = None
+        self.next_start = next_start
+
+    def fail(self, exc):
+        """Stop at a window that could not be fetched or parsed."""
+        if isinstance(exc, RequestException):
+            # all requests-related exceptions, including HTTPError
+            logger.warning("Google Books search failed: %s", exc)
+        else:
+            # JSON decode errors
+            logger.warning("Google Books response parsing failed: %s", exc)
+        self.failed = True
+        self.next_start = None
+
+    def result(self):
+        """
+        ``(books, total)``: a short page makes the total exact, and a
+        failure with nothing to show is ``([], 0)``.
+        """
+        if self.failed and not self.books:
+            return [], 0
+        if len(self.books) < self.max_results:
+            return self.books, self.start_index + len(self.books)
+        return self.books, self.total
+
+
+def search_cache_key(query, window_start):
+    """Cache key for a search window; the query is whitespace/case-folded."""
+    normalized = " ".join((query or "").split()).lower()
+    digest = hashlib.sha1(
+        f"{normalized}|{window_start}|{SEARCH_WINDOW}".encode()
+    ).hexdigest()
+    return f"gbooks:search:{digest}"
+
+
+def _search_window(query, window_start):
+    """Return one cached search window, fetching or refreshing as needed."""
+    key = search_cache_key(query, window_start)
+    entry = cache.get(key)
+    if entry is not None:
+        _cached_window_served(key, query, window_start, entry)
+        return entry
+
+    metrics.incr("search_cache.miss")
+    # identical concurrent misses share one upstream call
+    return single_flight(
+        key,
+        lambda: _fetch_and_cache_search(
+            key, query, window_start, priority=INTERACTIVE
+        )
+    )
+
+
+async def _asearch_window(query, window_start):
+    """Async :func:`_search_window`."""
+    key = search_cache_key(query, window_start)
+    entry = await cache.aget(key)
+    if entry is not None:
+        await sync_to_async(_cached_window_served)(
+            key, query, window_start, entry
+        )
+        return entry
+
+    await metrics.aincr("search_cache.miss")
+    return await asingle_flight(
+        key,
+        lambda: _afetch_and_cache_search(key, query, window_start)
+    )
+
+
+def _cached_window_served(key, query, window_start, entry):
+    """Count a cached window's use; refresh it if it is (nearly) stale."""
+    freshness = _search_freshness(entry)
+    metrics.incr(f"search_cache.{freshness}")
+    if freshness == "early":
+        metrics.incr("early_refresh.search")
+    if freshness != "hit":
+        _schedule_search_refresh(key, query, window_start)
+
+
+def _search_freshness(entry):
+    """
+    "hit" (fresh), "stale" (past the soft TTL) or "early": still fresh,
+    but picked by XFetch to refresh ahead of the soft TTL.
+    """
+    soft_expiry = entry["fetched_at"] + SEARCH_SOFT_TTL
+    if time.time() > soft_expiry:
+        return "stale"
+    if ttl.should_refresh_early(soft_expiry, entry.get("delta", 0)):
+        return "early"
+    return "hit"
+
+
+def _schedule_search_refresh(key, query, window_start):
+    """Refresh a stale search window in the background, at most once."""
+    if not cache.add(f"{key}:refreshing", 1, timeout=SEARCH_REFRESH_LOCK):
+        return
+    _refresh_executor.submit(_refresh_search, key, query, window_start)
+
+
+def _refresh_search(key, query, window_start):
+    """Background task body: refetch a window, keep stale on error."""
+    try:
+        _fetch_and_cache_search(
+            key, query, window_start, priority=BACKGROUND
+        )
+    except (RequestException, ValueError) as e:
+        logger.info("Background search refresh failed: %s", e)
+    finally:
+        cache.delete(f"{key}:refreshing")
+
+
+def _search_params(query, window_start):
+    return {
         "q": query,
-        "key": GOOGLE_BOOKS_API_KEY,
         "printType": "books",
         "orderBy": "relevance",
         "langRestrict": "en",
-        "startIndex": start_index,
-        "maxResults": max_results,
+        "startIndex": window_start,
+        "maxResults": SEARCH_WINDOW,
+        "fields": SEARCH_FIELDS,
     }
 
-    try:
-        response = requests.get(
-            SEARCH_URL,
-            params=params,
-            timeout=10
+
+def _fetch_and_cache_search(key, query, window_start, *, priority):
+    """Call ``/volumes`` for one window and cache it; errors propagate."""
+    started = time.monotonic()
+    response = http_get(
+        SEARCH_URL,
+        params=_search_params(query, window_start),
+        priority=priority
+        )
+    response.raise_for_status()  # Raises HTTPError for bad status codes
+    entry = _parse_search(response.json() or {}, window_start, started)
+    cache.set(key, entry, timeout=ttl.jitter(SEARCH_HARD_TTL))
+    return entry
+
+
+async def _afetch_and_cache_search(key, query, window_start):
+    """Async :func:`_fetch_and_cache_search` (always INTERACTIVE)."""
+    started = time.monotonic()
+    response = await ahttp_get(
+        SEARCH_URL,
+        params=_search_params(query, window_start),
+        priority=INTERACTIVE
         )
-        response.raise_for_status()  # Raises HTTPError for bad status codes
-        data = response.json() or {}
+    raise_for_status(response)
+    entry = _parse_search(response.json() or {}, window_start, started)
+    await cache.aset(key, entry, timeout=ttl.jitter(SEARCH_HARD_TTL))
+    return entry
 
-    except RequestException as e:
-        # This catches all requests-related exceptions including HTTPError
-        logger.warning("Google Books search failed: %s", e)
-        return [], 0
-    except ValueError as e:
-        # This catches JSON decode errors
-        logger.warning("Google Books response parsing failed: %s", e)
-        return [], 0
 
+def _parse_search(data, window_start, started):
+    """
+    Turn one ``/volumes`` payload into a cacheable window entry; the
+    call began at ``started`` (monotonic), for XFetch's recompute time.
+    """
     items = data.get("items") or []
     total_raw = int(data.get("totalItems") or 0)
 
     books = []
+    seen = set()
 
     for item in items:
-        vi = item.get("volumeInfo", {})
-        image_links = vi.get("imageLinks", {}) or {}
-        thumbnail_url = image_links.get("thumbnail")
-        thumbnail_url = ensure_https(thumbnail_url)
-
-        books.append({
-            "id": item.get("id"),
-            "title": vi.get("title"),
-            "authors": ', '.join(vi.get("authors", [])),
-            "thumbnail": thumbnail_url,
-        })
-
+        hit = parse(item, HIT_FIELDS, SearchHit)
+        # drop accidental duplicates across the whole window
+        if hit is None or hit.id in seen:
+            continue
+        seen.add(hit.id)
+        # cached as plain tuples: smaller entries, rebuilt per page
+        books.append(hit.to_cache())
+
+    exhausted = len(items) < SEARCH_WINDOW
     # Avoid millions of pages
     total = min(total_raw, API_HARD_CAP)
+    if exhausted:
+        total = min(total, window_start + len(books))
 
-    if len(books) < max_results:
-        total = start_index + len(books)
-
-    return books, total
+    return {
+        "books": tuple(books),
+        "total": total,
+        "exhausted": exhausted,
+        "fetched_at": time.time(),
+        "delta": time.monotonic() - started,
+    }
 
 
 def fetch_book_by_id(book_id):
     """Fetch full volume details by Google Books volume ID.
 
-    Performs a GET to ``/volumes/{book_id}`` and normalizes the response into a
-    dict for the detail template.
+    Performs a GET to ``/volumes/{book_id}`` and parses the response into a
+    :class:`~books.volumes.Volume` for the detail template.
+    The payload is written through to the ``Book`` row
+    (see :func:`store_volume`).
     Failures are logged and surfaced to Django
-    by raising ``Http404`` (so the standard 404 page is returned).
+    by raising ``Http404`` (so the standard 404 page is returned),
+    unless upstream is unavailable and :func:`local_volume` has a copy.
 
     Args:
         book_id (str): Google Books volume identifier.
 
     Returns:
-        dict: Normalized volume data with keys including:
-            ``id``, ``title``, ``subtitle``, ``authors``, ``thumbnail``,
-            ``publisher``, ``publishedDate``, ``pageCount``, ``categories``,
-            ``description``, ``previewLink``, ``infoLink``
+        Volume: The parsed volume (``stale`` set for local fallbacks).
     """
 
-    url = VOLUME_URL.format(book_id)
-    params = {"key": GOOGLE_BOOKS_API_KEY} if GOOGLE_BOOKS_API_KEY else None
-
+    url, params = _volume_request(book_id)
     try:
-        resp = requests.get(url, params=params, timeout=8)
+        resp = http_get(url, params=params, priority=INTERACTIVE)
         resp.raise_for_status()
         data = resp.json() or {}
-    except RequestException as e:
+    except (RequestException, ValueError) as e:
+        error = _volume_fetch_failed(book_id, e)
+        fallback = _fallback_volume(book_id, e)
+        if fallback is not None:
+            return fallback
+        raise error from e
+
+    volume = _parse_volume(book_id, data)
+    # Write through to the local catalog (also the outage fallback)
+    store_volume(volume)
+    return volume
+
+
+async def afetch_book_by_id(book_id):
+    """Async :func:`fetch_book_by_id` for async views.
+
+    Same payload, errors and stale fallback; the fallback lookup (cache
+    and ``Book`` row) runs in a worker thread.
+    """
+    url, params = _volume_request(book_id)
+    try:
+        resp = await ahttp_get(url, params=params, priority=INTERACTIVE)
+        raise_for_status(resp)
+        data = resp.json() or {}
+    except (RequestException, ValueError) as e:
+        error = _volume_fetch_failed(book_id, e)
+        # only hop to a thread when there may be a fallback to look up
+        if is_unavailable(e):
+            fallback = await sync_to_async(_fallback_volume)(book_id, e)
+            if fallback is not None:
+                return fallback
+        raise error from e
+
+    volume = _parse_volume(book_id, data)
+    await sync_to_async(store_volume)(volume)
+    return volume
+
+
+def _volume_request(book_id):
+    """``(url, params)`` of the ``/volumes/{id}`` call for ``book_id``."""
+    _reject_unknown_id(book_id)
+    return VOLUME_URL.format(book_id), {"fields": VOLUME_FIELDS}
+
+
+def _volume_fetch_failed(book_id, exc):
+    """Log a failed detail fetch; returns the BookFetchError for it."""
+    if isinstance(exc, RequestException):
+        _remember_if_missing(book_id, exc)
         logger.warning(
-            "Google Books fetch failed for book_id %s: %s",
-            book_id,
-            e
-            )
-        raise BookFetchError(
-            "Failed to fetch book data",
-            volume_id=book_id,
-            original_exception=e
-        ) from e
-    except ValueError as e:
+            "Google Books fetch failed for book_id %s: %s", book_id, exc
+        )
+        message = "Failed to fetch book data"
+    else:
         logger.warning(
             "Google Books response parsing failed for book_id %s: %s",
             book_id,
-            e
+            exc
             )
+        message = "Failed to parse Google Books response"
+    return BookFetchError(
+        message, volume_id=book_id, original_exception=exc
+    )
+
+
+def _fallback_volume(book_id, exc):
+    """The local copy to serve if ``exc`` means upstream is unavailable."""
+    if not is_unavailable(exc):
+        return None
+    fallback = local_volume(book_id)
+    if fallback is not None:
+        metrics.incr("fallback.volume")
+    return fallback
+
+
+def _reject_unknown_id(book_id):
+    """Fail fast, without I/O, for malformed or known-missing IDs."""
+    if not missing.is_valid_volume_id(book_id):
+        raise BookFetchError("Malformed volume id", volume_id=book_id)
+    if missing.is_known_missing(book_id):
+        raise BookFetchError("Volume not found", volume_id=book_id)
+
+
+def _remember_if_missing(book_id, exc):
+    """Remember ``book_id`` in the negative cache if upstream said 404."""
+    response = getattr(exc, "response", None)
+    if response is not None and response.status_code == 404:
+        missing.mark_missing(book_id)
+
+
+def _parse_volume(book_id, data):
+    """Parse a ``/volumes/{id}`` payload; an id-less one is an error."""
+    volume = parse(data, VOLUME_FIELDS)
+    if volume is None:
         raise BookFetchError(
-            "Failed to parse Google Books response",
-            volume_id=book_id,
-            original_exception=e
-        ) from e
+            "Google Books returned a volume without an id",
+            volume_id=book_id
+        )
+    return volume
 
-    vi = data.get("volumeInfo", {}) or {}
-    image_links = vi.get("imageLinks", {}) or {}
-    thumbnail_url = image_links.get("thumbnail")
-    thumbnail_url = ensure_https(thumbnail_url)
 
-    return {
-        "id": data.get("id"),
-        "title": vi.get("title"),
-        "subtitle": vi.get("subtitle"),
-        "authors": ", ".join(vi.get("authors", [])),
-        "thumbnail": thumbnail_url,
-        "publisher": vi.get("publisher"),
-        "publishedDate": vi.get("publishedDate"),
-        "pageCount": vi.get("pageCount"),
-        "categories": vi.get("categories", []),
-        "description": vi.get("description"),
-        "previewLink": vi.get("previewLink"),
-        "infoLink": vi.get("infoLink"),
-    }
+# the columns store_volume writes; the ETag and refresh counters belong
+# to the refresh projection (_hydrate_book), which may run concurrently
+DETAIL_COLUMNS = [
+    "title", "subtitle", "authors", "thumbnail_url", "publisher",
+    "published_date_raw", "page_count", "categories", "description_z",
+    "preview_link", "info_link", "language", "detail_fetched_at",
+    "last_fetched_at", "updated_at",
+]
+
+
+def store_volume(volume):
+    """Write a fetched :class:`Volume` through to its ``Book`` row.
+
+    Only the detail fields and freshness stamps are written; the ETag
+    belongs to the refresh projection and is left alone.
+    """
+    now = timezone.now()
+    book, _ = Book.objects.get_or_create(pk=volume.id)
+    book.title = volume.title or ""
+    book.subtitle = volume.subtitle or ""
+    book.authors = list(volume.authors) or None
+    book.thumbnail_url = volume.cover or ""
+    book.publisher = volume.publisher or ""
+    book.published_date_raw = volume.published_date or ""
+    book.page_count = volume.page_count
+    book.categories = list(volume.categories) or None
+    book.description = volume.description or ""
+    book.preview_link = volume.preview_link or ""
+    book.info_link = volume.info_link or ""
+    book.language = volume.language or ""
+    book.detail_fetched_at = now
+    book.last_fetched_at = now
+    book.save(update_fields=DETAIL_COLUMNS)
+    return book
+
+
+def catalog_volume(book_id, ttl_minutes=CATALOG_TTL):
+    """Return the catalogued volume if its details are fresh, else None.
+
+    Lets the detail page render from the database on a cache miss and
+    only go upstream once the row is older than ``ttl_minutes``.
+    """
+    book = Book.objects.filter(pk=book_id).first()
+    if book is None or not book.has_details(ttl_minutes):
+        return None
+    return book.as_volume()
+
+
+def local_volume(book_id):
+    """Return the best local copy of a volume when upstream is unavailable.
+
+    Uses the persisted ``Book`` row, however old: with details when they
+    were ever written through, else the minimal hydrated fields. The
+    result is marked ``stale`` so callers can cache it only briefly.
+
+    Returns:
+        Volume | None: The stored volume with ``stale`` set,
+        or ``None`` if nothing is stored locally.
+    """
+    book = (
+        Book.objects
+        .filter(pk=book_id)
+        .exclude(title="")
+        .first()
+    )
+    if book is None:
+        return None
+    logger.info("Serving stale local data for book_id %s", book_id)
+    return book.as_volume().as_stale()
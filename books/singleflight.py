@@ -0,0 +1,188 @@
+"""
+Single-flight request coalescing for upstream Google Books fetches.
+
+Concurrent callers asking for the same key share one call:
+- threads in the same process wait on the leader's result directly;
+- other workers see the leader's lock in the shared cache and poll for
+  the result it publishes there.
+
+:func:`asingle_flight` does the same for coroutines in async views.
+"""
+import asyncio
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from books import deadline as request_deadline
+
+logger = logging.getLogger(__name__)
+
+LOCK_TTL = getattr(settings, "SINGLE_FLIGHT_LOCK_TTL", 30)
+RESULT_TTL = getattr(settings, "SINGLE_FLIGHT_RESULT_TTL", 5)
+WAIT_TIMEOUT = getattr(settings, "SINGLE_FLIGHT_WAIT_TIMEOUT", 15)
+POLL_INTERVAL = 0.05
+
+
+class _Flight:
+    """An in-process call in progress that followers can wait on."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _lock_key(key):
+    return f"sf:lock:{key}"
+
+
+def _result_key(key):
+    return f"sf:result:{key}"
+
+
+def _wait_for_other_worker(key):
+    """
+    Poll the shared cache for another worker's result.
+    Returns (found, result); found is False if the lock went away
+    without a result (leader failed) or the wait timed out.
+    """
+    # never outwait the current request's own budget
+    deadline = time.monotonic() + request_deadline.clamp(WAIT_TIMEOUT)
+    while time.monotonic() < deadline:
+        hit = cache.get(_result_key(key))
+        if hit is not None:
+            return True, hit[0]
+        if cache.get(_lock_key(key)) is None:
+            return False, None
+        time.sleep(POLL_INTERVAL)
+    logger.warning("single-flight wait timed out for %s", key)
+    return False, None
+
+
+def _lead(key, fn):
+    """Run ``fn`` as the leader, holding the shared lock if we can get it."""
+    if not cache.add(_lock_key(key), 1, timeout=LOCK_TTL):
+        found, result = _wait_for_other_worker(key)
+        if found:
+            return result
+        # Leader elsewhere failed or stalled: fetch ourselves
+        return fn()
+    try:
+        result = fn()
+        # wrap in a tuple so a legitimate None result is distinguishable
+        cache.set(_result_key(key), (result,), timeout=RESULT_TTL)
+        return result
+    finally:
+        cache.delete(_lock_key(key))
+
+
+def single_flight(key, fn):
+    """
+    Call ``fn()`` at most once per ``key`` at a time and share its result.
+
+    The first caller becomes the leader; concurrent callers in the same
+    process block until it finishes and get the same result (or exception),
+    waiting at most WAIT_TIMEOUT (or the request's deadline) before
+    calling ``fn()`` themselves.
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        # never outwait the current request's own budget
+        if not flight.done.wait(request_deadline.clamp(WAIT_TIMEOUT)):
+            logger.warning("single-flight wait timed out for %s", key)
+            # leader stalled: fetch ourselves, as with another worker's
+            return fn()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _lead(key, fn)
+        return flight.result
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+
+
+_aflights = {}
+
+
+async def _await_other_worker(key):
+    """Async :func:`_wait_for_other_worker`."""
+    # never outwait the current request's own budget
+    deadline = time.monotonic() + request_deadline.clamp(WAIT_TIMEOUT)
+    while time.monotonic() < deadline:
+        hit = await cache.aget(_result_key(key))
+        if hit is not None:
+            return True, hit[0]
+        if await cache.aget(_lock_key(key)) is None:
+            return False, None
+        await asyncio.sleep(POLL_INTERVAL)
+    logger.warning("single-flight wait timed out for %s", key)
+    return False, None
+
+
+async def _alead(key, afn):
+    """Async :func:`_lead`."""
+    if not await cache.aadd(_lock_key(key), 1, timeout=LOCK_TTL):
+        found, result = await _await_other_worker(key)
+        if found:
+            return result
+        return await afn()
+    try:
+        result = await afn()
+        await cache.aset(_result_key(key), (result,), timeout=RESULT_TTL)
+        return result
+    finally:
+        await cache.adelete(_lock_key(key))
+
+
+async def asingle_flight(key, afn):
+    """
+    Async :func:`single_flight`: ``afn()`` returns an awaitable.
+
+    Followers on the same event loop await the leader's future instead
+    of blocking a thread. If the leader is cancelled, its followers are
+    not: one of them leads a new call.
+    """
+    loop = asyncio.get_running_loop()
+    while (flight := _aflights.get(key)) is not None \
+            and flight.get_loop() is loop:
+        try:
+            # shield: a cancelled follower must not cancel the leader
+            return await asyncio.shield(flight)
+        except asyncio.CancelledError:
+            if not flight.cancelled():
+                raise
+            # the leader was cancelled (its client went away), not this
+            # request: the first follower back takes over as leader
+
+    flight = _aflights[key] = loop.create_future()
+    try:
+        result = await _alead(key, afn)
+        flight.set_result(result)
+        return result
+    except asyncio.CancelledError:
+        flight.cancel()
+        raise
+    except Exception as e:
+        flight.set_exception(e)
+        # mark retrieved so an unwatched failure is not logged as lost
+        flight.exception()
+        raise
+    finally:
+        if _aflights.get(key) is flight:
+            del _aflights[key]
@@ -0,0 +1,373 @@
+"""
+Local stand-in for the Google Books endpoints the app calls, so search,
+detail and cover traffic can be load-tested without spending API quota.
+
+Serves:
+- ``GET /books/v1/volumes`` (search)
+- ``GET /books/v1/volumes/<id>`` (volume detail)
+- ``GET /books/content?id=<id>`` (cover image)
+
+Point the app at it with::
+
+    GOOGLE_BOOKS_SEARCH_URL=http://127.0.0.1:8765/books/v1/volumes
+    GOOGLE_BOOKS_VOLUME_URL=http://127.0.0.1:8765/books/v1/volumes/{}
+    GOOGLE_BOOKS_COVER_URL=http://127.0.0.1:8765/books/content
+
+Responses are replayed from a fixture directory, one JSON file per
+request (path and query string, without the API key). Requests with no
+fixture are either:
+- fetched once from the real API and saved (``record``; only 2xx
+  and 404 replies are saved, so quota errors are never replayed);
+- answered with deterministic synthetic payloads (the default);
+- answered 404 (``strict``).
+
+Every response can be delayed by a latency distribution (see
+:func:`parse_latency`), and replaced by an injected error at
+``error_rate``. ETags are sent and ``If-None-Match`` answers 304, like
+upstream. Run it with ``python manage.py gbooks_standin``.
+"""
+import base64
+import hashlib
+import json
+import logging
+import math
+import random
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import requests
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PATH = "/books/v1/volumes"
+COVER_PATH = "/books/content"
+UPSTREAM = {
+    "/books/v1/": "https://www.googleapis.com",
+    COVER_PATH: "https://books.google.com",
+}
+# never part of a fixture's key (or file)
+IGNORED_PARAMS = {"key"}
+# results a synthetic search claims to have
+SYNTHETIC_TOTAL = 400
+JSON = "application/json; charset=UTF-8"
+
+
+@dataclass(frozen=True)
+class Reply:
+    """One canned response."""
+    status: int
+    body: bytes
+    content_type: str = JSON
+    etag: str = ""
+
+    @classmethod
+    def json(cls, status, payload):
+        """A JSON reply whose ETag is derived from its body."""
+        body = json.dumps(payload).encode()
+        return cls(status, body, JSON, _etag(body) if status == 200 else "")
+
+
+def _etag(body):
+    return '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+# --- Latency -------------------------------------------------------
+def parse_latency(spec):
+    """
+    Build a sampler returning a delay in seconds from ``spec``
+    (milliseconds):
+
+    - ``"0"``, ``"120"``: fixed;
+    - ``"uniform:20,200"``: between the bounds;
+    - ``"normal:100,30"``: mean and stddev, clipped at 0;
+    - ``"lognormal:80,0.6"``: median and sigma, long-tailed like a
+      real API;
+    - ``"exp:100"``: exponential with that mean.
+
+    Raises ValueError for anything else.
+    """
+    kind, _, args = spec.partition(":")
+    if not args:
+        fixed = float(kind) / 1000
+        if fixed < 0:
+            raise ValueError(f"negative latency: {spec!r}")
+        return lambda rng: fixed
+    values = [float(v) for v in args.split(",")]
+    shapes = {
+        ("uniform", 2): lambda rng: rng.uniform(*values),
+        ("normal", 2): lambda rng: max(0.0, rng.gauss(*values)),
+        ("lognormal", 2): lambda rng: rng.lognormvariate(
+            math.log(values[0]), values[1]
+        ),
+        ("exp", 1): lambda rng: rng.expovariate(1 / values[0]),
+    }
+    sample = shapes.get((kind, len(values)))
+    if sample is None or min(values) < 0 or (
+            kind in ("lognormal", "exp") and values[0] == 0):
+        raise ValueError(f"invalid latency spec: {spec!r}")
+    return lambda rng: sample(rng) / 1000
+
+
+# --- Fixtures ------------------------------------------------------
+def fixture_key(path, query):
+    """Canonical request key: path plus sorted query, minus the API key."""
+    params = sorted(
+        (k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+        if k not in IGNORED_PARAMS
+    )
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+class FixtureStore:
+    """Recorded replies, one JSON file per request key."""
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def path_for(self, key):
+        """The fixture file for ``key``."""
+        digest = hashlib.sha256(key.encode()).hexdigest()[:24]
+        return self.directory / f"{digest}.json"
+
+    def load(self, key):
+        """The recorded :class:`Reply` for ``key``, or None."""
+        try:
+            data = json.loads(self.path_for(key).read_text())
+        except FileNotFoundError:
+            return None
+        if "json" in data:
+            body = json.dumps(data["json"]).encode()
+        else:
+            body = base64.b64decode(data["body_b64"])
+        return Reply(
+            data["status"], body, data["content_type"], data.get("etag", "")
+        )
+
+    def save(self, key, reply):
+        """Record ``reply`` for ``key`` (JSON bodies stay readable)."""
+        data = {
+            "request": key,
+            "status": reply.status,
+            "content_type": reply.content_type,
+            "etag": reply.etag,
+        }
+        if reply.content_type.startswith("application/json"):
+            data["json"] = json.loads(reply.body or b"null")
+        else:
+            data["body_b64"] = base64.b64encode(reply.body).decode()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path_for(key).write_text(json.dumps(data, indent=1))
+
+
+def fetch_upstream(path, query):
+    """
+    Fetch ``path?query`` from the real service (the app's API key is
+    passed through). Returns a :class:`Reply`, 502 if unreachable.
+    """
+    base = next(
+        (host for prefix, host in UPSTREAM.items()
+         if path.startswith(prefix)),
+        None
+    )
+    if base is None:
+        return None
+    url = f"{base}{path}?{query}" if query else f"{base}{path}"
+    try:
+        resp = requests.get(url, timeout=10)
+    except requests.RequestException as e:
+        logger.warning("Recording %s failed: %s", path, e)
+        return Reply.json(502, {"error": {"code": 502, "message": str(e)}})
+    return Reply(
+        resp.status_code,
+        resp.content,
+        resp.headers.get("Content-Type", "application/octet-stream"),
+        resp.headers.get("ETag", ""),
+    )
+
+
+# --- Synthetic payloads --------------------------------------------
+def synthetic_id(seed):
+    """A deterministic, well-formed volume ID."""
+    return "SYN" + hashlib.blake2b(seed.encode(), digest_size=6).hexdigest()
+
+
+def _volume_payload(volume_id, title):
+    return {
+        "kind": "books#volume",
+        "id": volume_id,
+        "volumeInfo": {
+            "title": title,
+            "subtitle": "A stand-in volume",
+            "authors": ["Stand-in Author"],
+            "publisher": "NextChaptr Test Press",
+            "publishedDate": "2020-01-01",
+            "pageCount": 320,
+            "categories": ["Fiction"],
+            "description": f"Synthetic details for {volume_id}.",
+            "language": "en",
+            "imageLinks": {
+                "thumbnail": f"https://books.google.com{COVER_PATH}"
+                             f"?id={volume_id}&img=1&zoom=1",
+                "smallThumbnail": f"https://books.google.com{COVER_PATH}"
+                                  f"?id={volume_id}&img=1&zoom=5",
+            },
+        },
+    }
+
+
+def _png(width, height, rgb):
+    """A solid-colour RGB PNG (stdlib only)."""
+    def chunk(kind, data):
+        crc = zlib.crc32(kind + data) & 0xFFFFFFFF
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(
+            ">I", crc
+        )
+    row = b"\x00" + bytes(rgb) * width
+    return b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(row * height, 9)),
+        chunk(b"IEND", b""),
+    ))
+
+
+def synthesize(path, params):
+    """A deterministic :class:`Reply` for ``path``, or None if unknown."""
+    if path == SEARCH_PATH:
+        query = params.get("q", "")
+        start = int(params.get("startIndex") or 0)
+        size = min(int(params.get("maxResults") or 10), 40)
+        stop = min(start + size, SYNTHETIC_TOTAL)
+        return Reply.json(200, {
+            "kind": "books#volumes",
+            "totalItems": SYNTHETIC_TOTAL,
+            "items": [
+                _volume_payload(
+                    synthetic_id(f"{query}:{i}"), f"{query.title()} {i + 1}"
+                )
+                for i in range(start, stop)
+            ],
+        })
+    if path.startswith(SEARCH_PATH + "/"):
+        volume_id = path.rsplit("/", 1)[1]
+        return Reply.json(
+            200, _volume_payload(volume_id, f"Volume {volume_id}")
+        )
+    if path == COVER_PATH and params.get("id"):
+        digest = hashlib.blake2b(params["id"].encode(), digest_size=3)
+        body = _png(128, 192, digest.digest())
+        return Reply(200, body, "image/png", _etag(body))
+    return None
+
+
+# --- Server --------------------------------------------------------
+def _recordable(status):
+    """Replies worth replaying: answers, and 404s for the miss paths."""
+    return 200 <= status < 300 or status == 404
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering like Google Books (see module docs).
+    ``stats`` counts replies by source: replayed, recorded, synthetic,
+    missing, failed (recording upstream failed or answered an error
+    other than 404, which is passed on unsaved), injected and
+    not_modified.
+    """
+    daemon_threads = True
+
+    def __init__(
+        self, address, *, fixtures=None, record=False, strict=False,
+        latency="0", error_rate=0.0, error_status=503, seed=None,
+        verbose=False,
+    ):
+        if record and not fixtures:
+            raise ValueError("recording needs a fixtures directory")
+        super().__init__(address, _Handler)
+        self.store = FixtureStore(fixtures) if fixtures else None
+        self.record = record
+        self.strict = strict
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.verbose = verbose
+        self.random = random.Random(seed)
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        """``http://host:port`` the server listens on."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self):
+        """(delay in seconds, inject an error?) for one request."""
+        with self._lock:
+            return (
+                self.latency(self.random),
+                self.random.random() < self.error_rate,
+            )
+
+    def resolve(self, path, query):
+        """(reply, source) for one request."""
+        key = fixture_key(path, query)
+        reply = self.store.load(key) if self.store else None
+        if reply is not None:
+            return reply, "replayed"
+        if self.record:
+            reply = fetch_upstream(path, query)
+            if reply is not None and _recordable(reply.status):
+                self.store.save(key, reply)
+                return reply, "recorded"
+            if reply is not None:
+                # quota and server errors pass through, never replayed
+                return reply, "failed"
+        if not self.strict:
+            reply = synthesize(path, dict(parse_qsl(query)))
+            if reply is not None:
+                return reply, "synthetic"
+        return Reply.json(404, {"error": {"code": 404}}), "missing"
+
+    def count(self, source):
+        with self._lock:
+            self.stats[source] += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        server = self.server
+        url = urlsplit(self.path)
+        delay, inject = server.draw()
+        if delay:
+            time.sleep(delay)
+        if inject:
+            reply, source = Reply.json(server.error_status, {
+                "error": {"code": server.error_status, "message": "injected"}
+            }), "injected"
+        else:
+            reply, source = server.resolve(url.path, url.query)
+        if (reply.status == 200 and reply.etag
+                and self.headers.get("If-None-Match") == reply.etag):
+            reply, source = Reply(304, b"", reply.content_type,
+                                  reply.etag), "not_modified"
+        server.count(source)
+
+        self.send_response(reply.status)
+        self.send_header("Content-Type", reply.content_type)
+        self.send_header("Content-Length", str(len(reply.body)))
+        if reply.etag:
+            self.send_header("ETag", reply.etag)
+        self.end_headers()
+        self.wfile.write(reply.body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        if self.server.verbose:
+            super().log_message(format, *args)
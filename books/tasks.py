@@ -0,0 +1,28 @@
+"""Background jobs for the books app (run by ``manage.py runworker``)."""
+from django.conf import settings
+from books.ratelimit import BACKGROUND
+from books.refresh import refresh_stale
+from books.services import fetch_or_refresh_book
+from books.warming import warm_covers as warm_covers_now
+from jobs.registry import task
+
+# books refreshed per periodic run; keep a run well inside the job lease
+REFRESH_JOB_LIMIT = getattr(settings, "GOOGLE_BOOKS_REFRESH_JOB_LIMIT", 200)
+
+
+@task("books.hydrate", max_attempts=3)
+def hydrate_book(volume_id, force=False):
+    """Fill in (or refresh) a Book row; errors are retried by the queue."""
+    fetch_or_refresh_book(volume_id, force=force, priority=BACKGROUND)
+
+
+@task("books.refresh_stale", max_attempts=1)
+def refresh_stale_books():
+    """Periodic bulk refresh of rows past their adaptive TTL."""
+    refresh_stale(workers=2, limit=REFRESH_JOB_LIMIT)
+
+
+@task("books.warm_covers", max_attempts=1)
+def warm_covers(volume_ids):
+    """Fetch covers a search just rendered into the cover store."""
+    warm_covers_now(volume_ids, workers=4)
@@ -0,0 +1,77 @@
+"""
+Expiry helpers that keep entries written together from expiring together.
+
+- :func:`jitter` shortens a TTL by a random share (up to JITTER), so a
+  burst of writes expires over a window instead of at one instant;
+  :func:`jitter_for` does the same, stable per key (a row's TTL does not
+  change between checks).
+- :func:`should_refresh_early` is XFetch (Vattani et al., "Optimal
+  Probabilistic Cache Stampede Prevention"): each reader recomputes
+  early with a probability that rises as expiry approaches, scaled by
+  how long a recompute takes (``delta``) and BETA.
+- :func:`acache_get`/:func:`acache_set` wrap the cache (for the async
+  detail view): entries carry their expiry and recompute time, timeouts
+  are jittered, and an entry picked for early refresh reads as a miss.
+
+Early refreshes are counted as ``early_refresh.<kind>`` metrics.
+"""
+import hashlib
+import math
+import random
+import time
+from django.conf import settings
+from django.core.cache import cache
+from books import metrics
+
+# largest share a TTL is shortened by
+JITTER = getattr(settings, "CACHE_TTL_JITTER", 0.1)
+# > 1 refreshes earlier, < 1 later
+BETA = getattr(settings, "CACHE_XFETCH_BETA", 1.0)
+# for DB rows, the share of the TTL XFetch uses as the recompute time:
+# with 0.02 a 24h row has a 1/e chance of coming due ~30 min early
+ROW_DELTA_SHARE = getattr(settings, "CACHE_XFETCH_ROW_DELTA_SHARE", 0.02)
+
+
+def jitter(ttl):
+    """``ttl`` shortened by a random share of up to JITTER."""
+    return int(ttl * (1 - JITTER * random.random()))
+
+
+def jitter_for(key, ttl):
+    """``ttl`` shortened by a share of up to JITTER that is fixed per key."""
+    digest = hashlib.blake2b(str(key).encode(), digest_size=8).digest()
+    share = int.from_bytes(digest, "big") / 2 ** 64
+    return ttl * (1 - JITTER * share)
+
+
+def should_refresh_early(expires_at, delta, *, now=None):
+    """
+    XFetch: True if this reader should recompute now although the value
+    only expires at ``expires_at`` (epoch seconds). ``delta`` is the
+    recompute time in seconds.
+    """
+    now = time.time() if now is None else now
+    # 1 - random() is in (0, 1], so the log is defined
+    return now - delta * BETA * math.log(1.0 - random.random()) >= expires_at
+
+
+async def acache_set(key, value, ttl, *, delta):
+    """Cache ``value`` for a jittered ``ttl``, remembering ``delta``."""
+    ttl = jitter(ttl)
+    await cache.aset(key, (value, time.time() + ttl, delta), timeout=ttl)
+
+
+async def acache_get(key, kind):
+    """The cached value, or None if missing or picked for early refresh."""
+    value, early = _unwrap(await cache.aget(key))
+    if early:
+        await metrics.aincr(f"early_refresh.{kind}")
+        return None
+    return value
+
+
+def _unwrap(entry):
+    if entry is None:
+        return None, False
+    value, expires_at, delta = entry
+    return value, should_refresh_early(expires_at, delta)
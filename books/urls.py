@@ -5,6 +5,6 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('search/', views.book_search, name='book_search'),
-    path("books/<str:book_id>/", views.book_detail, name="book_detail"),
-    path("cover/<str:book_id>", views.cover_proxy, name="cover_proxy"),
+    path("books/<volume_id:book_id>/", views.book_detail, name="book_detail"),
+    path("cover/<volume_id:book_id>", views.cover_proxy, name="cover_proxy"),
 ]
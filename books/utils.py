@@ -16,12 +16,12 @@ def ensure_https(url: Optional[str]) -> Optional[str]:
     return re.sub(r"^http:", "https:", url, count=1)
 
 
-def meta_description_from_volume(book: dict, max_len: int = 155) -> str:
+def meta_description_from_volume(book, max_len: int = 155) -> str:
     """
     Normalize, sanitize and slice book description
     to create meta description tag
     """
-    text = book.get("description") or ""
+    text = getattr(book, "description", None) or ""
 
     # Normalize and sanitize
     text = unescape(text)                      # decode entities
@@ -29,8 +29,8 @@ def meta_description_from_volume(book: dict, max_len: int = 155) -> str:
     text = re.sub(r"\s+", " ", text).strip()   # collapse whitespace
 
     if not text:
-        title = book.get("title") or "Untitled"
-        authors = book.get("authors") or []
+        title = getattr(book, "title", None) or "Untitled"
+        authors = getattr(book, "byline", "")
         text = f"{title} — by {authors}." if authors else f"{title}."
 
     if len(text) <= max_len:
@@ -0,0 +1,121 @@
+"""
+Resized, re-encoded cover variants for ``srcset``.
+
+Pages show covers far smaller than Google's zoom=1 image (48px wide in
+the library list, 128px in search results), so ``/cover/<id>?w=<width>``
+serves the cover scaled down to one of WIDTHS, encoded as the best
+format the client's Accept header allows: AVIF, then WebP, then JPEG.
+The book page shows the cover at column width, wider than any variant,
+so it keeps the original.
+
+A variant is rendered from the stored original on its first request
+and kept in the cover store (:mod:`books.covers`) under a key of its
+own, so it is cached, deduplicated and evicted like any cover.
+
+Pillow is optional. Without it (or without an AVIF/WebP encoder) the
+missing formats are skipped, and with no Pillow at all pages emit no
+``srcset`` and every request gets the original.
+"""
+import io
+import logging
+from django.conf import settings
+from django.urls import reverse
+
+try:
+    from PIL import Image
+except ImportError:  # optional: covers are then served as fetched
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# widths (px) variants are rendered at; a cover is never scaled up
+WIDTHS = tuple(getattr(settings, "COVER_VARIANT_WIDTHS", (48, 96, 128)))
+# best first: (content type, Pillow format, encoder options)
+FORMATS = (
+    ("image/avif", "AVIF", {"quality": 50}),
+    ("image/webp", "WEBP", {"quality": 75, "method": 4}),
+    ("image/jpeg", "JPEG", {"quality": 80, "optimize": True}),
+)
+
+
+def available():
+    """Whether variants can be rendered here (Pillow is installed)."""
+    return Image is not None
+
+
+def _encoders():
+    Image.init()
+    return [fmt for fmt in FORMATS if fmt[1] in Image.SAVE]
+
+
+def parse_width(value):
+    """``value`` (the ``w`` query parameter) as one of WIDTHS, or None."""
+    try:
+        width = int(value)
+    except (TypeError, ValueError):
+        return None
+    return width if width in WIDTHS else None
+
+
+def negotiate(accept):
+    """The best format in FORMATS the Accept header ``accept`` allows."""
+    accept = accept or ""
+    for fmt in _encoders():
+        # every browser takes JPEG, whatever its Accept header says
+        if fmt[0] in accept or fmt[0] == "image/jpeg":
+            return fmt
+    return None
+
+
+def variant_key(volume_id, width, content_type):
+    """Store key of a variant; never a valid volume ID, so never clashes."""
+    return f"{volume_id}@{width}.{content_type.split('/')[1]}"
+
+
+def srcset(volume_id):
+    """``srcset`` for ``volume_id``'s proxied cover ('' without Pillow)."""
+    if not available():
+        return ""
+    url = reverse("cover_proxy", args=[volume_id])
+    return ", ".join(f"{url}?w={width} {width}w" for width in WIDTHS)
+
+
+def render(content, width, fmt):
+    """Image bytes ``content`` at most ``width`` px wide, as ``fmt``."""
+    _, name, options = fmt
+    with Image.open(io.BytesIO(content)) as original:
+        img = original
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.Resampling.LANCZOS)
+        if name == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        elif img.mode not in ("RGB", "RGBA", "L", "LA"):
+            img = img.convert("RGBA")
+        out = io.BytesIO()
+        img.save(out, name, **options)
+    return out.getvalue()
+
+
+def build(store, volume_id, width, fmt):
+    """
+    Render ``volume_id``'s stored cover at ``width`` as ``fmt`` and store
+    it; returns the :class:`~books.covers.StoredCover`, or None if the
+    original isn't stored (yet) or can't be decoded.
+    """
+    original = store.load(volume_id)
+    if original is None:
+        return None
+    cover, content = original
+    try:
+        data = render(content, width, fmt)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning("Could not render cover %s at %d: %s",
+                       volume_id, width, e)
+        return None
+    key = variant_key(volume_id, width, fmt[0])
+    if len(data) >= cover.size:
+        # re-encoding didn't help: the variant is the original (same
+        # blob, so it costs no space)
+        return store.put(key, content, cover.content_type)
+    return store.put(key, data, fmt[0])
@@ -6,19 +6,26 @@ This module exposes:
 - Search flow that builds a Google Books query (with basic operators)
   and renders results.
 - Detail flow that fetches a single volume by ID with low-level caching.
+
+Search, detail and the cover proxy are async views: under ASGI the
+upstream Google Books call is awaited on the event loop and only the
+database/template part runs in a worker thread.
 """
+import asyncio
+import time
+from functools import partial
 from urllib.parse import urlparse
-import requests
+from asgiref.sync import sync_to_async
 from django.templatetags.static import static
 from django.core.paginator import Paginator
 from django.shortcuts import render
 from django.contrib import messages
 from django.contrib.auth.models import AnonymousUser
-from django.core.cache import cache
-from django.views.decorators.cache import cache_page
-from django.http import Http404, HttpResponse
+from django.http import Http404, StreamingHttpResponse
 from django.db.utils import ProgrammingError, OperationalError
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from activity.models import Rating, ReadingStatus, Review
 from activity.forms import ReviewForm
 from activity.services import (
@@ -27,12 +34,17 @@ from activity.services import (
     get_average_rating,
     get_number_of_ratings
 )
+from books import covers, metrics, missing, ttl, variants, warming
+from books.client import astream_get
 from books.exceptions import BookFetchError
+from books.singleflight import asingle_flight
 from books.services import (
-    search_google_books,
-    fetch_book_by_id,
+    asearch_google_books,
+    afetch_book_by_id,
+    catalog_volume,
 )
 from books.utils import _genres, build_q
+from books.volumes import Overlay, Volume
 # Create your views here.
 
 
@@ -41,7 +53,7 @@ def _dedupe_by_id(items):
     seen = set()  # remembers which ids are already kept
     output = []
     for b in items:
-        _id = b.get("id")  # pull its id
+        _id = b.id  # pull its id
         if not _id or _id in seen:  # if id is missing/falsy OR already seen
             continue  # skip
         seen.add(_id)  # mark this id as seen
@@ -57,13 +69,13 @@ def home(request):
     return render(request, "books/home.html", {"genres": genres})
 
 
-def book_search(request):
+async def book_search(request):
     """Handle the search page:
        build query, call API helper, render results.
 
     Reads ``field`` and ``q`` from ``request.GET``,
     normalizes them via `build_q`,
-    calls `search_google_books` if non-empty,
+    awaits `asearch_google_books` if non-empty,
     and renders ``books/search_results.html``.
 
     Args:
@@ -82,7 +94,9 @@ def book_search(request):
     if not q_raw:
         if request.GET:
             messages.info(request, "Type something to search.")
-        return render(request, "books/home.html", {"genres": _genres()})
+        return await sync_to_async(render)(
+            request, "books/home.html", {"genres": _genres()}
+            )
     query_string = q_raw.lower().strip()
     query_for_api = build_q(q_raw, field)
 
@@ -93,7 +107,7 @@ def book_search(request):
         current_page = 1
     start_index = (current_page - 1) * per_page
 
-    books, total = search_google_books(
+    books, total = await asearch_google_books(
         query_for_api,
         start_index=start_index,
         max_results=per_page
@@ -101,8 +115,16 @@ def book_search(request):
 
     # remove accidental duplicates from the API
     books = _dedupe_by_id(books)
+    return await sync_to_async(_render_search_results)(
+        request, books, total, current_page, per_page, query_string, field
+        )
+
 
-    ids = [r["id"] for r in books]
+def _render_search_results(
+    request, books, total, current_page, per_page, query_string, field
+):
+    """Decorate results with the user's data and render the page (sync)."""
+    ids = [r.id for r in books]
     user = getattr(request, "user", AnonymousUser())
     status_map = statuses_map_for(user, ids)
     rating_map = ratings_map_for(user, ids)
@@ -110,20 +132,25 @@ def book_search(request):
     labels = dict(ReadingStatus.Status.choices)
 
     placeholder = static("images/placeholder_cover.png")
+    # results are shared records; per-request fields go on an overlay
+    books = [
+        Overlay(
+            b,
+            cover_url=_cover_url(b, placeholder),
+            cover_srcset=_cover_srcset(b),
+            user_status=(status_map.get(b.id) or {}).get("status"),
+            user_rating=rating_map.get(b.id, 0),
+            avg_rating=get_average_rating(b.id),
+            num_ratings=get_number_of_ratings(b.id),
+        )
+        for b in books
+    ]
     for b in books:
-        status = (status_map.get(b["id"])
-                  or {}).get("status")
-        thumb = (b.get("thumbnail") or "").strip()
-        b["cover_url"] = (
-            f"{reverse('cover_proxy', args=[b['id']])}"
-            if thumb
-            else placeholder
+        b.user_status_label = labels.get(b.user_status)
+    if warming.ON_SEARCH:
+        warming.schedule_warming(
+            [b.id for b in books if (b.thumbnail or "").strip()]
         )
-        b["user_status"] = status
-        b["user_status_label"] = labels.get(status)
-        b["user_rating"] = rating_map.get(b["id"], 0)
-        b["avg_rating"] = get_average_rating(b["id"])
-        b["num_ratings"] = get_number_of_ratings(b["id"])
 
     paginator = Paginator(range(total), per_page)
     page_obj = paginator.get_page(current_page)
@@ -149,13 +176,48 @@ def book_search(request):
     )
 
 
-def book_detail(request, book_id):
-    """Render the detail page for a single book with 1-hour caching.
+def _cover_url(record, placeholder):
+    """Proxied cover for records with a thumbnail, else the placeholder."""
+    if (record.thumbnail or "").strip():
+        return reverse("cover_proxy", args=[record.id])
+    return placeholder
+
+
+def _cover_srcset(record):
+    """Scaled-down variants of the proxied cover, if there is one."""
+    if (record.thumbnail or "").strip():
+        return variants.srcset(record.id)
+    return ""
+
+
+async def _reject_missing(book_id):
+    """404 at once for IDs upstream recently answered 404 for."""
+    if missing.is_known_missing(book_id):
+        await metrics.aincr("negative_cache.hit")
+        raise Http404("Book not found.")
+
+
+async def _reject_missing_cover(book_id):
+    """404 at once for covers (or volumes) upstream recently 404'd."""
+    if missing.is_cover_known_missing(book_id):
+        await metrics.aincr("negative_cache.hit")
+        raise Http404()
+
+
+async def book_detail(request, book_id):
+    """Render the detail page for a single book with ~1-hour caching.
 
-    Checks a low-level cache for the normalized volume dict.
-    If missing, calls :func:`fetch_book_by_id`,
-    stores the result under the key ``"gbooks:vol:{book_id}"``
+    Checks a low-level cache for the volume, then the
+    local catalog (:func:`catalog_volume`).
+    If both miss, awaits :func:`afetch_book_by_id` (coalesced with any
+    concurrent miss for the same ID via :func:`asingle_flight`), stores
+    the result under the key ``"gbooks:vol:{book_id}"``
     and renders ``books/book_detail.html``.
+    Cache entries get jittered TTLs and may be refreshed a little early
+    (see :mod:`books.ttl`), so volumes cached together don't all expire
+    together.
+    IDs upstream recently answered 404 for are rejected before any of
+    that (see :mod:`books.missing`).
 
     Args:
         request: The current request.
@@ -163,35 +225,52 @@ def book_detail(request, book_id):
 
     Returns:
         response: The rendered detail template with
-        context ``{"book": <dict>}``.
+        context ``{"book": <Volume>}``.
     """
 
+    await _reject_missing(book_id)
     cache_key = f"gbooks:vol:{book_id}"
-    book = cache.get(cache_key)
+    cached = await ttl.acache_get(cache_key, "volume")
+    book = Volume.from_cache(cached) if cached else None
     if not book:
-        try:
-            book = fetch_book_by_id(book_id)
-        except BookFetchError as e:
-            messages.warning(
-                request,
-                "We couldn't load that book right now. Please try again."
+        started = time.monotonic()
+        # fresh written-through rows render without an upstream call
+        book = await sync_to_async(catalog_volume)(book_id)
+        if not book:
+            try:
+                # concurrent misses for the same volume share one call
+                book = await asingle_flight(
+                    f"vol:{book_id}",
+                    lambda: afetch_book_by_id(book_id)
+                )
+            except BookFetchError as e:
+                messages.warning(
+                    request,
+                    "We couldn't load that book right now. Please try again."
+                )
+                raise Http404("Book not found.") from e
+        # stale fallbacks are cached briefly so we retry upstream soon
+        await ttl.acache_set(
+            cache_key,
+            book.to_cache(),
+            60 if book.stale else 60*60,
+            delta=time.monotonic() - started
             )
-            raise Http404("Book not found.") from e
-        cache.set(cache_key, book, timeout=60*60)
 
-    thumb = (book.get("thumbnail") or "").strip()
-    placeholder = static("images/placeholder_cover.png")
-    book["cover_url"] = (
-        f"{reverse('cover_proxy', args=[book['id']])}"
-        if thumb
-        else placeholder
+    return await sync_to_async(_render_book_detail)(request, book_id, book)
+
+
+def _render_book_detail(request, book_id, book):
+    """Add the user's status, rating and reviews and render (sync)."""
+    # the volume may be shared with other requests; never mutate it
+    book = Overlay(
+        book,
+        # no srcset: the page shows the cover wider than any variant
+        cover_url=_cover_url(book, static("images/placeholder_cover.png")),
+        user_rating=0,
+        avg_rating=get_average_rating(book_id),
+        num_ratings=get_number_of_ratings(book_id),
     )
-    book["user_status"] = None
-    book["user_status_label"] = None
-    book["user_rating"] = 0
-    # avg rating
-    book["avg_rating"] = get_average_rating(book_id)
-    book["num_ratings"] = get_number_of_ratings(book_id)
 
     form = None
     reviews = []
@@ -210,8 +289,8 @@ def book_detail(request, book_id):
             )
             status = rs.status if rs else None
             labels = dict(ReadingStatus.Status.choices)
-            book["user_status"] = status
-            book["user_status_label"] = labels.get(status)
+            book.user_status = status
+            book.user_status_label = labels.get(status)
             # rating
             r = (
                 Rating.objects
@@ -219,10 +298,10 @@ def book_detail(request, book_id):
                 .only("rating")
                 .first()
             )
-            book["user_rating"] = r.rating if r else 0
+            book.user_rating = r.rating if r else 0
             # avg rating
-            book["avg_rating"] = get_average_rating(book_id)
-            book["num_ratings"] = get_number_of_ratings(book_id)
+            book.avg_rating = get_average_rating(book_id)
+            book.num_ratings = get_number_of_ratings(book_id)
             # book reviews
             reviews = (
                 Review.objects
@@ -286,33 +365,194 @@ def book_detail(request, book_id):
     )
 
 
+COVER_TTL = 60 * 60 * 24 * 30  # 30 days
+
+# bytes read (and sent) at a time, so memory per cover stays flat
+COVER_CHUNK = 64 * 1024
+# seconds a request waits for this process's fetch of the same cover
+COVER_WAIT = 15
+# covers being streamed from upstream: volume ID -> future set when done
+_cover_fetches = {}
+
 # whitelist
 ALLOWED_HOSTS = {
     "books.google.com",
     "books.googleusercontent.com",
-    "nextchaptr-f17e381cb655.herokuapp.com"
+    "nextchaptr-f17e381cb655.herokuapp.com",
+    urlparse(covers.UPSTREAM_URL).hostname,
     }
 
 
-@cache_page(60 * 60 * 24 * 30)  # 30 days
-def cover_proxy(request, book_id):
+async def cover_proxy(request, book_id):
     """
     Serve a Google Books cover by ID.
+
+    Covers are streamed in COVER_CHUNK pieces, from the on-disk store
+    (:mod:`books.covers`) when it has them, else from upstream while
+    being written to the store, so no cover is ever held in memory whole
+    and upstream is called once per cover. Requests for a cover this
+    process is already fetching wait for it and read the store.
+
+    Stored covers carry an ETag (their content hash) and Last-Modified,
+    and a conditional request that matches is answered 304 from the
+    index alone. A cover streamed from upstream has neither yet: its
+    hash is only known once the last chunk is through.
+
+    With ``?w=<width>`` the cover is served scaled down and re-encoded
+    (:mod:`books.variants`) for ``srcset``.
     """
-    url = (
-        f"https://books.google.com/books/content"
-        f"?id={book_id}&printsec=frontcover&img=1&"
-        f"zoom=1&edge=curl&source=gbs_api"
-    )
+    url = covers.upstream_url(book_id)
     host = urlparse(url).hostname or ""
     if host not in ALLOWED_HOSTS:
         raise Http404()
+    await _reject_missing_cover(book_id)
+
+    store = covers.get_store()
+    width = variants.parse_width(request.GET.get("w"))
+    if width and variants.available():
+        resp = await _cover_variant(request, store, book_id, width)
+        if resp is not None:
+            return resp
+
+    cover = await sync_to_async(store.get)(book_id)
+    fetching = _cover_fetches.get(book_id)
+    if (cover is None and fetching is not None
+            and fetching.get_loop() is asyncio.get_running_loop()):
+        try:
+            await asyncio.wait_for(asyncio.shield(fetching), COVER_WAIT)
+        except asyncio.TimeoutError:
+            pass
+        await _reject_missing_cover(book_id)
+        cover = await sync_to_async(store.get)(book_id)
+    resp = None
+    if cover is not None:
+        resp = await _serve_stored_cover(request, store, book_id, cover)
+    if resp is None:
+        resp = await _stream_upstream_cover(store, book_id, url)
+    if width and variants.available():
+        # the original stands in until the variant can be rendered;
+        # don't let it be cached under the variant's URL
+        resp["Cache-Control"] = "no-cache"
+    return resp
+
 
-    r = requests.get(url, timeout=10)
-    if r.status_code != 200:
+async def _cover_variant(request, store, book_id, width):
+    """
+    The cover at ``width`` in the best format the client accepts,
+    rendered now if need be; None until the original is stored.
+    """
+    fmt = variants.negotiate(request.headers.get("Accept"))
+    key = variants.variant_key(book_id, width, fmt[0])
+    cover = await sync_to_async(store.get)(key)
+    if cover is None:
+        # CPU-bound: off the event loop, and off the sync thread too
+        cover = await sync_to_async(
+            variants.build, thread_sensitive=False
+        )(store, book_id, width, fmt)
+        if cover is None:
+            return None
+        await metrics.aincr("cover.variant.rendered")
+    resp = await _serve_stored_cover(request, store, key, cover)
+    if resp is not None:
+        resp["Vary"] = "Accept"
+    return resp
+
+
+async def _serve_stored_cover(request, store, key, cover):
+    """
+    Stream stored ``cover`` (304 if the client has it); None if its
+    file has gone since the index was read.
+    """
+    # a browser revalidating needs only the index, not the file
+    not_modified = get_conditional_response(
+        request,
+        etag=cover.etag,
+        last_modified=int(cover.stored_at),
+    )
+    if not_modified is not None:
+        await metrics.aincr("cover.not_modified")
+        return _cache_cover(_cover_headers(not_modified, cover))
+    f = await sync_to_async(store.open_file)(key, cover)
+    if f is None:
+        return None
+    resp = _cover_response(_aiter_file(f), cover.content_type, cover.size)
+    return _cover_headers(resp, cover)
+
+
+async def _stream_upstream_cover(store, book_id, url):
+    """Stream a cover from upstream to the client and into ``store``."""
+    fetching = asyncio.get_running_loop().create_future()
+    _cover_fetches[book_id] = fetching
+
+    def finish():
+        if _cover_fetches.get(book_id) is fetching:
+            del _cover_fetches[book_id]
+        if not fetching.done():
+            fetching.set_result(None)
+
+    try:
+        upstream = await astream_get(url)
+    except BaseException:
+        finish()
+        raise
+    if upstream.status_code != 200:
+        await upstream.aclose()
+        finish()
+        if upstream.status_code == 404:
+            missing.mark_cover_missing(book_id)
         raise Http404()
 
-    content_type = r.headers.get("Content-Type", "image/jpeg")
-    resp = HttpResponse(r.content, content_type=content_type)
-    resp["Cache-Control"] = "public, max-age=2592000, immutable"
+    content_type = upstream.headers.get("Content-Type", "image/jpeg")
+    in_thread = partial(sync_to_async, thread_sensitive=False)
+    writer = await in_thread(store.writer)()
+
+    async def tee():
+        committed = False
+        try:
+            async for chunk in upstream.aiter_bytes(COVER_CHUNK):
+                await in_thread(writer.write)(chunk)
+                yield chunk
+            await in_thread(writer.commit)(book_id, content_type)
+            committed = True
+        finally:
+            # also runs when the client goes away mid-stream
+            await upstream.aclose()
+            if not committed:
+                await in_thread(writer.discard)()
+            finish()
+
+    size = None
+    if "Content-Encoding" not in upstream.headers:
+        size = upstream.headers.get("Content-Length")
+    return _cover_response(tee(), content_type, size)
+
+
+async def _aiter_file(f):
+    """Yield ``f`` in COVER_CHUNK pieces off the event loop, then close it."""
+    in_thread = partial(sync_to_async, thread_sensitive=False)
+    try:
+        while chunk := await in_thread(f.read)(COVER_CHUNK):
+            yield chunk
+    finally:
+        await in_thread(f.close)()
+
+
+def _cover_response(chunks, content_type, size):
+    resp = StreamingHttpResponse(chunks, content_type=content_type)
+    if size is not None:
+        resp["Content-Length"] = str(size)
+    return _cache_cover(resp)
+
+
+def _cache_cover(resp):
+    # covers never change, so there is no recompute to spread out:
+    # every response gets the same 30 days
+    resp["Cache-Control"] = f"public, max-age={COVER_TTL}, immutable"
+    return resp
+
+
+def _cover_headers(resp, cover):
+    """Add a stored ``cover``'s validators to ``resp``."""
+    resp["ETag"] = cover.etag
+    resp["Last-Modified"] = http_date(cover.stored_at)
     return resp
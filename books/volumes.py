@@ -0,0 +1,182 @@
+"""
+Typed records for Google Books volumes and the single parser behind them.
+
+:class:`Volume` (detail pages, Book rows) and :class:`SearchHit` (search
+results) are frozen, slotted dataclasses: cheap to build, safe to share
+between requests, and cached as plain tuples via ``to_cache``/
+``from_cache``. Per-request data (cover URL, the user's status, ...) is
+layered on top with :class:`Overlay` instead of copying the record.
+
+:func:`parse` is the only place that reads ``volumeInfo``. It reads
+exactly the paths a ``fields`` projection asked for, so each fetch path
+passes its own projection and never touches fields it did not request.
+"""
+from dataclasses import dataclass, fields as dataclass_fields, replace
+from functools import lru_cache
+from books.utils import ensure_https
+
+# projection path -> record attribute
+SOURCES = {
+    "id": "id",
+    "etag": "etag",
+    "volumeInfo.title": "title",
+    "volumeInfo.subtitle": "subtitle",
+    "volumeInfo.authors": "authors",
+    "volumeInfo.publisher": "publisher",
+    "volumeInfo.publishedDate": "published_date",
+    "volumeInfo.pageCount": "page_count",
+    "volumeInfo.categories": "categories",
+    "volumeInfo.description": "description",
+    "volumeInfo.previewLink": "preview_link",
+    "volumeInfo.infoLink": "info_link",
+    "volumeInfo.language": "language",
+    "volumeInfo.imageLinks.thumbnail": "thumbnail",
+    "volumeInfo.imageLinks.smallThumbnail": "small_thumbnail",
+}
+# list fields become tuples so records stay immutable
+TUPLES = {"authors", "categories"}
+HTTPS = {"thumbnail", "small_thumbnail"}
+
+
+def projection_paths(fields):
+    """Expand Google's ``fields`` syntax into dotted leaf paths.
+
+    ``"a,b(c,d/e)"`` -> ``{"a", "b.c", "b.d.e"}``
+    """
+    paths, stack, token = set(), [], ""
+    for ch in fields + ",":
+        if ch == "(":
+            stack.append(token.replace("/", "."))
+            token = ""
+        elif ch in ",)":
+            if token:
+                paths.add(".".join(stack + [token.replace("/", ".")]))
+            token = ""
+            if ch == ")":
+                stack.pop()
+        else:
+            token += ch
+    return paths
+
+
+class _Record:
+    """Tuple (de)serialization shared by the record types."""
+    __slots__ = ()
+
+    def to_cache(self) -> tuple:
+        """Compact, pickle-friendly form for cache entries."""
+        return tuple(getattr(self, f) for f in self.__slots__)
+
+    @classmethod
+    def from_cache(cls, values):
+        """Rebuild a record from :meth:`to_cache` output."""
+        return cls(*values)
+
+    @property
+    def byline(self) -> str:
+        """Authors joined for display."""
+        return ", ".join(self.authors)
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit(_Record):
+    """One search result."""
+    id: str
+    title: str | None = None
+    authors: tuple = ()
+    thumbnail: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class Volume(_Record):
+    """A volume's full metadata, from upstream or the local catalog."""
+    id: str
+    title: str | None = None
+    subtitle: str | None = None
+    authors: tuple = ()
+    publisher: str | None = None
+    published_date: str | None = None
+    page_count: int | None = None
+    categories: tuple = ()
+    description: str | None = None
+    preview_link: str | None = None
+    info_link: str | None = None
+    language: str | None = None
+    thumbnail: str | None = None
+    small_thumbnail: str | None = None
+    etag: str | None = None
+    # served from local data because upstream could not answer
+    stale: bool = False
+
+    @property
+    def cover(self) -> str | None:
+        """Best available cover image URL."""
+        return self.thumbnail or self.small_thumbnail
+
+    def as_stale(self) -> "Volume":
+        """The same volume, flagged as a fallback copy."""
+        return replace(self, stale=True)
+
+
+@lru_cache(maxsize=None)
+def _plan(fields, record):
+    """Compile a projection into ((path, ...), attribute) read steps."""
+    known = {f.name for f in dataclass_fields(record)}
+    plan = []
+    for path in sorted(projection_paths(fields)):
+        attr = SOURCES.get(path)
+        if attr is None or attr not in known:
+            raise ValueError(f"{record.__name__} has no field for {path!r}")
+        plan.append((tuple(path.split(".")), attr))
+    return tuple(plan)
+
+
+def parse(data, fields, record=Volume, *, volume_id=None):
+    """
+    Build a ``record`` from one volume payload, reading exactly the
+    paths in the ``fields`` projection. Projections without ``id`` pass
+    ``volume_id``. Returns None if the volume has no id.
+    """
+    values = {}
+    for path, attr in _plan(fields, record):
+        node = data
+        for key in path[:-1]:
+            node = node.get(key) or {}
+        value = node.get(path[-1])
+        if attr in TUPLES:
+            value = tuple(value or ())
+        elif attr in HTTPS:
+            value = ensure_https(value)
+        values[attr] = value
+    values["id"] = values.get("id") or volume_id
+    if not values["id"]:
+        return None
+    return record(**values)
+
+
+class Overlay:
+    """
+    Per-request view of a shared record: the request's own fields live
+    here, everything else is read from the (immutable) record.
+    """
+    __slots__ = (
+        "record",
+        "cover_url",
+        "cover_srcset",
+        "user_status",
+        "user_status_label",
+        "user_rating",
+        "avg_rating",
+        "num_ratings",
+    )
+
+    def __init__(self, record, **overlay):
+        self.record = record
+        for name in self.__slots__[1:]:
+            setattr(self, name, overlay.get(name))
+
+    def __getattr__(self, name):
+        # only called for names not found on the overlay itself
+        if name == "record":
+            raise AttributeError(name)
+        return getattr(self.record, name)
@@ -0,0 +1,138 @@
+"""
+Fetching covers into the store before anyone asks for them.
+
+A cold search page makes the browser fetch a dozen covers through the
+proxy, each a round trip to Google. Warming fetches them ahead into the
+cover store (:mod:`books.covers`) instead:
+
+- ``manage.py warm_covers`` warms every catalogued Book with a
+  thumbnail, on a bounded thread pool (:mod:`books.batch`);
+- with COVER_WARM_ON_SEARCH on, a search queues a ``books.warm_covers``
+  job (:mod:`books.tasks`) for the results it rendered whose covers
+  aren't stored, so the next visitors to that page find them there.
+
+Covers are keyless calls, so warming spends no API quota; the pool
+size is what bounds the load on Google.
+"""
+import hashlib
+import logging
+from dataclasses import dataclass
+from requests.exceptions import RequestException
+from django.conf import settings
+from books import covers, missing
+from books.batch import BatchReport, keyset_batches, run_batches
+from books.client import http_get
+from books.models import Book
+from jobs.queue import enqueue
+
+logger = logging.getLogger(__name__)
+
+# queue a warm of each search page's cold covers (needs runworker)
+ON_SEARCH = getattr(settings, "COVER_WARM_ON_SEARCH", False)
+
+FETCHED = "fetched"
+CACHED = "cached"
+MISSING = "missing"
+ERROR = "error"
+
+
+@dataclass
+class WarmReport(BatchReport):
+    """Running totals of a bulk warm."""
+    fetched: int = 0
+    cached: int = 0
+    missing: int = 0
+
+    def add(self, outcome) -> None:
+        self.scanned += 1
+        if outcome == FETCHED:
+            self.fetched += 1
+        elif outcome == CACHED:
+            self.cached += 1
+        elif outcome == MISSING:
+            self.missing += 1
+        else:
+            self.errors += 1
+
+    @property
+    def rate(self) -> float:
+        """Covers looked at per second."""
+        return self.scanned / self.elapsed if self.elapsed else 0.0
+
+
+def warm_cover(volume_id) -> str:
+    """
+    Fetch ``volume_id``'s cover into the store unless it is there;
+    returns FETCHED, CACHED, MISSING or ERROR.
+    """
+    if (not missing.is_valid_volume_id(volume_id)
+            or missing.is_cover_known_missing(volume_id)):
+        return MISSING
+    store = covers.get_store()
+    if store.has(volume_id):
+        return CACHED
+    try:
+        # covers are small: read whole, unlike the proxy's stream
+        resp = http_get(covers.upstream_url(volume_id))
+        if resp.status_code == 404:
+            missing.mark_cover_missing(volume_id)
+            return MISSING
+        resp.raise_for_status()
+    except RequestException as e:
+        logger.info("Warming cover %s failed: %s", volume_id, e)
+        return ERROR
+    store.put(
+        volume_id,
+        resp.content,
+        resp.headers.get("Content-Type", "image/jpeg"),
+    )
+    return FETCHED
+
+
+def schedule_warming(volume_ids):
+    """Queue a background warm of the covers in ``volume_ids`` not stored."""
+    store = covers.get_store()
+    cold = [
+        volume_id for volume_id in volume_ids
+        if missing.is_valid_volume_id(volume_id)
+        and not missing.is_cover_known_missing(volume_id)
+        and not store.has(volume_id)
+    ]
+    if not cold:
+        return None
+    # the same page searched again before the worker gets to it
+    digest = hashlib.sha1(",".join(cold).encode()).hexdigest()
+    return enqueue(
+        "books.warm_covers", cold, dedupe_key=f"warm_covers:{digest}"
+    )
+
+
+def _catalogued(batch_size):
+    """Batches of IDs of Books with a thumbnail, in pk order."""
+    rows = (
+        Book.objects.exclude(thumbnail_url="")
+        .values_list("pk", flat=True)
+    )
+    return keyset_batches(rows, batch_size, "pk")
+
+
+def warm_covers(
+    volume_ids=None, *, workers=4, batch_size=200, progress=None
+) -> WarmReport:
+    """
+    Warm the covers of ``volume_ids`` (default: every catalogued Book
+    with a thumbnail) with ``workers`` threads. ``progress`` is called
+    with the running report after each batch.
+    """
+    if volume_ids is None:
+        batches = _catalogued(batch_size)
+    else:
+        volume_ids = list(volume_ids)
+        batches = (
+            volume_ids[i:i + batch_size]
+            for i in range(0, len(volume_ids), batch_size)
+        )
+    return run_batches(
+        batches, warm_cover, WarmReport(),
+        workers=workers, name="cover-warm", progress=progress,
+    )
@@ -24,11 +24,90 @@ load_dotenv()
 
 IS_PROD = os.environ.get("ENV") == "prod"
 
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """ Helper to parse boolean environment variables."""
+    return str(
+        os.environ.get(name, str(default))
+        ).strip().lower() in ("1", "true", "yes", "y", "on")
+
+
 # Get the Google Books API key from environment variables
 # Make sure to set GOOGLE_BOOKS_API_KEY in your .env file
 GOOGLE_BOOKS_API_KEY = os.environ.get("GOOGLE_BOOKS_API_KEY")
+# Optional comma-separated pool of keys rotated by books/keypool.py
+GOOGLE_BOOKS_API_KEYS = [
+    k.strip()
+    for k in os.environ.get("GOOGLE_BOOKS_API_KEYS", "").split(",")
+    if k.strip()
+    ]
 GOOGLE_BOOKS_SEARCH_URL = os.environ.get("GOOGLE_BOOKS_SEARCH_URL")
 GOOGLE_BOOKS_VOLUME_URL = os.environ.get("GOOGLE_BOOKS_VOLUME_URL")
+GOOGLE_BOOKS_COVER_URL = os.environ.get(
+    "GOOGLE_BOOKS_COVER_URL", "https://books.google.com/books/content"
+    )
+
+# Shared HTTP client (books/client.py): timeout in seconds, pool and retries
+GOOGLE_BOOKS_TIMEOUT = float(os.environ.get("GOOGLE_BOOKS_TIMEOUT", "8"))
+GOOGLE_BOOKS_POOL_SIZE = int(os.environ.get("GOOGLE_BOOKS_POOL_SIZE", "10"))
+GOOGLE_BOOKS_MAX_RETRIES = int(
+    os.environ.get("GOOGLE_BOOKS_MAX_RETRIES", "2")
+    )
+GOOGLE_BOOKS_BACKOFF_FACTOR = float(
+    os.environ.get("GOOGLE_BOOKS_BACKOFF_FACTOR", "0.3")
+    )
+# Async client: connections one ASGI process may hold open at once
+GOOGLE_BOOKS_ASYNC_POOL_SIZE = int(
+    os.environ.get("GOOGLE_BOOKS_ASYNC_POOL_SIZE", "100")
+    )
+
+# Circuit breaker (books/breaker.py): trip after N failures/slow calls
+# within WINDOW seconds, then fail fast for OPEN_SECONDS
+GOOGLE_BOOKS_BREAKER_THRESHOLD = int(
+    os.environ.get("GOOGLE_BOOKS_BREAKER_THRESHOLD", "5")
+    )
+GOOGLE_BOOKS_BREAKER_WINDOW = int(
+    os.environ.get("GOOGLE_BOOKS_BREAKER_WINDOW", "60")
+    )
+GOOGLE_BOOKS_BREAKER_OPEN_SECONDS = int(
+    os.environ.get("GOOGLE_BOOKS_BREAKER_OPEN_SECONDS", "30")
+    )
+GOOGLE_BOOKS_BREAKER_SLOW_SECONDS = float(
+    os.environ.get("GOOGLE_BOOKS_BREAKER_SLOW_SECONDS", "5")
+    )
+
+# Shared rate limiter (books/ratelimit.py) for the API key: token bucket
+# plus a daily quota; background work keeps a reserve for interactive use
+GOOGLE_BOOKS_RATE_PER_SECOND = float(
+    os.environ.get("GOOGLE_BOOKS_RATE_PER_SECOND", "10")
+    )
+GOOGLE_BOOKS_RATE_BURST = int(os.environ.get("GOOGLE_BOOKS_RATE_BURST", "20"))
+GOOGLE_BOOKS_DAILY_QUOTA = int(
+    os.environ.get("GOOGLE_BOOKS_DAILY_QUOTA", "1000")
+    )
+
+# Hedged requests (books/hedging.py): race a second request when the first
+# is slower than the recent p95, adding at most MAX_RATIO extra load
+GOOGLE_BOOKS_HEDGE = env_bool("GOOGLE_BOOKS_HEDGE", False)
+GOOGLE_BOOKS_HEDGE_PERCENTILE = float(
+    os.environ.get("GOOGLE_BOOKS_HEDGE_PERCENTILE", "95")
+    )
+GOOGLE_BOOKS_HEDGE_MAX_RATIO = float(
+    os.environ.get("GOOGLE_BOOKS_HEDGE_MAX_RATIO", "0.1")
+    )
+
+# Per-request deadline (books/deadline.py): total seconds a request may
+# spend on outbound calls before falling back to cached/local data
+REQUEST_DEADLINE_SECONDS = float(
+    os.environ.get("REQUEST_DEADLINE_SECONDS", "10")
+    )
+
+# Background jobs (jobs app, run by `manage.py runworker`)
+JOBS_PERIODIC = {
+    # name: (task, interval in seconds)
+    "prune-jobs": ("jobs.prune", 60 * 60 * 24),
+    "refresh-books": ("books.refresh_stale", 60 * 60),
+}
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -73,6 +152,7 @@ INSTALLED_APPS = [
     'books',
     'activity',
     'library',
+    'jobs',
 ]
 
 
@@ -94,13 +174,6 @@ ACCOUNT_EMAIL_VERIFICATION = "mandatory"  # prod
 
 
 # Email settings
-def env_bool(name: str, default: bool = False) -> bool:
-    """ Helper to parse boolean environment variables."""
-    return str(
-        os.environ.get(name, str(default))
-        ).strip().lower() in ("1", "true", "yes", "y", "on")
-
-
 EMAIL_BACKEND = os.environ.get(
     "EMAIL_BACKEND",
     "django.core.mail.backends.smtp.EmailBackend"
@@ -124,6 +197,7 @@ SERVER_EMAIL = os.environ.get("SERVER_EMAIL", DEFAULT_FROM_EMAIL)
 EMAIL_TIMEOUT = int(os.environ.get("EMAIL_TIMEOUT", "10"))
 
 MIDDLEWARE = [
+    'books.deadline.RequestDeadlineMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -171,6 +245,40 @@ else:
             )
         }
 
+# Cache
+# LocMem is per-process. Set CACHE_BACKEND=db to share single-flight locks
+# and cached volumes across gunicorn workers and dynos without extra
+# infrastructure (table created by `manage.py createcachetable`).
+if os.environ.get("CACHE_BACKEND") == "db":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "chaptr_cache",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Cover images (books/covers.py): fetched once, kept on local disk and
+# shared by every worker on the machine; mount a volume here to keep
+# them across restarts. Least recently served covers go past MAX_BYTES.
+COVER_STORE_DIR = Path(
+    os.environ.get("COVER_STORE_DIR", BASE_DIR / "var" / "covers")
+    )
+COVER_STORE_MAX_BYTES = int(
+    os.environ.get("COVER_STORE_MAX_BYTES", str(512 * 1024 ** 2))
+    )
+# widths (px) of the scaled cover variants pages offer in srcset
+# (books/variants.py; needs Pillow)
+COVER_VARIANT_WIDTHS = (48, 96, 128)
+# queue a background fetch of each search page's uncached covers
+# (books/warming.py), so later visitors find them in the store
+COVER_WARM_ON_SEARCH = env_bool("COVER_WARM_ON_SEARCH")
+
 CSRF_TRUSTED_ORIGINS = [
     "https://*.herokuapp.com",
     'http://127.0.0.1:8000'
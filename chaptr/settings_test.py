@@ -1,7 +1,10 @@
 """Test setting"""
+import tempfile
 from .settings import *
 
 
 STORAGES["staticfiles"]["BACKEND"] = (
     "django.contrib.staticfiles.storage.StaticFilesStorage"
     )
+# keep test covers out of the project's store
+COVER_STORE_DIR = Path(tempfile.mkdtemp(prefix="chaptr-covers-"))
@@ -0,0 +1,200 @@
+"""Tests for the database-backed job queue and worker."""
+import time
+from datetime import timedelta
+from unittest.mock import Mock, patch
+from django.contrib.admin.sites import site
+from django.core.management import call_command
+from django.db import OperationalError
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from jobs import queue
+from jobs.models import Job
+from jobs.registry import task
+
+calls = []
+
+
+@task("tests.record")
+def record(*args):
+    """Remember the call."""
+    calls.append(args)
+
+
+@task("tests.slow")
+def slow():
+    """Outlive a (shortened) lease, then let the worker look for expiry."""
+    time.sleep(0.5)
+    queue.recover_expired()
+
+
+@task("tests.explode", max_attempts=2)
+def explode():
+    """Always fail."""
+    raise RuntimeError("boom")
+
+
+class QueueTests(TestCase):
+    """Enqueue, claim, retry and schedule."""
+    def setUp(self):
+        calls.clear()
+
+    def test_run_calls_task_with_args(self):
+        """A claimed job runs its task and is marked done."""
+        queue.enqueue("tests.record", "VOL1", 2)
+        job = queue.claim("w1")
+        queue.run(job)
+        self.assertEqual(calls, [("VOL1", 2)])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_dedupe_key_keeps_one_queued_job(self):
+        """Enqueueing the same key twice returns the queued job."""
+        first = queue.enqueue("tests.record", "A", dedupe_key="k")
+        second = queue.enqueue("tests.record", "A", dedupe_key="k")
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_unknown_task_is_rejected(self):
+        """Typos fail at enqueue time, not in the worker."""
+        with self.assertRaises(ValueError):
+            queue.enqueue("tests.nope")
+
+    def test_claim_is_exclusive_and_respects_run_at(self):
+        """A job goes to one worker, and not before it is due."""
+        queue.enqueue(
+            "tests.record", run_at=timezone.now() + timedelta(hours=1)
+        )
+        self.assertIsNone(queue.claim("w1"))
+        queue.enqueue("tests.record")
+        self.assertIsNotNone(queue.claim("w1"))
+        self.assertIsNone(queue.claim("w2"))
+
+    def test_failures_back_off_then_fail(self):
+        """Errors are retried later, up to the task's max_attempts."""
+        queue.enqueue("tests.explode")
+        queue.run(queue.claim("w1"))
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("boom", job.last_error)
+
+        Job.objects.update(run_at=timezone.now())
+        queue.run(queue.claim("w1"))
+        self.assertEqual(Job.objects.get().status, Job.Status.FAILED)
+
+    @patch.object(queue, "LEASE_SECONDS", 60)
+    def test_expired_lease_is_requeued(self):
+        """A job left RUNNING by a dead worker becomes claimable again."""
+        queue.enqueue("tests.record")
+        queue.claim("dead")
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=5))
+        queue.recover_expired()
+        Job.objects.update(run_at=timezone.now())
+        job = queue.claim("w2")
+        self.assertEqual((job.locked_by, job.attempts), ("w2", 2))
+
+    @patch.object(queue, "PERIODIC", {"tick": ("tests.record", 3600)})
+    def test_periodic_jobs_are_spaced_by_interval(self):
+        """The next run is queued once, an interval after the last start."""
+        queue.schedule_periodic()
+        queue.schedule_periodic()
+        self.assertEqual(Job.objects.count(), 1)
+
+        queue.run(queue.claim("w1"))
+        started = Job.objects.get().locked_at
+        queue.schedule_periodic()
+        upcoming = Job.objects.get(status=Job.Status.QUEUED)
+        self.assertEqual(upcoming.run_at, started + timedelta(hours=1))
+
+    @patch("jobs.queue.time.sleep")
+    def test_outcome_is_recorded_once_database_is_free(self, _sleep):
+        """A busy database delays, but does not lose, a job's outcome."""
+        queue.enqueue("tests.record")
+        job = queue.claim("w1")
+        real_update = QuerySet.update
+        busy = iter([True])
+
+        def update(qs, **kwargs):
+            if next(busy, False):
+                raise OperationalError("database table is locked")
+            return real_update(qs, **kwargs)
+
+        with patch.object(QuerySet, "update", update):
+            queue.run(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.DONE)
+
+    def test_retry_now_skips_keys_already_queued(self):
+        """Retrying never queues a second job under one dedupe key."""
+        failed = [
+            Job.objects.create(
+                name="tests.record", status=Job.Status.FAILED, dedupe_key=key
+            )
+            for key in ("k1", "k2", "k2", "")
+        ]
+        queue.enqueue("tests.record", dedupe_key="k1")
+        admin = site._registry[Job]
+        with patch.object(admin, "message_user") as message_user:
+            admin.retry_now(Mock(), Job.objects.filter(
+                pk__in=[job.pk for job in failed]
+            ))
+        self.assertIn("Skipped 2", message_user.call_args.args[1])
+        self.assertEqual(
+            sorted(Job.objects.filter(
+                status=Job.Status.QUEUED
+            ).values_list("dedupe_key", flat=True)),
+            ["", "k1", "k2"],
+        )
+
+    def test_prune_removes_old_finished_jobs(self):
+        """Finished jobs past JOBS_KEEP_DAYS are deleted."""
+        queue.enqueue("jobs.prune")
+        old = Job.objects.create(
+            name="tests.record",
+            status=Job.Status.DONE,
+            finished_at=timezone.now() - timedelta(days=30),
+        )
+        queue.run(queue.claim("w1"))
+        self.assertFalse(Job.objects.filter(pk=old.pk).exists())
+
+
+class LeaseTests(TransactionTestCase):
+    """A running job keeps its lease for as long as it works."""
+    @patch.object(queue, "LEASE_SECONDS", 0.3)
+    def test_long_job_is_not_taken_over(self):
+        queue.enqueue("tests.slow")
+        claimed = queue.claim("w1")
+        queue.run(claimed)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.Status.DONE, 1))
+        self.assertGreater(job.locked_at, claimed.locked_at)
+
+    def test_lost_lease_is_not_extended(self):
+        queue.enqueue("tests.record")
+        job = queue.claim("w1")
+        self.assertTrue(queue.extend_lease(job))
+        Job.objects.update(locked_by="w2")
+        self.assertFalse(queue.extend_lease(job))
+
+
+class RunWorkerCommandTests(TransactionTestCase):
+    """`manage.py runworker --once` drains due jobs with a thread pool."""
+    def setUp(self):
+        calls.clear()
+
+    def test_once_runs_due_jobs_and_exits(self):
+        """All due jobs run across the threads, then the command returns."""
+        for i in range(5):
+            queue.enqueue("tests.record", i)
+        call_command(
+            "runworker", "--once", "--threads", "2", "--poll-interval", "0.01"
+        )
+        self.assertEqual(sorted(calls), [(i,) for i in range(5)])
+        self.assertEqual(
+            Job.objects.filter(
+                name="tests.record", status=Job.Status.DONE
+            ).count(),
+            5
+        )
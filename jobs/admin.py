@@ -0,0 +1,69 @@
+""" Admin interface for inspecting and retrying background jobs """
+from django.contrib import admin, messages
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Admin interface for the background job queue."""
+    list_display = (
+        "name",
+        "args",
+        "status",
+        "attempts",
+        "run_at",
+        "finished_at",
+        "locked_by",
+    )
+    list_filter = ("status", "name")
+    search_fields = ("name", "dedupe_key", "last_error")
+    search_help_text = "Search by task name, dedupe key or error."
+    date_hierarchy = "created_at"
+    readonly_fields = ("locked_by", "locked_at", "created_at", "finished_at")
+    actions = ["retry_now"]
+
+    @admin.action(description="Retry selected failed jobs now")
+    def retry_now(self, request, queryset):
+        """
+        Queue failed jobs again, with a fresh set of attempts.
+
+        At most one job per dedupe key may be queued, so a failed job
+        whose key is already queued (or selected twice) is skipped.
+        """
+        queued = set(
+            Job.objects.filter(status=Job.Status.QUEUED)
+            .exclude(dedupe_key="")
+            .values_list("dedupe_key", flat=True)
+        )
+        retry, skipped = [], 0
+        failed = queryset.filter(status=Job.Status.FAILED)
+        for pk, key in failed.order_by("-pk").values_list("pk", "dedupe_key"):
+            if key in queued:
+                skipped += 1
+                continue
+            if key:
+                queued.add(key)
+            retry.append(pk)
+        try:
+            with transaction.atomic():
+                updated = Job.objects.filter(
+                    pk__in=retry, status=Job.Status.FAILED
+                ).update(
+                    status=Job.Status.QUEUED,
+                    run_at=timezone.now(),
+                    attempts=0,
+                    finished_at=None,
+                )
+        except IntegrityError:
+            self.message_user(
+                request,
+                "A job with one of their keys was just queued; try again.",
+                messages.WARNING,
+            )
+            return
+        message = f"Queued {updated} job(s) again."
+        if skipped:
+            message += f" Skipped {skipped} already queued."
+        self.message_user(request, message)
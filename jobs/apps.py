@@ -0,0 +1,13 @@
+""" Django app configuration for the background jobs app."""
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    """Configuration for the jobs app."""
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+
+    def ready(self):
+        # register every app's @task functions (<app>/tasks.py)
+        autodiscover_modules("tasks")
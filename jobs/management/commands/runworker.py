@@ -0,0 +1,66 @@
+"""
+Run background job workers.
+
+    python manage.py runworker --threads 4
+    python manage.py runworker --processes 2 --threads 4
+    python manage.py runworker --once   # drain due jobs, then exit
+"""
+import multiprocessing
+import signal
+from django.core.management.base import BaseCommand
+from django.db import connections
+from jobs.worker import serve
+
+
+class Command(BaseCommand):
+    """Claim and run queued jobs until stopped."""
+    help = "Run background job workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads", type=int, default=2,
+            help="Worker threads per process (default 2).",
+        )
+        parser.add_argument(
+            "--processes", type=int, default=1,
+            help="Worker processes (default 1).",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0,
+            help="Seconds to wait when no job is due (default 1).",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Run the jobs due now, then exit.",
+        )
+
+    def handle(self, *args, **opts):
+        threads = max(1, opts["threads"])
+        processes = max(1, opts["processes"])
+        kwargs = {
+            "threads": threads,
+            "poll_interval": opts["poll_interval"],
+            "once": opts["once"],
+        }
+        if processes == 1:
+            serve(**kwargs)
+            return
+
+        # children must not share the parent's DB connections
+        connections.close_all()
+        children = [
+            multiprocessing.Process(target=serve, kwargs=kwargs)
+            for _ in range(processes)
+        ]
+        for child in children:
+            child.start()
+
+        def forward(signum, _frame):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for child in children:
+            child.join()
@@ -0,0 +1,57 @@
+"""
+Background job queue stored in the database.
+
+A Job is one call of a registered task (see :mod:`jobs.registry`) with
+JSON arguments. Workers (``manage.py runworker``) claim due jobs, run
+them and record the outcome; failures are retried with backoff until
+``max_attempts``. Works the same on SQLite and Postgres.
+"""
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """One queued, running or finished task call."""
+    class Status(models.TextChoices):
+        """Lifecycle of a job."""
+        QUEUED = "QUEUED", "Queued"
+        RUNNING = "RUNNING", "Running"
+        DONE = "DONE", "Done"
+        FAILED = "FAILED", "Failed"
+
+    name = models.CharField(max_length=100)
+    args = models.JSONField(default=list, blank=True)
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.QUEUED
+    )
+    # at most one queued job per key, e.g. "hydrate:<volume id>"
+    dedupe_key = models.CharField(max_length=200, blank=True, default="")
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        """Meta options for the Job model."""
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=Q(status="QUEUED") & ~Q(dedupe_key=""),
+                name="unique_queued_job_dedupe_key"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "run_at"]),
+            models.Index(fields=["dedupe_key"]),
+        ]
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.name}{tuple(self.args)!r} [{self.status}]"
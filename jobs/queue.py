@@ -0,0 +1,233 @@
+"""
+Enqueueing, claiming and running jobs.
+
+Claims are a conditional ``UPDATE ... WHERE status = 'QUEUED'``: of
+several workers racing for a row exactly one updates it, without
+``SELECT ... FOR UPDATE SKIP LOCKED`` (which SQLite lacks). A worker
+that dies mid-job leaves the row RUNNING; once its lease expires the
+job is queued again. A running job's lease is extended every third of
+LEASE_SECONDS, so a long job isn't taken over while it still works.
+"""
+import logging
+import random
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.db import (
+    IntegrityError, OperationalError, connection, transaction
+)
+from django.db.models import F
+from django.utils import timezone
+from jobs import registry
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+# seconds a claimed job may run before another worker may take it over
+LEASE_SECONDS = getattr(settings, "JOBS_LEASE_SECONDS", 60 * 5)
+RETRY_BASE_SECONDS = getattr(settings, "JOBS_RETRY_BASE_SECONDS", 10)
+RETRY_MAX_SECONDS = getattr(settings, "JOBS_RETRY_MAX_SECONDS", 60 * 60)
+# name -> (task, interval in seconds)
+PERIODIC = getattr(settings, "JOBS_PERIODIC", {})
+# due jobs looked at per claim attempt
+CLAIM_BATCH = 10
+# tries at recording a job's outcome while the database is busy
+RECORD_ATTEMPTS = 3
+
+
+def enqueue(name, *args, dedupe_key="", run_at=None):
+    """
+    Queue a call of task ``name`` with JSON-serializable ``args``.
+
+    With a ``dedupe_key``, a job already queued under that key is
+    returned instead of adding another. The row is written in the
+    caller's transaction, so it only becomes visible to workers (and
+    only runs) if that transaction commits.
+    """
+    max_attempts = registry.get(name).max_attempts
+    if dedupe_key:
+        existing = Job.objects.filter(
+            dedupe_key=dedupe_key, status=Job.Status.QUEUED
+        ).first()
+        if existing:
+            return existing
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                name=name,
+                args=list(args),
+                dedupe_key=dedupe_key,
+                run_at=run_at or timezone.now(),
+                max_attempts=max_attempts,
+            )
+    except IntegrityError:
+        # another process queued the same key first
+        return Job.objects.filter(
+            dedupe_key=dedupe_key, status=Job.Status.QUEUED
+        ).first()
+
+
+def claim(worker_id):
+    """Take the next due job for ``worker_id``, or None if there is none."""
+    now = timezone.now()
+    due = (
+        Job.objects
+        .filter(status=Job.Status.QUEUED, run_at__lte=now)
+        .order_by("run_at", "pk")
+        .values_list("pk", flat=True)[:CLAIM_BATCH]
+    )
+    for pk in due:
+        claimed = Job.objects.filter(
+            pk=pk, status=Job.Status.QUEUED
+        ).update(
+            status=Job.Status.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run(job):
+    """Run a claimed job and record success, a retry or the failure."""
+    try:
+        fn = registry.get(job.name).fn
+    except ValueError as e:
+        _finish(job, Job.Status.FAILED, str(e))
+        return
+    try:
+        with _lease_kept(job):
+            fn(*job.args)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning("Job %s failed (attempt %s): %s", job, job.attempts, e)
+        _retry_or_fail(job, traceback.format_exc())
+    else:
+        _finish(job, Job.Status.DONE, "")
+
+
+def extend_lease(job):
+    """Restart ``job``'s lease; False if it is no longer ours to run."""
+    return bool(Job.objects.filter(
+        pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by
+    ).update(locked_at=timezone.now()))
+
+
+@contextmanager
+def _lease_kept(job):
+    """Extend ``job``'s lease from a side thread while the block runs."""
+    stop = threading.Event()
+
+    def heartbeat():
+        try:
+            while not stop.wait(LEASE_SECONDS / 3):
+                try:
+                    if not _record(lambda: extend_lease(job)):
+                        logger.warning("Job %s lost its lease", job)
+                        return
+                except OperationalError as e:
+                    logger.warning("Could not extend %s's lease: %s", job, e)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(
+        target=heartbeat, name=f"job-{job.pk}-lease", daemon=True
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter for the ``attempts``-th failure."""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _retry_or_fail(job, error):
+    if job.attempts >= job.max_attempts:
+        _finish(job, Job.Status.FAILED, error)
+        return
+    run_at = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+
+    def requeue():
+        with transaction.atomic():
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.Status.QUEUED,
+                run_at=run_at,
+                locked_by="",
+                locked_at=None,
+                last_error=error,
+            )
+
+    try:
+        _record(requeue)
+    except IntegrityError:
+        # a fresh job with the same key is already queued; let it run
+        _finish(job, Job.Status.FAILED, error)
+
+
+def _finish(job, status, error):
+    _record(lambda: Job.objects.filter(pk=job.pk).update(
+        status=status,
+        finished_at=timezone.now(),
+        locked_by="",
+        last_error=error,
+    ))
+
+
+def _record(write):
+    """
+    Run an outcome ``write``, retrying briefly while the database is
+    busy (SQLite locks): the job already ran, so giving up would leave
+    it RUNNING until its lease expires and run it again.
+    """
+    for attempt in range(RECORD_ATTEMPTS):
+        try:
+            return write()
+        except OperationalError:
+            if attempt + 1 == RECORD_ATTEMPTS:
+                raise
+            time.sleep(0.05 * 2 ** attempt)
+
+
+def recover_expired():
+    """Requeue RUNNING jobs whose worker's lease ran out."""
+    expired = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(seconds=LEASE_SECONDS),
+    )
+    for job in expired:
+        logger.warning("Job %s lease expired (worker %s)", job, job.locked_by)
+        _retry_or_fail(job, f"lease expired on worker {job.locked_by}")
+
+
+def schedule_periodic():
+    """
+    Make sure each ``JOBS_PERIODIC`` entry has its next run queued.
+
+    Runs are spaced ``interval`` seconds from the previous run's start.
+    Safe to call from every worker: the dedupe key keeps one queued.
+    """
+    for name, (task_name, interval) in PERIODIC.items():
+        key = f"periodic:{name}"
+        jobs = Job.objects.filter(dedupe_key=key)
+        if jobs.filter(
+            status__in=[Job.Status.QUEUED, Job.Status.RUNNING]
+        ).exists():
+            continue
+        last = (
+            jobs.exclude(locked_at=None)
+            .order_by("-locked_at")
+            .values_list("locked_at", flat=True)
+            .first()
+        )
+        run_at = last + timedelta(seconds=interval) if last else None
+        enqueue(task_name, dedupe_key=key, run_at=run_at)
@@ -0,0 +1,42 @@
+"""
+Registry of functions that can run as background jobs.
+
+Apps declare tasks in their ``tasks.py`` (imported at startup by
+:class:`jobs.apps.JobsConfig`)::
+
+    @task("books.hydrate", max_attempts=3)
+    def hydrate_book(volume_id): ...
+
+Task arguments are stored as JSON, so they must be JSON-serializable.
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+DEFAULT_MAX_ATTEMPTS = 5
+
+
+@dataclass(frozen=True)
+class Task:
+    """A registered task function and its retry policy."""
+    name: str
+    fn: Callable
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+
+
+_tasks: dict[str, Task] = {}
+
+
+def task(name: str, *, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+    """Register the decorated function as the task ``name``."""
+    def decorator(fn):
+        _tasks[name] = Task(name, fn, max_attempts)
+        return fn
+    return decorator
+
+
+def get(name: str) -> Task:
+    """Return the task registered as ``name``; ValueError if unknown."""
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise ValueError(f"Unknown job task {name!r}") from None
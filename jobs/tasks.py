@@ -0,0 +1,18 @@
+"""Housekeeping tasks for the job queue itself."""
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from jobs.models import Job
+from jobs.registry import task
+
+# days finished jobs are kept for inspection in the admin
+KEEP_DAYS = getattr(settings, "JOBS_KEEP_DAYS", 7)
+
+
+@task("jobs.prune")
+def prune_jobs():
+    """Delete finished jobs older than ``JOBS_KEEP_DAYS``."""
+    Job.objects.filter(
+        status__in=[Job.Status.DONE, Job.Status.FAILED],
+        finished_at__lt=timezone.now() - timedelta(days=KEEP_DAYS),
+    ).delete()
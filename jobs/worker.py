@@ -0,0 +1,102 @@
+"""
+The job worker behind ``manage.py runworker``.
+
+Each worker process runs ``threads`` loops that claim and run jobs; the
+process's main thread also requeues jobs with expired leases and keeps
+periodic jobs scheduled. Several processes (``--processes``) or dynos
+can run side by side: claims never hand one job to two workers.
+"""
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import django
+from django.apps import apps
+from django.db import DatabaseError, close_old_connections
+from jobs import queue
+
+logger = logging.getLogger(__name__)
+
+# seconds between lease recovery / periodic scheduling passes
+HOUSEKEEPING_SECONDS = 30
+
+
+class Worker:
+    """A pool of threads draining the job queue."""
+    def __init__(self, threads=1, poll_interval=1.0):
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+
+    def stop(self, *_):
+        """Finish the jobs in hand, then exit (also a signal handler)."""
+        self._stop.set()
+
+    def run(self, once=False):
+        """
+        Work until :meth:`stop` is called. With ``once``, exit as soon as
+        no job is due instead of polling for more.
+        """
+        self._housekeeping()
+        loops = [
+            threading.Thread(
+                target=self._loop,
+                args=(once,),
+                name=f"jobs-worker-{i}",
+                daemon=True,
+            )
+            for i in range(self.threads)
+        ]
+        for loop in loops:
+            loop.start()
+        next_housekeeping = time.monotonic() + HOUSEKEEPING_SECONDS
+        while any(loop.is_alive() for loop in loops):
+            self._stop.wait(self.poll_interval)
+            if time.monotonic() >= next_housekeeping:
+                self._housekeeping()
+                next_housekeeping = time.monotonic() + HOUSEKEEPING_SECONDS
+        for loop in loops:
+            loop.join()
+
+    def _housekeeping(self):
+        try:
+            queue.recover_expired()
+            queue.schedule_periodic()
+        finally:
+            close_old_connections()
+
+    def _loop(self, once):
+        while not self._stop.is_set():
+            # like a request: drop broken or expired connections first
+            close_old_connections()
+            try:
+                job = queue.claim(self.id)
+                if job is not None:
+                    queue.run(job)
+            except DatabaseError:
+                # keep the thread alive; a job caught mid-way keeps its
+                # lease and is requeued once that expires
+                logger.exception("Job worker %s: database error", self.id)
+                self._stop.wait(self.poll_interval)
+                continue
+            if job is None:
+                if once:
+                    break
+                self._stop.wait(self.poll_interval)
+        close_old_connections()
+
+
+def serve(threads=1, poll_interval=1.0, once=False):
+    """Run a :class:`Worker` in this process until SIGTERM/SIGINT."""
+    if not apps.ready:
+        # child started with the "spawn" method
+        django.setup()
+    worker = Worker(threads=threads, poll_interval=poll_interval)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    logger.info("Job worker %s started (%s threads)", worker.id, threads)
+    worker.run(once=once)
+    logger.info("Job worker %s stopped", worker.id)
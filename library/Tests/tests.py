@@ -3,12 +3,14 @@ from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.utils import timezone
 from django.contrib.messages import get_messages
 
 # Create your tests here.
 
 from books.models import Book
 from activity.models import ReadingStatus
+from jobs.models import Job
 
 User = get_user_model()
 
@@ -306,3 +308,47 @@ class LibraryPageActionsTests(TestCase):
         detail_url = reverse("book_detail", args=[self.book.id])
         self.assertContains(page, f'href="{detail_url}#reviews"')
         self.assertContains(page, f'href="{detail_url}')
+
+    def test_stub_rows_render_and_requeue_hydration(self):
+        """A not-yet-hydrated book renders a placeholder, not 'None'."""
+        stub = Book.objects.create(id="stub-vol")
+        ReadingStatus.objects.create(
+            user=self.user, book=stub, status="TO_READ"
+        )
+        page = self.client.get(reverse("library"))
+
+        self.assertContains(page, "Loading book details")
+        self.assertNotContains(page, "None")
+        self.assertTrue(
+            Job.objects.filter(dedupe_key="hydrate:stub-vol").exists()
+        )
+
+    def test_stub_is_not_requeued_while_a_job_is_pending(self):
+        """Each view doesn't add a job while one is queued or running."""
+        stub = Book.objects.create(id="stub-vol")
+        ReadingStatus.objects.create(
+            user=self.user, book=stub, status="TO_READ"
+        )
+        Job.objects.create(
+            name="books.hydrate", args=["stub-vol"],
+            dedupe_key="hydrate:stub-vol", status=Job.Status.RUNNING,
+        )
+        self.client.get(reverse("library"))
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_failed_hydration_shows_fallback_and_is_not_requeued(self):
+        """A volume that can't be fetched stops looking like it's loading."""
+        stub = Book.objects.create(id="gone-vol")
+        ReadingStatus.objects.create(
+            user=self.user, book=stub, status="TO_READ"
+        )
+        Job.objects.create(
+            name="books.hydrate", args=["gone-vol"],
+            dedupe_key="hydrate:gone-vol", status=Job.Status.FAILED,
+            finished_at=timezone.now(),
+        )
+        page = self.client.get(reverse("library"))
+
+        self.assertContains(page, "Book details unavailable")
+        self.assertNotContains(page, "Loading book details")
+        self.assertEqual(Job.objects.count(), 1)
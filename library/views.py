@@ -6,6 +6,8 @@ from django.shortcuts import render
 from django.urls import reverse
 from django.templatetags.static import static
 from activity.models import ReadingStatus
+from books import variants
+from books.services import retry_stub_hydration
 from books.utils import ensure_https
 
 VALID_STATUS = {
@@ -50,7 +52,12 @@ def library(request):
     else:
         qs = qs.order_by("-updated_at")  # safe default
 
-    rows = qs
+    rows = list(qs)
+    # stubs from recent shelvings whose details haven't landed yet (or
+    # whose hydration failed): retry them in the background
+    hydration_failed = retry_stub_hydration(
+        [rs.book.id for rs in rows if not rs.book.title]
+    )
 
     labels = dict(ReadingStatus.Status.choices)
 
@@ -65,6 +72,8 @@ def library(request):
         rs.user_status_class = status_class.get(rs.status, "status--none")
 
         b = rs.book
+        b.hydration_failed = b.id in hydration_failed
+
         # keep normalized URL available if you ever need it server-side
         thumb = ensure_https(getattr(b, "thumbnail_url", "") or "")
         b.thumbnail_url = thumb
@@ -74,6 +83,7 @@ def library(request):
             f"{reverse('cover_proxy', args=[b.id])}" if thumb
             else static("images/placeholder_cover.png")
         )
+        b.cover_srcset = variants.srcset(b.id) if thumb else ""
 
     context = {
         "rows": rows,